@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parseo completo vs streaming del feed iCal
+Genera feeds sintéticos de distintos tamaños y mide tiempo y memoria peak
+(tracemalloc) de cada modo. En streaming la memoria debe mantenerse plana.
+
+Uso:
+    python3 benchmarks/bench_calendar_stream.py [--sizes 1000 10000 50000]
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from datetime import timedelta, date
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from icalendar import Calendar
+from calendar_extractor import CalendarExtractor
+from synthetic import BENCH_CONFIG, write_ical_feed, file_chunks
+
+
+def measure(func):
+    """Ejecuta func y retorna (segundos, peak MB)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    extractor = CalendarExtractor(BENCH_CONFIG)
+    window = (date(2024, 1, 1), date(2024, 1, 7))
+
+    print(f"{'eventos':>9} | {'MB feed':>8} | {'full s':>8} | {'full MB':>8} | {'stream s':>8} | {'stream MB':>9}")
+    print("-" * 66)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            path = os.path.join(tmp, f"feed_{n}.ics")
+            write_ical_feed(path, n, days=n // 48 + 1)
+            feed_mb = os.path.getsize(path) / (1024 * 1024)
+
+            def full():
+                with open(path, 'rb') as f:
+                    cal = Calendar.from_ical(f.read())
+                index = extractor.build_event_index(cal)
+                day = window[0]
+                while day <= window[1]:
+                    extractor.compute_metrics(index.events_on(day, extractor.expander))
+                    day += timedelta(days=1)
+
+            def stream():
+                extractor.iter_feed_chunks = lambda chunk_size=65536, url=None: file_chunks(path, chunk_size)
+                extractor.extract_events_streaming(*window)
+
+            full_s, full_mb = measure(full)
+            stream_s, stream_mb = measure(stream)
+            print(f"{n:>9} | {feed_mb:>8.1f} | {full_s:>8.2f} | {full_mb:>8.1f} | {stream_s:>8.2f} | {stream_mb:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
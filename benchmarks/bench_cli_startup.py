@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tiempo de arranque en frío del CLI revops (proceso nuevo por medición)
+Mide cada comando contra el intérprete vacío (`python -c pass`) y falla si el
+costo propio de un comando liviano supera --max-ms
+
+Uso:
+    python3 benchmarks/bench_cli_startup.py [--repeat 10] [--max-ms 50]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CLI = os.path.join(ROOT, 'scripts', 'revops.py')
+
+# (nombre, argumentos, liviano: se controla contra --max-ms)
+COMMANDS = [
+    ('python -c pass', ['-c', 'pass'], False),
+    ('revops --help', [CLI, '--help'], True),
+    ('revops verify --offline', [CLI, 'verify', '--offline'], True),
+    ('revops extract --help', [CLI, 'extract', '--help'], False),
+    ('revops sheet-read --help', [CLI, 'sheet-read', '--help'], False),
+]
+
+
+def measure(args: list, repeat: int) -> list:
+    """Milisegundos de pared de `repeat` procesos nuevos"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--max-ms', type=float, default=50,
+                        help="Máximo costo propio (mediana - intérprete) de los comandos livianos")
+    args = parser.parse_args()
+
+    print(f"{'comando':<26} | {'min ms':>7} | {'mediana ms':>10} | {'propio ms':>9}")
+    print("-" * 62)
+    baseline = None
+    slow = []
+    for name, command_args, light in COMMANDS:
+        times = measure(command_args, args.repeat)
+        median = statistics.median(times)
+        if baseline is None:
+            baseline = median
+        own = median - baseline
+        print(f"{name:<26} | {min(times):>7.1f} | {median:>10.1f} | {own:>9.1f}")
+        if light and own > args.max_ms:
+            slow.append(name)
+
+    if slow:
+        print(f"\n❌ Sobre {args.max_ms:.0f} ms de costo propio: {', '.join(slow)}")
+        sys.exit(1)
+    print(f"\n✅ Comandos livianos bajo {args.max_ms:.0f} ms sobre el intérprete")
+
+
+if __name__ == "__main__":
+    main()
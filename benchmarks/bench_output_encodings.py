@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bytes en el cable y tiempo de parseo de latest.json
+Compara las variantes publicadas (indentado, minificado) con lo que envía el
+host al comprimir el minificado con gzip o brotli (descompresión + json.loads)
+
+Uso:
+    python3 benchmarks/bench_output_encodings.py [--input data/latest.json] [--repeat 20]
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from publish import encode_variants
+
+try:
+    import brotli
+except ImportError:  # opcional: sin brotli sólo se omite la fila .br
+    brotli = None
+
+DECODERS = {
+    '.json': lambda body: json.loads(body),
+    '.min.json': lambda body: json.loads(body),
+    '.min.json.gz': lambda body: json.loads(gzip.decompress(body)),
+    '.min.json.br': lambda body: json.loads(brotli.decompress(body)),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--input', default=os.path.join(os.path.dirname(__file__), '..', 'data', 'latest.json'))
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    variants = encode_variants(data)
+    variants['.min.json.gz'] = gzip.compress(variants['.min.json'], compresslevel=9, mtime=0)
+    if brotli is not None:
+        variants['.min.json.br'] = brotli.compress(variants['.min.json'], quality=11)
+    base_size = len(variants['.json'])
+
+    print(f"📄 {args.input} ({data.get('total_dias', '?')} días)")
+    print(f"{'variante':<14} | {'bytes':>10} | {'% del original':>14} | {'parseo ms':>9}")
+    print("-" * 58)
+    for suffix, body in variants.items():
+        decode = DECODERS[suffix]
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            decode(body)
+        elapsed_ms = (time.perf_counter() - started) / args.repeat * 1000
+        print(f"{suffix:<14} | {len(body):>10,} | {len(body) / base_size * 100:>13.1f}% | {elapsed_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parser por columna (closures, implementación anterior) vs parser
+vectorizado por filas, sobre sheets sintéticos de miles de columnas
+Verifica además que ambos produzcan exactamente los mismos registros
+
+Uso:
+    python3 benchmarks/bench_sheet_parser.py [--cols 1000 5000 20000] [--malformed 0.001]
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from sheet_parser import SheetParser
+from synthetic import sheet_matrix
+
+def legacy_extract_column(rows, col_index):
+    """Extractor por columna previo al parser por filas (referencia)"""
+    try:
+        fecha_str = rows[1][col_index].strip() if len(rows) > 1 and col_index < len(rows[1]) else ""
+        if not fecha_str:
+            return None
+        try:
+            fecha = datetime.strptime(fecha_str, "%d/%m/%Y")
+        except ValueError:
+            return None
+
+        def get_value(row_index):
+            try:
+                if row_index < len(rows) and col_index < len(rows[row_index]):
+                    val = rows[row_index][col_index].strip()
+                    return int(val) if val else 0
+                return 0
+            except ValueError:
+                return 0
+
+        def get_money_value(row_index):
+            try:
+                if row_index < len(rows) and col_index < len(rows[row_index]):
+                    val = rows[row_index][col_index].strip()
+                    val = val.replace('$', '').replace('.', '').replace(',', '').strip()
+                    return int(val) if val else 0
+                return 0
+            except ValueError:
+                return 0
+
+        def get_decimal_value(row_index):
+            try:
+                if row_index < len(rows) and col_index < len(rows[row_index]):
+                    val = rows[row_index][col_index].strip()
+                    val = val.replace('$', '').replace('.', '').replace(',', '.').strip()
+                    return float(val) if val else 0.0
+                return 0.0
+            except ValueError:
+                return 0.0
+
+        reuniones = {}
+        for name, llamadas_row, reuniones_row in [('Daniela', 9, 10), ('Teresa', 11, 12),
+                                                  ('Matias', 13, 14), ('Robot', 15, 16)]:
+            count = get_value(reuniones_row)
+            reuniones[name] = {'agendadas': count, 'realizadas': count, 'llamadas': get_value(llamadas_row)}
+
+        return {
+            "fecha": fecha.strftime("%Y-%m-%d"),
+            "leads_creados": get_value(20),
+            "llamadas_realizadas": get_value(21),
+            "reuniones_agendadas_dia": get_value(22),
+            "inversion_campanas": get_money_value(23),
+            "costo_por_lead": round(get_decimal_value(24), 3),
+            "reuniones": reuniones,
+            "totales": {
+                "reuniones_agendadas": get_value(2),
+                "reuniones_realizadas": get_value(3),
+                "clientes_con_reserva": get_value(4),
+                "reservas": get_value(5)
+            }
+        }
+    except Exception:
+        return None
+
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cols', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--malformed', type=float, default=0.001, help="Fracción de celdas inválidas")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    sheet_parser = SheetParser()
+
+    print(f"{'columnas':>9} | {'por columna ms':>14} | {'vectorizado ms':>14} | {'speedup':>7} | {'inválidas':>9} | iguales")
+    print("-" * 80)
+    for n_cols in args.cols:
+        rows = sheet_matrix(n_cols, args.malformed)
+
+        legacy, legacy_s = timed(lambda: [d for d in (legacy_extract_column(rows, c)
+                                                      for c in range(1, n_cols + 1)) if d], args.repeat)
+        (history, issues), vector_s = timed(lambda: sheet_parser.parse(rows, 1, n_cols), args.repeat)
+
+        same = history.to_records() == legacy
+        print(f"{n_cols:>9,} | {legacy_s * 1000:>14.1f} | {vector_s * 1000:>14.1f} | "
+              f"{legacy_s / vector_s:>6.1f}x | {len(issues):>9,} | {'✅' if same else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,725 @@
+#!/usr/bin/env python3
+"""
+Harness de grabación y reproducción para pruebas de carga offline
+Graba el tráfico real de HubSpotExtractor, del feed iCal de CalendarExtractor
+y de las llamadas gspread (lectura del sheet y batch_update) en fixtures, y
+los sirve desde un servidor HTTP local con latencia, errores y 429
+configurables, para medir throughput y latencia de cola del pipeline
+completo en una sola máquina y sin red.
+
+Los fixtures guardan URLs y respuestas (nunca los headers del request, así
+que no hay tokens), pero la URL secreta del iCal y los datos de contactos sí
+quedan en disco: benchmarks/fixtures/ está en .gitignore.
+
+Uso:
+    python3 benchmarks/replay.py record --out benchmarks/fixtures/real [--date 2026-01-15] [--no-sheet]
+    python3 benchmarks/replay.py synth --out benchmarks/fixtures/synth [--events 20000 --contacts 5000]
+    python3 benchmarks/replay.py serve benchmarks/fixtures/synth --port 8765 --latency-ms 80
+    python3 benchmarks/replay.py loadtest benchmarks/fixtures/synth --workers 8 --iterations 200 \\
+        --latency-ms 50 --jitter-ms 30 --error-rate 0.01 --throttle-rate 0.02 --rate-limit 100
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import base64
+import random
+import logging
+import argparse
+import platform
+import tempfile
+import threading
+import contextlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, unquote, urlsplit, urlunsplit
+
+import numpy as np
+import pytz
+import gspread
+from requests.adapters import HTTPAdapter
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+import synthetic
+from calendar_extractor import CalendarExtractor
+from main_extractor import HubSpotExtractor
+from runtime import load_config
+from read_sheet_to_json import extract_all_data_until_yesterday, find_yesterday_column
+from sheet_updater import GoogleSheetUpdater
+from utils import configure_http, create_session_with_retries, get_shared_session
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+SCENARIO_FILE = 'scenario.json'
+
+# Headers de respuesta que se graban (el resto no afecta a los extractores)
+FIXTURE_HEADERS = ('content-type', 'etag', 'last-modified', 'retry-after')
+
+# Host original de un request redirigido al servidor local
+REPLAY_HOST_HEADER = 'X-Replay-Host'
+
+STAGES = ['calendar', 'hubspot', 'sheet_read', 'sheet_update']
+
+
+# ----------------------------------------------------------------------
+# Fixtures
+# ----------------------------------------------------------------------
+
+def canonical_body(body):
+    """Cuerpo de un request como valor comparable (JSON parseado si se puede)"""
+    if body in (None, b'', ''):
+        return None
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', errors='replace')
+    if isinstance(body, str):
+        try:
+            return json.loads(body)
+        except ValueError:
+            return body
+    return body
+
+
+def fixture_key(method: str, host: str, path: str, query: list, body) -> str:
+    """Clave de un request: método, host, path, query ordenada y cuerpo canónico"""
+    return json.dumps(
+        [method.upper(), host.lower(), unquote(path), sorted([str(k), str(v)] for k, v in query), body],
+        sort_keys=True, separators=(',', ':'), ensure_ascii=False
+    )
+
+
+class FixtureRecorder:
+    """Escribe cada intercambio en <out_dir>/<servicio>.jsonl"""
+
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        self._lock = threading.Lock()
+        self.counts = defaultdict(int)
+        os.makedirs(out_dir, exist_ok=True)
+        for name in os.listdir(out_dir):
+            if name.endswith('.jsonl'):
+                os.remove(os.path.join(out_dir, name))
+
+    def record(self, service: str, method: str, url: str, params: Optional[dict], body,
+               response, elapsed: float) -> None:
+        split = urlsplit(url)
+        query = parse_qsl(split.query, keep_blank_values=True) + list((params or {}).items())
+        entry = {
+            'method': method.upper(),
+            'host': split.netloc,
+            'path': split.path,
+            'query': [[k, str(v)] for k, v in query],
+            'body': canonical_body(body),
+            'status': response.status_code,
+            'headers': {k: v for k, v in response.headers.items()
+                        if k.lower() in FIXTURE_HEADERS or k.lower().startswith('x-hubspot-ratelimit')},
+            'elapsed_ms': round(elapsed * 1000, 2)
+        }
+        try:
+            entry['text'] = response.content.decode('utf-8')
+        except UnicodeDecodeError:
+            entry['content_b64'] = base64.b64encode(response.content).decode('ascii')
+
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            with open(os.path.join(self.out_dir, f"{service}.jsonl"), 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+            self.counts[service] += 1
+
+    def write_scenario(self, scenario: dict) -> str:
+        path = os.path.join(self.out_dir, SCENARIO_FILE)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(scenario, f, indent=2, ensure_ascii=False)
+        return path
+
+
+class RecordingSession:
+    """
+    Envuelve una sesión (requests o sintética) y graba cada respuesta
+
+    Sirve tanto para las sesiones compartidas de los extractores como para
+    la de gspread, que llama a session.get/post/put con los mismos kwargs.
+    """
+
+    def __init__(self, inner, recorder: FixtureRecorder, service: str):
+        self.inner = inner
+        self.recorder = recorder
+        self.service = service
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def _call(self, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = getattr(self.inner, method)(url, **kwargs)
+        response.content  # descarga completa (también con stream=True) antes de medir
+        elapsed = time.perf_counter() - started
+        body = kwargs.get('json') if kwargs.get('json') is not None else kwargs.get('data')
+        self.recorder.record(self.service, method, url, kwargs.get('params'), body, response, elapsed)
+        return response
+
+    def get(self, url, **kwargs):
+        return self._call('get', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._call('post', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self._call('put', url, **kwargs)
+
+
+def load_fixtures(fixtures_dir: str) -> Dict[str, list]:
+    """{clave: [entradas]} de todos los .jsonl del directorio"""
+    fixtures = defaultdict(list)
+    for name in sorted(os.listdir(fixtures_dir)):
+        if not name.endswith('.jsonl'):
+            continue
+        with open(os.path.join(fixtures_dir, name), 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                if 'content_b64' in entry:
+                    entry['content'] = base64.b64decode(entry.pop('content_b64'))
+                else:
+                    entry['content'] = entry.pop('text').encode('utf-8')
+                # También sin host, para clientes que apuntan directo al servidor (modo serve)
+                for host in (entry['host'], ''):
+                    fixtures[fixture_key(entry['method'], host, entry['path'], entry['query'], entry['body'])].append(entry)
+    return fixtures
+
+
+def load_scenario(fixtures_dir: str) -> dict:
+    with open(os.path.join(fixtures_dir, SCENARIO_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# ----------------------------------------------------------------------
+# Servidor local
+# ----------------------------------------------------------------------
+
+class StandInServer:
+    """
+    Servidor HTTP local que reproduce los fixtures
+
+    Latencia: latency_ms fijos + una cola exponencial de media jitter_ms
+    (o la latencia grabada con recorded_latency). Fallas: error_rate de 503,
+    throttle_rate de 429 con Retry-After, y rate_limit requests/segundo por
+    host (429 al excederlo, con los headers X-HubSpot-RateLimit-Secondly en
+    HubSpot). Responde 304 si el If-None-Match coincide con el ETag grabado.
+    """
+
+    def __init__(self, fixtures: Dict[str, list], host: str = '127.0.0.1', port: int = 0,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, recorded_latency: bool = False,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, retry_after: int = 1,
+                 rate_limit: Optional[int] = None, seed: int = 42):
+        self.fixtures = fixtures
+        self.address = (host, port)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.recorded_latency = recorded_latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.rate_limit = rate_limit
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._cursor = defaultdict(int)
+        self._windows = {}
+        self.stats = defaultdict(int)
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _rate_limited(self, host: str) -> bool:
+        """True si el host ya usó sus rate_limit requests del segundo actual"""
+        if not self.rate_limit:
+            return False
+        second = int(time.monotonic())
+        with self._lock:
+            window, count = self._windows.get(host, (second, 0))
+            if window != second:
+                window, count = second, 0
+            count += 1
+            self._windows[host] = (window, count)
+        return count > self.rate_limit
+
+    def respond(self, method: str, host: str, path: str, query: list, body, headers) -> tuple:
+        """Retorna (status, headers, contenido, segundos de latencia)"""
+        with self._lock:
+            roll_throttle = self._rng.random()
+            roll_error = self._rng.random()
+            jitter = self._rng.expovariate(1 / self.jitter_ms) if self.jitter_ms else 0.0
+
+        response_headers = {}
+        if 'hubapi' in host and self.rate_limit:
+            response_headers['X-HubSpot-RateLimit-Secondly'] = str(self.rate_limit)
+
+        if self._rate_limited(host) or roll_throttle < self.throttle_rate:
+            self._count('throttled')
+            response_headers.update({'Retry-After': str(self.retry_after), 'Content-Type': 'application/json'})
+            if 'hubapi' in host and self.rate_limit:
+                response_headers['X-HubSpot-RateLimit-Secondly-Remaining'] = '0'
+            return 429, response_headers, b'{"status":"error","category":"RATE_LIMITS"}', self.latency_ms / 1000
+        if roll_error < self.error_rate:
+            self._count('errores_inyectados')
+            return 503, {'Content-Type': 'text/plain'}, b'injected error', (self.latency_ms + jitter) / 1000
+
+        key = fixture_key(method, host, path, query, body)
+        entries = self.fixtures.get(key)
+        if not entries:
+            self._count('sin_fixture')
+            return 404, {'Content-Type': 'text/plain'}, f"sin fixture: {method} {host}{path}".encode('utf-8'), 0.0
+
+        with self._lock:
+            entry = entries[self._cursor[key] % len(entries)]
+            self._cursor[key] += 1
+        delay = (entry['elapsed_ms'] if self.recorded_latency else self.latency_ms + jitter) / 1000
+
+        response_headers.update(entry['headers'])
+        etag = entry['headers'].get('ETag') or entry['headers'].get('etag')
+        if etag and headers.get('If-None-Match') == etag:
+            self._count('not_modified')
+            return 304, {'ETag': etag}, b'', delay
+        self._count('servidos')
+        return entry['status'], response_headers, entry['content'], delay
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _serve(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = canonical_body(self.rfile.read(length) if length else None)
+                split = urlsplit(self.path)
+                host = self.headers.get(REPLAY_HOST_HEADER, '')
+                status, headers, content, delay = server.respond(
+                    self.command, host, split.path, parse_qsl(split.query, keep_blank_values=True),
+                    body, self.headers
+                )
+                if delay > 0:
+                    time.sleep(delay)
+                self.send_response(status)
+                for name, value in headers.items():
+                    if name.lower() not in ('content-length', 'transfer-encoding', 'connection'):
+                        self.send_header(name, value)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'StandInServer':
+        self._httpd = ThreadingHTTPServer(self.address, self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class RedirectAdapter(HTTPAdapter):
+    """Adapter de requests que envía todo al servidor local, conservando path, query y host original"""
+
+    def __init__(self, target_url: str, **kwargs):
+        self.target = urlsplit(target_url)
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        original = urlsplit(request.url)
+        request.headers[REPLAY_HOST_HEADER] = original.netloc
+        request.url = urlunsplit((self.target.scheme, self.target.netloc, original.path, original.query, ''))
+        return super().send(request, **kwargs)
+
+
+def redirect_session(session, server_url: str) -> None:
+    """Monta el RedirectAdapter conservando la política de retry y el pool de la sesión"""
+    current = session.get_adapter('https://')
+    adapter = RedirectAdapter(
+        server_url,
+        max_retries=current.max_retries,
+        pool_connections=getattr(current, '_pool_connections', 10),
+        pool_maxsize=getattr(current, '_pool_maxsize', 10)
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+
+# ----------------------------------------------------------------------
+# Pipeline (mismas llamadas al grabar y al reproducir)
+# ----------------------------------------------------------------------
+
+class Pipeline:
+    """
+    Una corrida del pipeline sobre el escenario grabado
+
+    calendar -> hubspot -> lectura del sheet -> batch_update del informe
+    (este último sólo si el escenario lo grabó: nunca se graba una escritura
+    sobre el sheet real).
+    """
+
+    def __init__(self, scenario: dict, calendar_session=None, hubspot_session=None, sheets_client=None,
+                 api_key: str = 'replay-token', client_rate_limit: bool = True):
+        self.scenario = scenario
+        self.calendar_session = calendar_session
+        self.hubspot_session = hubspot_session
+        self.sheets_client = sheets_client
+        self.api_key = api_key
+        self.client_rate_limit = client_rate_limit
+        self.timezone = pytz.timezone(scenario['config']['extraction']['timezone'])
+        self.day = self.timezone.localize(datetime.combine(date.fromisoformat(scenario['fecha']),
+                                                           datetime.min.time()))
+
+    def _calendar(self, result: dict):
+        extractor = CalendarExtractor(self.scenario['config'])
+        if self.calendar_session is not None:
+            extractor.session = self.calendar_session
+        result['reuniones'] = extractor.extract_events(self.day)
+
+    def _hubspot(self, result: dict):
+        extractor = HubSpotExtractor(self.api_key, self.scenario['hubspot']['account_id'],
+                                     timezone=self.timezone.zone)
+        if self.hubspot_session is not None:
+            extractor.session = self.hubspot_session
+        if not self.client_rate_limit:
+            extractor.rate_limiter = None
+        result['leads_creados'] = extractor.get_contacts_created(self.day)
+        if self.scenario['hubspot'].get('rango'):
+            start, end = (date.fromisoformat(d) for d in self.scenario['hubspot']['rango'])
+            result['leads_rango'] = sum(extractor.get_contacts_created_range(start, end).values())
+
+    def _sheet_read(self, result: dict):
+        sheet = self.scenario['sheet']
+        worksheet = self.sheets_client.open_by_key(sheet['id']).worksheet(sheet['worksheet'])
+        rows = worksheet.get_all_values()
+        history = extract_all_data_until_yesterday(rows, find_yesterday_column(rows, self.day))
+        result['dias_sheet'] = len(history)
+
+    def _sheet_update(self, result: dict):
+        sheet = self.scenario['sheet']
+        updater = GoogleSheetUpdater(
+            {'google_sheets': {'informe_diario_id': sheet['id'], 'worksheet_name': sheet['worksheet']}},
+            client=self.sheets_client
+        )
+        hubspot_data = {'leads_creados': result.get('leads_creados') or 0}
+        if not updater.update_days([(self.day, result.get('reuniones') or {}, hubspot_data)]):
+            raise RuntimeError("batch_update falló")
+
+    def stages(self) -> list:
+        stages = [('calendar', self._calendar), ('hubspot', self._hubspot)]
+        if self.scenario.get('sheet') and self.sheets_client is not None:
+            stages.append(('sheet_read', self._sheet_read))
+            if self.scenario['sheet'].get('update'):
+                stages.append(('sheet_update', self._sheet_update))
+        return stages
+
+    def run(self) -> dict:
+        """{'etapas': {etapa: segundos}, 'errores': {etapa: mensaje}, 'resultado': {...}}"""
+        timings = {}
+        errors = {}
+        result = {}
+        started = time.perf_counter()
+        for name, stage in self.stages():
+            stage_started = time.perf_counter()
+            try:
+                stage(result)
+            except Exception as e:
+                errors[name] = f"{type(e).__name__}: {e}"
+            timings[name] = time.perf_counter() - stage_started
+        timings['total'] = time.perf_counter() - started
+        return {'etapas': timings, 'errores': errors, 'resultado': result}
+
+
+# ----------------------------------------------------------------------
+# Comandos
+# ----------------------------------------------------------------------
+
+def record_real(out_dir: str, day: date, range_days: int, with_sheet: bool) -> dict:
+    """Graba una corrida contra HubSpot, el iCal y el sheet reales (sólo lecturas)"""
+    config = load_config()
+    configure_http(config.get('http'))
+    recorder = FixtureRecorder(out_dir)
+
+    scenario = {
+        'origen': 'real',
+        'fecha': day.isoformat(),
+        'config': {
+            'google_calendar': {**config['google_calendar'], 'cache_enabled': False},
+            'extraction': {'timezone': config['extraction']['timezone']}
+        },
+        'hubspot': {
+            'account_id': config['hubspot']['account_id'],
+            'rango': [(day - timedelta(days=range_days - 1)).isoformat(), day.isoformat()] if range_days else None
+        },
+        'sheet': None
+    }
+
+    sheets_client = None
+    if with_sheet:
+        from read_sheet_to_json import Credentials, SCOPES, SHEET_ID, SHEET_NAME
+        creds = Credentials.from_service_account_file('config/google_credentials.json', scopes=SCOPES)
+        sheets_client = gspread.authorize(creds)
+        sheets_client.session = RecordingSession(sheets_client.session, recorder, 'sheets')
+        scenario['sheet'] = {'id': SHEET_ID, 'worksheet': SHEET_NAME, 'update': False}
+
+    pipeline = Pipeline(
+        scenario,
+        calendar_session=RecordingSession(get_shared_session('calendar'), recorder, 'calendar'),
+        hubspot_session=RecordingSession(get_shared_session('hubspot'), recorder, 'hubspot'),
+        sheets_client=sheets_client,
+        api_key=config['hubspot']['api_key']
+    )
+    return _finish_recording(recorder, scenario, pipeline)
+
+
+def record_synthetic(out_dir: str, day: date, events: int, contacts: int, sheet_cols: int,
+                     range_days: int, seed: int = 42) -> dict:
+    """Graba una corrida contra los generadores sintéticos (sin red ni credenciales)"""
+    recorder = FixtureRecorder(out_dir)
+    sheet_id = 'synthetic-sheet'
+    scenario = {
+        'origen': 'sintetico',
+        'fecha': day.isoformat(),
+        'config': {
+            'google_calendar': {**synthetic.BENCH_CONFIG['google_calendar'],
+                                'ical_url': 'https://calendar.synthetic/feed.ics'},
+            'extraction': dict(synthetic.BENCH_CONFIG['extraction'])
+        },
+        'hubspot': {
+            'account_id': 'synthetic',
+            'rango': [(day - timedelta(days=range_days - 1)).isoformat(), day.isoformat()] if range_days else None
+        },
+        'sheet': {'id': sheet_id, 'worksheet': 'ACT comercial', 'update': True}
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        feed = synthetic.write_ical_feed(os.path.join(tmp, 'feed.ics'), events,
+                                         start=day - timedelta(days=182), seed=seed)
+        rows = synthetic.sheet_matrix(sheet_cols, start=day - timedelta(days=sheet_cols - 1), seed=seed)
+        hubspot = synthetic.SyntheticHubSpotSession(
+            synthetic.hubspot_contacts(contacts, day - timedelta(days=30), 60, seed=seed))
+        sheets_client = gspread.Client(None, session=RecordingSession(
+            synthetic.SyntheticSheetsSession(rows, sheet_id), recorder, 'sheets'))
+
+        pipeline = Pipeline(
+            scenario,
+            calendar_session=RecordingSession(synthetic.SyntheticFeedSession(feed['path']), recorder, 'calendar'),
+            hubspot_session=RecordingSession(hubspot, recorder, 'hubspot'),
+            sheets_client=sheets_client,
+            client_rate_limit=False
+        )
+        return _finish_recording(recorder, scenario, pipeline)
+
+
+def _finish_recording(recorder: FixtureRecorder, scenario: dict, pipeline: Pipeline) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        run = pipeline.run()
+    if run['errores']:
+        for stage, error in run['errores'].items():
+            print(f"❌ {stage}: {error}")
+        sys.exit(1)
+
+    scenario['esperado'] = run['resultado']
+    recorder.write_scenario(scenario)
+    print(f"💾 Fixtures en {recorder.out_dir}: " +
+          ", ".join(f"{service} {n} requests" for service, n in sorted(recorder.counts.items())))
+    return scenario
+
+
+def percentiles(values: list) -> dict:
+    data = np.array(values) * 1000
+    return {
+        'n': len(values),
+        'media_ms': round(float(data.mean()), 2),
+        'p50_ms': round(float(np.percentile(data, 50)), 2),
+        'p90_ms': round(float(np.percentile(data, 90)), 2),
+        'p99_ms': round(float(np.percentile(data, 99)), 2),
+        'max_ms': round(float(data.max()), 2)
+    }
+
+
+def loadtest(fixtures_dir: str, workers: int, iterations: int, warmup: int,
+             client_rate_limit: bool, server_options: dict) -> dict:
+    """Corre `iterations` pipelines con `workers` threads contra el servidor local"""
+    scenario = load_scenario(fixtures_dir)
+    fixtures = load_fixtures(fixtures_dir)
+
+    with StandInServer(fixtures, **server_options) as server:
+        configure_http({'pool_maxsize': max(10, workers)})
+        for service in ('calendar', 'hubspot'):
+            redirect_session(get_shared_session(service), server.url)
+        sheets_session = create_session_with_retries(pool_maxsize=max(10, workers))
+        redirect_session(sheets_session, server.url)
+        sheets_client = gspread.Client(None, session=sheets_session)
+
+        pipeline = Pipeline(scenario, sheets_client=sheets_client, client_rate_limit=client_rate_limit)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(warmup):
+                pipeline.run()
+            server.stats.clear()
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                runs = list(executor.map(lambda _: pipeline.run(), range(iterations)))
+            wall = time.perf_counter() - started
+        server_stats = dict(server.stats)
+
+    expected = scenario.get('esperado')
+    summary = {}
+    for stage in STAGES + ['total']:
+        values = [run['etapas'][stage] for run in runs if stage in run['etapas']]
+        if not values:
+            continue
+        summary[stage] = percentiles(values)
+        summary[stage]['errores'] = sum(1 for run in runs if stage in run['errores'])
+
+    failed = [run for run in runs if run['errores']]
+    return {
+        'escenario': {'origen': scenario.get('origen'), 'fecha': scenario['fecha']},
+        'workers': workers,
+        'iteraciones': iterations,
+        'segundos': round(wall, 3),
+        'pipelines_por_segundo': round(iterations / wall, 2) if wall else None,
+        'pipelines_fallidos': len(failed),
+        'resultados_distintos': sum(1 for run in runs if not run['errores'] and expected
+                                    and run['resultado'] != expected),
+        'ejemplos_error': sorted({error for run in failed for error in run['errores'].values()})[:5],
+        'etapas': summary,
+        'servidor': server_stats
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"\n🏁 {report['iteraciones']} pipelines, {report['workers']} workers: "
+          f"{report['segundos']:.2f}s ({report['pipelines_por_segundo']} pipelines/s)")
+    print(f"   {'etapa':<14} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9} {'errores':>8}")
+    for stage, stats in report['etapas'].items():
+        print(f"   {stage:<14} {stats['p50_ms']:>7.1f}ms {stats['p90_ms']:>7.1f}ms "
+              f"{stats['p99_ms']:>7.1f}ms {stats['max_ms']:>7.1f}ms {stats['errores']:>8}")
+    print(f"   Servidor: " + ", ".join(f"{k} {v}" for k, v in sorted(report['servidor'].items())))
+    if report['pipelines_fallidos'] or report['resultados_distintos']:
+        print(f"   ⚠️ Fallidos: {report['pipelines_fallidos']} | "
+              f"Resultados distintos a la grabación: {report['resultados_distintos']}")
+        for error in report['ejemplos_error']:
+            print(f"      {error}")
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('fixtures', help="Directorio con los fixtures y scenario.json")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Latencia fija por respuesta")
+    parser.add_argument('--jitter-ms', type=float, default=0.0,
+                        help="Media de la latencia extra exponencial (cola)")
+    parser.add_argument('--recorded-latency', action='store_true', help="Usar la latencia grabada")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fracción de respuestas 503")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Fracción de respuestas 429")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After de los 429 (segundos enteros)")
+    parser.add_argument('--rate-limit', type=int, help="Requests por segundo por host antes de responder 429")
+    parser.add_argument('--seed', type=int, default=42)
+
+
+def server_options(args: argparse.Namespace) -> dict:
+    return {
+        'latency_ms': args.latency_ms,
+        'jitter_ms': args.jitter_ms,
+        'recorded_latency': args.recorded_latency,
+        'error_rate': args.error_rate,
+        'throttle_rate': args.throttle_rate,
+        'retry_after': args.retry_after,
+        'rate_limit': args.rate_limit,
+        'seed': args.seed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help="Graba tráfico real (requiere config y credenciales)")
+    record.add_argument('--out', required=True)
+    record.add_argument('--date', type=date.fromisoformat, default=date.today() - timedelta(days=1))
+    record.add_argument('--range-days', type=int, default=7, help="Días del rango de HubSpot (0 = sin rango)")
+    record.add_argument('--no-sheet', action='store_true', help="No grabar el Google Sheet")
+
+    synth = commands.add_parser('synth', help="Genera fixtures desde la carga sintética")
+    synth.add_argument('--out', required=True)
+    synth.add_argument('--date', type=date.fromisoformat, default=date(2024, 6, 15))
+    synth.add_argument('--events', type=int, default=20000)
+    synth.add_argument('--contacts', type=int, default=5000)
+    synth.add_argument('--sheet-cols', type=int, default=2000)
+    synth.add_argument('--range-days', type=int, default=7)
+
+    serve = commands.add_parser('serve', help="Sólo levanta el servidor local")
+    add_server_arguments(serve)
+    serve.add_argument('--port', type=int, default=8765)
+
+    load = commands.add_parser('loadtest', help="Mide throughput y latencia del pipeline contra el servidor local")
+    add_server_arguments(load)
+    load.add_argument('--workers', type=int, default=4)
+    load.add_argument('--iterations', type=int, default=50)
+    load.add_argument('--warmup', type=int, default=1)
+    load.add_argument('--no-client-limit', action='store_true',
+                      help="Desactivar el token bucket de HubSpot del cliente")
+    load.add_argument('--output', help="Resultados (default: benchmarks/results/replay_<fecha>.json)")
+
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    if args.command == 'record':
+        record_real(args.out, args.date, args.range_days, not args.no_sheet)
+    elif args.command == 'synth':
+        record_synthetic(args.out, args.date, args.events, args.contacts, args.sheet_cols, args.range_days)
+    elif args.command == 'serve':
+        server = StandInServer(load_fixtures(args.fixtures), port=args.port, **server_options(args)).start()
+        print(f"🛰️  Sirviendo {args.fixtures} en {server.url} (Ctrl+C para terminar)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.stop()
+    else:
+        started = datetime.now()
+        report = loadtest(args.fixtures, args.workers, args.iterations, args.warmup,
+                          not args.no_client_limit, server_options(args))
+        report.update({
+            'fecha': started.isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'servidor_config': server_options(args)
+        })
+        print_report(report)
+
+        output = args.output or os.path.join(RESULTS_DIR, f"replay_{started.strftime('%Y%m%d_%H%M%S')}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks de carga sintética para cada etapa del pipeline
+Calendar (índice completo y streaming), lectura del sheet, paginación de
+HubSpot (con y sin cache) y publicación de JSON. Todo offline; los resultados
+se guardan en JSON para comparar ejecuciones y detectar regresiones.
+
+Uso:
+    python3 benchmarks/run_benchmarks.py [--quick] [--output resultados.json]
+    python3 benchmarks/run_benchmarks.py --compare benchmarks/results/anterior.json [--threshold 0.2]
+    python3 benchmarks/run_benchmarks.py --calendar-sizes 1000 100000 1000000 --max-full 100000
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import argparse
+import tempfile
+import subprocess
+import contextlib
+from datetime import datetime, date, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+import synthetic
+from calendar_extractor import CalendarExtractor
+from main_extractor import HubSpotExtractor
+from read_sheet_to_json import extract_all_data_until_yesterday
+from rollups import build_rollups
+from publish import write_variants
+from response_cache import ResponseCache
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+DEFAULT_SIZES = {
+    'calendar': [1000, 10000, 100000],
+    'sheet': [365, 2000, 10000],
+    'hubspot': [1000, 10000, 50000],
+    'json': [365, 2000, 10000],
+}
+QUICK_SIZES = {
+    'calendar': [1000, 10000],
+    'sheet': [365, 2000],
+    'hubspot': [1000, 10000],
+    'json': [365, 2000],
+}
+
+
+def measure(func, repeat: int, setup=None):
+    """Mejor tiempo de `repeat` ejecuciones (setup corre antes de cada una, fuera del tiempo)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def record(results: list, etapa: str, tamano: int, unidad: str, segundos: float, **extra):
+    entry = {
+        'etapa': etapa,
+        'tamano': tamano,
+        'unidad': unidad,
+        'segundos': round(segundos, 6),
+        'por_segundo': round(tamano / segundos, 1) if segundos else None,
+        **extra
+    }
+    results.append(entry)
+    print(f"   {etapa:<20} {tamano:>10,} {unidad:<9} {segundos * 1000:>10.1f} ms "
+          f"{entry['por_segundo'] or 0:>14,.0f} {unidad}/s")
+
+
+# ----------------------------------------------------------------------
+# Etapas
+# ----------------------------------------------------------------------
+
+def bench_calendar(results: list, sizes: list, repeat: int, max_full: int, tmp: str):
+    """CalendarExtractor.extract_events de un día, con índice completo y en streaming"""
+    for n in sizes:
+        feed = synthetic.write_ical_feed(os.path.join(tmp, f"feed_{n}.ics"), n)
+        day = datetime.combine(feed['desde'] + (feed['hasta'] - feed['desde']) / 2, datetime.min.time())
+
+        def read_feed(url=None):
+            with open(feed['path'], 'rb') as f:
+                return f.read()
+
+        if n <= max_full:
+            extractor = None
+
+            def fresh_extractor():
+                nonlocal extractor
+                extractor = CalendarExtractor(synthetic.BENCH_CONFIG)
+                extractor.fetch_feed = read_feed
+
+            seconds, _ = measure(lambda: extractor.extract_events(day), repeat, setup=fresh_extractor)
+            record(results, 'calendar_index', n, 'eventos', seconds, feed_bytes=feed['bytes'])
+
+        streaming = CalendarExtractor(synthetic.BENCH_CONFIG)
+        streaming.streaming = True
+        streaming.iter_feed_chunks = lambda chunk_size=65536, url=None: synthetic.file_chunks(feed['path'], chunk_size)
+        seconds, _ = measure(lambda: streaming.extract_events(day), repeat)
+        record(results, 'calendar_streaming', n, 'eventos', seconds, feed_bytes=feed['bytes'])
+
+
+def bench_sheet(results: list, sizes: list, repeat: int):
+    """extract_all_data_until_yesterday sobre una matriz de n columnas"""
+    for n in sizes:
+        rows = synthetic.sheet_matrix(n, malformed_rate=0.001)
+        with contextlib.redirect_stdout(io.StringIO()):
+            seconds, history = measure(lambda: extract_all_data_until_yesterday(rows, n), repeat)
+        record(results, 'sheet_parse', n, 'columnas', seconds, dias=len(history))
+
+
+def bench_hubspot(results: list, sizes: list, repeat: int, tmp: str):
+    """
+    HubSpotExtractor.get_contacts_created_range paginando la búsqueda (límite de
+    10.000 incluido), y la misma consulta respondida desde el cache en disco
+    """
+    start = date(2025, 1, 1)
+    days = 90
+    for n in sizes:
+        session = synthetic.SyntheticHubSpotSession(synthetic.hubspot_contacts(n, start, days))
+        extractor = HubSpotExtractor('bench-token', 'bench')
+        extractor.session = session
+        extractor.rate_limiter = None  # mide al cliente, no el límite de la API
+        end = start + timedelta(days=days - 1)
+
+        # Primera pasada fuera del tiempo: deja las páginas codificadas
+        extractor.get_contacts_created_range(start, end)
+        session.requests = 0
+        seconds, counts = measure(lambda: extractor.get_contacts_created_range(start, end), repeat)
+        record(results, 'hubspot_paging', n, 'contactos', seconds,
+               requests=session.requests // repeat, contados=sum(counts.values()))
+
+        # Días antiguos: la primera pasada llena el cache y las siguientes no hacen requests
+        extractor.cache = ResponseCache(os.path.join(tmp, f"hubspot_cache_{n}"))
+        extractor.get_contacts_created_range(start, end)
+        session.requests = 0
+        seconds, counts = measure(lambda: extractor.get_contacts_created_range(start, end), repeat)
+        record(results, 'hubspot_cached', n, 'contactos', seconds,
+               requests=session.requests // repeat, contados=sum(counts.values()))
+
+
+def bench_json(results: list, sizes: list, repeat: int, tmp: str):
+    """build_rollups y write_variants (pretty + min) de un histórico de n días"""
+    for n in sizes:
+        rows = synthetic.sheet_matrix(n)
+        with contextlib.redirect_stdout(io.StringIO()):
+            history = extract_all_data_until_yesterday(rows, n)
+        records = history.to_records()
+        data = {
+            'fecha_actualizacion': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'fecha_ultimo_dato': records[-1]['fecha'],
+            'total_dias': len(records),
+            'datos': records
+        }
+
+        seconds, _ = measure(lambda: build_rollups(history), repeat)
+        record(results, 'rollups', n, 'dias', seconds)
+
+        base = os.path.join(tmp, f"latest_{n}")
+
+        def remove_previous():
+            # Sin archivos previos para medir la escritura completa (no el salto por hash)
+            for name in os.listdir(tmp):
+                if name.startswith(f"latest_{n}."):
+                    os.remove(os.path.join(tmp, name))
+
+        seconds, sizes_written = measure(lambda: write_variants(data, base), repeat, setup=remove_previous)
+        record(results, 'json_output', n, 'dias', seconds, bytes=sum(sizes_written.values()))
+
+
+# ----------------------------------------------------------------------
+# Resultados
+# ----------------------------------------------------------------------
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results: list, baseline_path: str, threshold: float) -> int:
+    """Compara contra una ejecución anterior; retorna la cantidad de regresiones"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['etapa'], r['tamano']): r for r in json.load(f)['resultados']}
+
+    print(f"\n📊 Comparación contra {baseline_path} (umbral {threshold:.0%})")
+    regressions = 0
+    for entry in results:
+        previous = baseline.get((entry['etapa'], entry['tamano']))
+        if not previous or not previous['segundos']:
+            continue
+        ratio = entry['segundos'] / previous['segundos']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '❌ regresión'
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = '✅ mejora'
+        print(f"   {entry['etapa']:<20} {entry['tamano']:>10,} {previous['segundos'] * 1000:>10.1f} ms → "
+              f"{entry['segundos'] * 1000:>10.1f} ms ({ratio - 1:+.0%}) {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help="Tamaños reducidos (smoke test)")
+    parser.add_argument('--stages', nargs='+', choices=list(DEFAULT_SIZES), default=list(DEFAULT_SIZES))
+    parser.add_argument('--calendar-sizes', type=int, nargs='+')
+    parser.add_argument('--sheet-cols', type=int, nargs='+')
+    parser.add_argument('--hubspot-sizes', type=int, nargs='+')
+    parser.add_argument('--json-days', type=int, nargs='+')
+    parser.add_argument('--max-full', type=int, default=100000,
+                        help="Máximo de eventos para el modo índice completo (el streaming corre siempre)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="Archivo de resultados (default: benchmarks/results/bench_<fecha>.json)")
+    parser.add_argument('--compare', help="Resultados anteriores contra los que comparar")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Variación relativa que cuenta como regresión (default 0.2)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    sizes = dict(QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    for stage, override in (('calendar', args.calendar_sizes), ('sheet', args.sheet_cols),
+                            ('hubspot', args.hubspot_sizes), ('json', args.json_days)):
+        if override:
+            sizes[stage] = override
+
+    started = datetime.now()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        if 'calendar' in args.stages:
+            print("📅 Calendar")
+            bench_calendar(results, sizes['calendar'], args.repeat, args.max_full, tmp)
+        if 'sheet' in args.stages:
+            print("📊 Sheet")
+            bench_sheet(results, sizes['sheet'], args.repeat)
+        if 'hubspot' in args.stages:
+            print("🔶 HubSpot")
+            bench_hubspot(results, sizes['hubspot'], args.repeat, tmp)
+        if 'json' in args.stages:
+            print("📦 JSON")
+            bench_json(results, sizes['json'], args.repeat, tmp)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_{started.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'fecha': started.isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'repeticiones': args.repeat,
+            'resultados': results
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Resultados guardados en: {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
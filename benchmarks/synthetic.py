@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Generadores de carga sintética para los benchmarks
+Feeds iCal, matrices del sheet "ACT comercial" y respuestas de la búsqueda
+de contactos de HubSpot y de la API de Sheets, todo determinístico (semilla) y sin red
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+import os
+import sys
+import json
+import bisect
+import random
+import hashlib
+from datetime import datetime, timedelta, date, timezone
+from urllib.parse import unquote, urlsplit
+
+import requests
+from gspread.utils import a1_range_to_grid_range
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from sheet_parser import ROW_SPEC, DATE_ROW
+
+ROBOT_TITLE = 'Asesoría Inmobiliaria'
+HUMAN_TITLE = 'Reunion'
+
+# Config mínima para instanciar los extractores sin config.yaml
+BENCH_CONFIG = {
+    'google_calendar': {
+        'ical_url': 'http://localhost/bench.ics',
+        'color_mapping': {'8': 'Teresa', '2': 'Daniela', '9': 'Azul'},
+        'no_show_colors': ['6', '11'],
+        'robot_title_pattern': ROBOT_TITLE,
+        'human_title_pattern': HUMAN_TITLE,
+        'cache_enabled': False
+    },
+    'extraction': {'timezone': 'America/Santiago', 'days_back': 1}
+}
+
+# (color, títulos, peso) según las reglas de setter_rules derivadas de BENCH_CONFIG:
+# 2 = Daniela, 8 = Teresa, 9 = Matias / Robot según el título, 6 y 11 = no-show
+# (sólo los del robot se atribuyen; un no-show con título humano queda sin setter)
+CALENDAR_COLORS = [
+    ('2', [f"{HUMAN_TITLE} con cliente", f"{HUMAN_TITLE} seguimiento"], 25),
+    ('8', [f"{HUMAN_TITLE} con cliente", f"{HUMAN_TITLE} seguimiento"], 25),
+    ('9', [f"{HUMAN_TITLE} con cliente"], 15),
+    ('9', [f"{ROBOT_TITLE} - Lead web", f"{ROBOT_TITLE} - Formulario"], 25),
+    ('6', [f"{HUMAN_TITLE} con cliente"], 5),
+    ('11', [f"{ROBOT_TITLE} - Lead web"], 5),
+]
+
+SHEET_ROWS = 25
+SHEET_JUNK = ['-', 'n/a', '#REF!', '1,5', '??']
+
+
+# ----------------------------------------------------------------------
+# Google Calendar
+# ----------------------------------------------------------------------
+
+def write_ical_feed(path: str, n_events: int, days: int = 365, start: date = date(2024, 1, 1),
+                    recurring_rate: float = 0.001, seed: int = 42) -> dict:
+    """
+    Escribe un feed iCal con n_events VEVENTs repartidos en `days` días
+
+    Los eventos se escriben a medida que se generan (un feed de 1M de eventos
+    no se arma en memoria). Una fracción recurring_rate son series semanales.
+
+    Returns:
+        {'path', 'eventos', 'bytes', 'desde', 'hasta'}
+    """
+    rng = random.Random(seed)
+    colors = [(color, titles) for color, titles, weight in CALENDAR_COLORS for _ in range(weight)]
+    per_day = max(n_events / days, 1e-9)
+    origin = datetime(start.year, start.month, start.day, 12, 0, tzinfo=timezone.utc)
+
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//revops-bench//ES\r\n")
+        for i in range(n_events):
+            # Horario hábil de Santiago (12:00-23:00 UTC) del día correspondiente
+            dt = origin + timedelta(days=int(i / per_day), minutes=rng.randrange(0, 11 * 60, 15))
+            color, titles = rng.choice(colors)
+            f.write("BEGIN:VEVENT\r\n")
+            f.write(f"UID:bench-{i}@are\r\n")
+            f.write(f"DTSTART:{dt.strftime('%Y%m%dT%H%M%S')}Z\r\n")
+            f.write(f"DTEND:{(dt + timedelta(minutes=30)).strftime('%Y%m%dT%H%M%S')}Z\r\n")
+            f.write(f"SUMMARY:{rng.choice(titles)} #{i}\r\n")
+            f.write(f"COLOR:{color}\r\n")
+            if recurring_rate and rng.random() < recurring_rate:
+                f.write("RRULE:FREQ=WEEKLY;COUNT=8\r\n")
+            f.write("END:VEVENT\r\n")
+        f.write("END:VCALENDAR\r\n")
+
+    return {
+        'path': path,
+        'eventos': n_events,
+        'bytes': os.path.getsize(path),
+        'desde': start,
+        'hasta': start + timedelta(days=days - 1)
+    }
+
+
+def file_chunks(path: str, chunk_size: int = 65536):
+    """Lee un archivo por bloques (reemplazo offline de CalendarExtractor.iter_feed_chunks)"""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+# ----------------------------------------------------------------------
+# Google Sheet "ACT comercial"
+# ----------------------------------------------------------------------
+
+def sheet_matrix(n_cols: int, malformed_rate: float = 0.0, start: date = date(2020, 1, 1),
+                 seed: int = 42) -> list:
+    """
+    Matriz como la de get_all_values(): etiqueta en la columna 0 y un día por columna
+
+    Los valores respetan el formato del sheet (enteros, CLP '$1.234.567',
+    decimales '$1234,56'); malformed_rate es la fracción de celdas inválidas.
+    """
+    rng = random.Random(seed)
+    rows = [[''] for _ in range(SHEET_ROWS)]
+    rows[DATE_ROW][0] = 'Fecha'
+    kinds = {row_index: kind for row_index, _, kind in ROW_SPEC}
+
+    for col in range(n_cols):
+        rows[DATE_ROW].append((start + timedelta(days=col)).strftime('%d/%m/%Y'))
+        for row_index in range(SHEET_ROWS):
+            if row_index == DATE_ROW:
+                continue
+            kind = kinds.get(row_index)
+            if kind is None:
+                value = ''
+            elif malformed_rate and rng.random() < malformed_rate:
+                value = rng.choice(SHEET_JUNK)
+            elif kind == 'money':
+                value = f"${rng.randint(0, 2_000_000):,}".replace(',', '.')
+            elif kind == 'decimal':
+                value = f"${rng.randint(0, 90_000)},{rng.randint(0, 99):02d}"
+            else:
+                value = '' if rng.random() < 0.05 else str(rng.randint(0, 60))
+            rows[row_index].append(value)
+    return rows
+
+
+# ----------------------------------------------------------------------
+# HubSpot
+# ----------------------------------------------------------------------
+
+def hubspot_contacts(n_contacts: int, start: date, days: int, burst_rate: float = 0.02,
+                     seed: int = 42) -> list:
+    """
+    Contactos ordenados por createdate (epoch ms, id) en [start, start + days)
+
+    Una fracción burst_rate comparte el createdate del anterior, como en una
+    importación masiva, para ejercitar el reinicio en el límite de 10.000.
+    """
+    rng = random.Random(seed)
+    first_ms = int(datetime(start.year, start.month, start.day, tzinfo=timezone.utc).timestamp() * 1000)
+    span_ms = days * 86400 * 1000
+
+    stamps = sorted(first_ms + rng.randrange(span_ms) for _ in range(n_contacts))
+    for i in range(1, n_contacts):
+        if rng.random() < burst_rate:
+            stamps[i] = stamps[i - 1]
+    return [(ts, str(100000 + i)) for i, ts in enumerate(stamps)]
+
+
+def _iso_ms(ts: int) -> str:
+    return datetime.fromtimestamp(ts / 1000, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+class SyntheticResponse:
+    """Respuesta mínima compatible con requests.Response"""
+
+    def __init__(self, status_code: int, body: bytes, headers: dict = None):
+        self.status_code = status_code
+        self.content = body
+        self.headers = headers or {'Content-Type': 'application/json'}
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: int = 65536):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} synthetic error", response=self)
+
+    def close(self):
+        pass
+
+
+class SyntheticHubSpotSession:
+    """
+    Sirve /crm/v3/objects/contacts/search sobre una lista de contactos en memoria
+
+    Respeta el filtro createdate GTE/LT, el orden ascendente, el cursor `after`
+    y el límite de 10.000 resultados por búsqueda (400 si se pide más allá).
+    Las páginas se codifican una sola vez, así que una segunda pasada sólo
+    mide al cliente (paginación, json.loads y agrupación por día).
+    """
+
+    RESULTS_CAP = 10000
+
+    def __init__(self, contacts: list):
+        self.contacts = contacts
+        self.stamps = [ts for ts, _ in contacts]
+        self.requests = 0
+        self._pages = {}
+
+    def post(self, url, headers=None, json=None, timeout=None, **kwargs):
+        self.requests += 1
+        filters = {f['operator']: int(f['value']) for f in json['filterGroups'][0]['filters']}
+        limit = json.get('limit', 10)
+        offset = int(json.get('after') or 0)
+        key = (filters.get('GTE'), filters.get('LT'), limit, offset)
+
+        if key not in self._pages:
+            if offset + limit > self.RESULTS_CAP:
+                self._pages[key] = SyntheticResponse(400, b'{"status":"error","message":"offset limit"}')
+            else:
+                lo = bisect.bisect_left(self.stamps, filters.get('GTE', 0))
+                hi = bisect.bisect_left(self.stamps, filters.get('LT', 2 ** 62))
+                page = self.contacts[lo + offset:min(lo + offset + limit, hi)]
+                data = {
+                    'total': hi - lo,
+                    'results': [
+                        {'id': contact_id, 'properties': {'createdate': _iso_ms(ts)}, 'archived': False}
+                        for ts, contact_id in page
+                    ]
+                }
+                if lo + offset + limit < hi:
+                    data['paging'] = {'next': {'after': str(offset + limit)}}
+                self._pages[key] = SyntheticResponse(200, _json_bytes(data))
+        return self._pages[key]
+
+    def get(self, url, **kwargs):
+        # Como la API real ante un método no soportado: el cliente ve un error HTTP
+        self.requests += 1
+        return SyntheticResponse(405, b'{"status":"error","message":"SyntheticHubSpotSession solo sirve la busqueda (POST)"}')
+
+
+class SyntheticFeedSession:
+    """Sirve un feed iCal escrito por write_ical_feed (GET, con ETag)"""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.body = f.read()
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:16]}"'
+        self.requests = 0
+
+    def get(self, url, headers=None, timeout=None, stream=False, **kwargs):
+        self.requests += 1
+        if (headers or {}).get('If-None-Match') == self.etag:
+            return SyntheticResponse(304, b'', {'ETag': self.etag})
+        return SyntheticResponse(200, self.body, {'Content-Type': 'text/calendar; charset=utf-8',
+                                                  'ETag': self.etag})
+
+
+class SyntheticSheetsSession:
+    """
+    Sirve la API de Sheets v4 que usa gspread sobre una matriz en memoria
+
+    Metadata del spreadsheet (open_by_key / worksheet), values.get de
+    rangos A1 (hoja completa, 'A2:2', 'B1:ZZ25'...), recortando las celdas
+    vacías al final como la API real, y values:batchUpdate.
+    """
+
+    def __init__(self, rows: list, spreadsheet_id: str, title: str = 'ACT comercial'):
+        self.rows = rows
+        self.spreadsheet_id = spreadsheet_id
+        self.title = title
+        self.requests = 0
+
+    def _metadata(self) -> dict:
+        return {
+            'spreadsheetId': self.spreadsheet_id,
+            'properties': {'title': 'Synthetic', 'locale': 'es_CL', 'timeZone': 'America/Santiago'},
+            'sheets': [{'properties': {
+                'sheetId': 0, 'title': self.title, 'index': 0, 'sheetType': 'GRID',
+                'gridProperties': {'rowCount': len(self.rows),
+                                   'columnCount': max((len(r) for r in self.rows), default=0)}
+            }}]
+        }
+
+    def _values(self, a1_range: str) -> dict:
+        sheet, _, cells = a1_range.partition('!')
+        rows = self.rows
+        if cells:
+            grid = a1_range_to_grid_range(cells)
+            rows = [row[grid.get('startColumnIndex', 0):grid.get('endColumnIndex')]
+                    for row in rows[grid.get('startRowIndex', 0):grid.get('endRowIndex')]]
+        values = [list(row) for row in rows]
+        for row in values:
+            while row and row[-1] == '':
+                row.pop()
+        while values and not values[-1]:
+            values.pop()
+        return {'range': a1_range, 'majorDimension': 'ROWS', 'values': values}
+
+    def get(self, url, params=None, **kwargs):
+        self.requests += 1
+        path = unquote(urlsplit(url).path)
+        prefix = f"/v4/spreadsheets/{self.spreadsheet_id}"
+        if path == prefix:
+            return SyntheticResponse(200, _json_bytes(self._metadata()))
+        if path.startswith(prefix + '/values/'):
+            return SyntheticResponse(200, _json_bytes(self._values(path[len(prefix + '/values/'):])))
+        return SyntheticResponse(404, b'{"error":{"code":404,"message":"not found"}}')
+
+    def post(self, url, json=None, **kwargs):
+        """values:batchUpdate (no modifica la matriz, así una re-ejecución envía lo mismo)"""
+        self.requests += 1
+        path = unquote(urlsplit(url).path)
+        if path != f"/v4/spreadsheets/{self.spreadsheet_id}/values:batchUpdate":
+            return SyntheticResponse(404, b'{"error":{"code":404,"message":"not found"}}')
+        data = (json or {}).get('data', [])
+        return SyntheticResponse(200, _json_bytes({
+            'spreadsheetId': self.spreadsheet_id,
+            'totalUpdatedRanges': len(data),
+            'totalUpdatedCells': sum(len(row) for item in data for row in item.get('values', []))
+        }))
+
+
+def _json_bytes(data) -> bytes:
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
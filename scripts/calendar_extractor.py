@@ -10,33 +10,69 @@ Fecha: Enero 2026
 
 import os
 import sys
-import yaml
+import json
+import time
 import logging
-import requests
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from collections import defaultdict
+from typing import Callable, List, Optional, Tuple
 from icalendar import Calendar
 import pytz
 
-# Configurar logging
-os.makedirs('logs', exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/calendar_extraction.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+sys.path.append(os.path.dirname(__file__))
+from utils import configure_http, get_http_policy, get_shared_session
+from feed_cache import FeedCache, content_hash
+from ical_stream import iter_vevents, parse_ical_datetime, unescape_text
+from event_index import EventIndex, dedupe_events, events_from_json, events_to_json
+from recurrence import RecurrenceExpander
+from setter_rules import SetterRules, UNKNOWN_SETTER
+from event_store import EventStore
+from publish import write_json_if_changed
+from instrumentation import count_bytes, incr, instrumented_run, span
+from runtime import configure_logging, load_config
+
 logger = logging.getLogger(__name__)
 
+LOG_FILE = 'logs/calendar_extraction.log'
+
+# Versión del formato de los eventos parseados guardados en cache (cambiarla invalida el cache)
+INDEX_CACHE_VERSION = 4
+
+
+def feeds_from_config(calendar_config: dict) -> List[Tuple[str, str]]:
+    """
+    Lista de (nombre, url) de los feeds a consultar
+
+    google_calendar.feeds acepta URLs o {name, ical_url}; sin feeds se usa el
+    ical_url histórico como único feed 'principal'.
+    """
+    feeds = calendar_config.get('feeds')
+    if not feeds:
+        return [('principal', calendar_config['ical_url'])]
+    
+    result = []
+    for i, feed in enumerate(feeds, start=1):
+        if isinstance(feed, str):
+            result.append((f'feed_{i}', feed))
+        else:
+            result.append((feed.get('name') or f'feed_{i}', feed['ical_url']))
+    return result
+
 
 class CalendarExtractor:
     """Extrae reuniones del calendario público de ARE"""
     
     def __init__(self, config: dict):
         self.config = config
-        self.ical_url = config['google_calendar']['ical_url']
+        
+        # Feeds (uno por setter/equipo), descargados y parseados en paralelo
+        self.feeds = feeds_from_config(config['google_calendar'])
+        self.ical_url = self.feeds[0][1]
+        self.max_feed_workers = config['google_calendar'].get('max_feed_workers', 4)
+        self.feed_report = {}   # nombre → estado/latencia de la última descarga
         self.timezone = pytz.timezone(config['extraction']['timezone'])
         
         # Mapeo de colores
@@ -46,51 +82,135 @@ class CalendarExtractor:
         # Patrones de títulos
         self.robot_pattern = config['google_calendar']['robot_title_pattern']
         self.human_pattern = config['google_calendar']['human_title_pattern']
+        
+        # Reglas de setter compiladas (color + título → setter, memoizado)
+        self.setter_rules = SetterRules(config['google_calendar'])
+        
+        # Transporte HTTP compartido (keep-alive + retries)
+        self.session = get_shared_session('calendar')
+        self.timeout = get_http_policy('calendar')['timeout']
+        
+        # Cache en disco del feed (GET condicional + resultado parseado)
+        calendar_config = config['google_calendar']
+        self.feed_cache = None
+        if calendar_config.get('cache_enabled', True):
+            self.feed_cache = FeedCache(calendar_config.get('cache_dir', '.cache/calendar'))
+        
+        # Modo streaming: parsear el feed por bloques sin construir el árbol completo
+        self.streaming = calendar_config.get('streaming', False)
+        
+        # Expansión de series recurrentes (memoizada por UID/SEQUENCE y
+        # persistida junto al cache del feed entre ejecuciones)
+        self.expander = RecurrenceExpander(self.timezone)
+        self._load_expansions()
+        
+        # Índice fecha → eventos del último feed procesado
+        self._event_index = None
+        self._indexed_cal = None
+        self._index_lock = threading.Lock()
+    
+    def _load_expansions(self):
+        """Carga las expansiones RRULE de la ejecución anterior (mismo formato y timezone)"""
+        if not self.feed_cache:
+            return
+        data = self.feed_cache.load_expansions()
+        if (data and data.get('version') == INDEX_CACHE_VERSION
+                and data.get('timezone') == self.timezone.zone):
+            self.expander.load_json(data['series'])
     
-    def download_ical(self) -> Calendar:
-        """Descarga el feed iCal del calendario público"""
+    def save_expansions(self):
+        """Guarda las expansiones RRULE si hubo nuevas (la próxima ejecución no re-expande)"""
+        if not self.feed_cache or not self.expander.dirty:
+            return
         try:
-            logger.info(f"Descargando iCal desde: {self.ical_url}")
-            response = requests.get(self.ical_url, timeout=30)
-            response.raise_for_status()
-            
-            cal = Calendar.from_ical(response.content)
-            logger.info("✅ iCal descargado exitosamente")
-            return cal
-        except Exception as e:
-            logger.error(f"❌ Error descargando iCal: {e}")
-            return None
+            self.feed_cache.store_expansions({
+                'version': INDEX_CACHE_VERSION,
+                'timezone': self.timezone.zone,
+                'series': self.expander.to_json()
+            })
+            self.expander.dirty = False
+        except OSError as e:
+            logger.warning(f"⚠️ No se pudieron guardar las expansiones RRULE: {e}")
+    
+    def fetch_feed(self, url: str = None) -> bytes:
+        """
+        Descarga el cuerpo de un feed iCal (default: el primero)
+        
+        Con cache habilitado envía If-None-Match / If-Modified-Since y, ante un
+        304 Not Modified, reutiliza el cuerpo guardado en disco.
+        """
+        url = url or self.ical_url
+        logger.info(f"Descargando iCal desde: {url}")
+        headers = self.feed_cache.conditional_headers(url) if self.feed_cache else {}
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        
+        if response.status_code == 304:
+            body = self.feed_cache.load_body(url)
+            if body is not None:
+                logger.info("✅ iCal sin cambios (304), usando copia en cache")
+                return body
+            # La copia local desapareció: descargar completo
+            response = self.session.get(url, timeout=self.timeout)
+        
+        response.raise_for_status()
+        incr('http.bytes', len(response.content))
+        if self.feed_cache:
+            self.feed_cache.store_body(
+                url,
+                response.content,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified')
+            )
+        return response.content
+    
+    def iter_feed_chunks(self, chunk_size: int = 65536, url: str = None):
+        """
+        Descarga un feed iCal por bloques (GET condicional si hay cache)
+        
+        El cuerpo nunca se arma completo en memoria: los bloques se entregan
+        a medida que llegan y, con cache, se escriben a disco en paralelo.
+        """
+        url = url or self.ical_url
+        logger.info(f"Descargando iCal (streaming) desde: {url}")
+        headers = self.feed_cache.conditional_headers(url) if self.feed_cache else {}
+        response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+        
+        if response.status_code == 304:
+            response.close()
+            chunks = self.feed_cache.iter_body(url, chunk_size)
+            if chunks is not None:
+                logger.info("✅ iCal sin cambios (304), usando copia en cache")
+                return chunks
+            response = self.session.get(url, timeout=self.timeout, stream=True)
+        
+        response.raise_for_status()
+        chunks = count_bytes(response.iter_content(chunk_size=chunk_size))
+        if self.feed_cache:
+            chunks = self.feed_cache.tee_body(
+                url,
+                chunks,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified')
+            )
+        return chunks
+    
+    def cache_stats(self) -> dict:
+        """Estadísticas de hits/misses del cache del feed"""
+        return dict(self.feed_cache.stats) if self.feed_cache else {}
     
     def identify_setter_by_title_and_color(self, title: str, color: str) -> str:
         """
-        Identifica el setter basado en título y color
+        Identifica el setter basado en título y color (ver setter_rules)
         
-        Lógica:
+        Lógica con la configuración histórica:
         - Negro (8) = Teresa
         - Verde (2) = Daniela  
         - Azul (9) = Matias O Robot
           - Si título empieza con "Asesoría Inmobiliaria" → Robot
-          - Si título empieza con "Reunion" → Matias
+          - Si no → Matias
+        - No-show (6, 11) con título del robot → Robot
         """
-        # Normalizar título
-        title_lower = title.lower().strip()
-        
-        # Verificar color directo (Negro o Verde)
-        if color == "8":  # Negro
-            return "Teresa"
-        elif color == "2":  # Verde
-            return "Daniela"
-        elif color == "9":  # Azul (Matias o Robot)
-            # Distinguir por título
-            if title.startswith(self.robot_pattern):
-                return "Robot"
-            elif "reunion" in title_lower:
-                return "Matias"
-            else:
-                # Default para azul sin patrón claro
-                return "Matias"
-        else:
-            return "Desconocido"
+        return self.setter_rules.classify(title, color)[0]
     
     def is_completed(self, color: str) -> bool:
         """
@@ -102,9 +222,271 @@ class CalendarExtractor:
         """
         return color not in self.no_show_colors
     
-    def extract_events(self, date: datetime) -> dict:
+    def _to_local(self, value) -> datetime:
+        """Convierte un date/datetime de iCal a datetime en la timezone del calendario"""
+        # Si es datetime, convertir a timezone correcto
+        if isinstance(value, datetime):
+            if value.tzinfo is None:
+                return self.timezone.localize(value)
+            return value.astimezone(self.timezone)
+        # Si es date, convertir a datetime
+        return self.timezone.localize(datetime.combine(value, datetime.min.time()))
+    
+    def normalize_event(self, component) -> dict:
         """
-        Extrae eventos de una fecha específica
+        Normaliza un VEVENT a un registro liviano con inicio en hora local
+        
+        Returns:
+            {'uid', 'title', 'color', 'start' (datetime con timezone), 'sequence',
+             'status', 'tzid', 'rrule', 'exdates', 'recurrence_id', 'last_modified' (UTC ISO)}
+        """
+        prop = component.get('dtstart')
+        dtstart = prop.dt
+        tzid = prop.params.get('TZID')
+        if not tzid and isinstance(dtstart, datetime) and dtstart.utcoffset() == timedelta(0):
+            tzid = 'UTC'
+        
+        exdates = []
+        exdate = component.get('exdate')
+        if exdate is not None:
+            for item in (exdate if isinstance(exdate, list) else [exdate]):
+                exdates.extend(self._to_local(d.dt) for d in item.dts)
+        
+        rrule = component.get('rrule')
+        recurrence_id = component.get('recurrence-id')
+        last_modified = component.get('last-modified')
+        
+        return {
+            'uid': str(component.get('uid', '')),
+            'title': str(component.get('summary', 'Sin título')),
+            'color': str(component.get('color', '')),
+            'start': self._to_local(dtstart),
+            'sequence': int(component.get('sequence', 0)),
+            'status': str(component.get('status', '')).upper(),
+            'tzid': tzid,
+            'rrule': rrule.to_ical().decode('utf-8') if rrule else None,
+            'exdates': exdates,
+            'recurrence_id': self._to_local(recurrence_id.dt) if recurrence_id else None,
+            'last_modified': last_modified.dt.astimezone(pytz.utc).isoformat() if last_modified else None
+        }
+    
+    def normalize_record(self, record: dict) -> dict:
+        """Equivalente a normalize_event para los registros del parser en streaming"""
+        value, params = record['DTSTART']
+        tzid = params.get('TZID') or ('UTC' if value.strip().endswith('Z') else None)
+        
+        exdates = []
+        for ex_value, ex_params in record.get('EXDATE', []):
+            for item in ex_value.split(','):
+                exdates.append(self._to_local(parse_ical_datetime(item, ex_params, self.timezone)))
+        
+        recurrence_id = None
+        if 'RECURRENCE-ID' in record:
+            rid_value, rid_params = record['RECURRENCE-ID']
+            recurrence_id = self._to_local(parse_ical_datetime(rid_value, rid_params, self.timezone))
+        
+        last_modified = None
+        if 'LAST-MODIFIED' in record:
+            lm_value, lm_params = record['LAST-MODIFIED']
+            last_modified = parse_ical_datetime(lm_value, lm_params, pytz.utc).astimezone(pytz.utc).isoformat()
+        
+        return {
+            'uid': record.get('UID', ('', {}))[0],
+            'title': unescape_text(record['SUMMARY'][0]) if 'SUMMARY' in record else 'Sin título',
+            'color': record.get('COLOR', ('', {}))[0],
+            'start': self._to_local(parse_ical_datetime(value, params, self.timezone)),
+            'sequence': int(record.get('SEQUENCE', ('0', {}))[0] or 0),
+            'status': record.get('STATUS', ('', {}))[0].upper(),
+            'tzid': tzid,
+            'rrule': record['RRULE'][0] if 'RRULE' in record else None,
+            'exdates': exdates,
+            'recurrence_id': recurrence_id,
+            'last_modified': last_modified
+        }
+    
+    def iter_streamed_events(self, url: str = None):
+        """Itera los eventos normalizados de un feed, uno a la vez"""
+        parsed = 0
+        try:
+            for record in iter_vevents(self.iter_feed_chunks(url=url)):
+                parsed += 1
+                try:
+                    yield self.normalize_record(record)
+                except Exception as e:
+                    logger.error(f"Error procesando evento: {e}")
+        finally:
+            incr('calendar.eventos_parseados', parsed)
+    
+    def build_event_index(self, cal: Calendar) -> EventIndex:
+        """
+        Construye un índice fecha local → eventos normalizados (ordenados por hora)
+        
+        Se recorre el feed una sola vez; las consultas posteriores por día o
+        rango sólo tocan los eventos de esos días (más las series recurrentes,
+        que se expanden sólo dentro de la ventana consultada).
+        """
+        index = EventIndex.from_events(self.normalize_calendar(cal))
+        self._log_index(index)
+        return index
+    
+    def normalize_calendar(self, cal: Calendar) -> list:
+        """Normaliza todos los VEVENT de un calendario ya parseado"""
+        events = []
+        parsed = 0
+        for component in cal.walk('VEVENT'):
+            parsed += 1
+            try:
+                events.append(self.normalize_event(component))
+            except Exception as e:
+                logger.error(f"Error procesando evento: {e}")
+        incr('calendar.eventos_parseados', parsed)
+        return events
+    
+    def _log_index(self, index: EventIndex):
+        logger.info(f"🗂️  Índice de eventos construido: {len(index)} eventos en {index.days()} días ({len(index.series)} series recurrentes)")
+    
+    def get_event_index(self, cal: Calendar = None, refresh: bool = False) -> EventIndex:
+        """
+        Retorna el índice de eventos, construyéndolo una sola vez por feed
+        
+        Args:
+            cal: Calendario ya descargado; si es None se reutiliza el último
+                 índice construido o se descarga el feed
+            refresh: Fuerza una nueva descarga del feed
+        """
+        with self._index_lock:
+            if cal is not None:
+                if self._indexed_cal is not cal:
+                    self._event_index = self.build_event_index(cal)
+                    self._indexed_cal = cal
+                return self._event_index
+            
+            if self._event_index is None or refresh:
+                index = self._load_index_from_feed()
+                if index is None:
+                    return None
+                self._event_index = index
+                self._indexed_cal = None
+            return self._event_index
+    
+    def _run_feeds(self, load: Callable[[str, str, dict], list],
+                   allow_partial: bool = False) -> Optional[List[list]]:
+        """
+        Corre load(nombre, url, reporte) para cada feed, en paralelo si hay varios
+        
+        Args:
+            allow_partial: Retornar los feeds que sí cargaron aunque otro haya
+                           fallado (el llamador revisa feed_report). Si es False,
+                           un feed caído cuenta como calendario caído: las
+                           métricas de un solo feed quedarían subcontadas.
+        
+        Returns:
+            Los eventos de cada feed cargado, o None si no hay datos utilizables
+        """
+        self.feed_report = {name: {'estado': 'pendiente'} for name, _ in self.feeds}
+        
+        def run(name: str, url: str) -> Optional[list]:
+            report = self.feed_report[name]
+            started = time.perf_counter()
+            try:
+                with span('calendar.feed', feed=name):
+                    events = load(name, url, report)
+                report.update(estado='ok', eventos=len(events))
+                return events
+            except Exception as e:
+                logger.error(f"❌ Error con el feed {name}: {e}")
+                report['estado'] = 'error'
+                return None
+            finally:
+                report['segundos'] = round(time.perf_counter() - started, 3)
+        
+        if len(self.feeds) == 1:
+            results = [run(*self.feeds[0])]
+        else:
+            workers = min(len(self.feeds), self.max_feed_workers)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='feed') as executor:
+                results = list(executor.map(lambda feed: run(*feed), self.feeds))
+        
+        if len(self.feeds) > 1:
+            self.log_feed_report()
+        loaded = [events for events in results if events is not None]
+        if not allow_partial and len(loaded) < len(results):
+            logger.error(f"❌ Feeds con error: {', '.join(self.failed_feeds())}; no se calculan métricas parciales")
+            return None
+        return loaded or None
+    
+    def failed_feeds(self) -> List[str]:
+        """Feeds que fallaron en la última descarga"""
+        return [name for name, report in self.feed_report.items() if report['estado'] != 'ok']
+    
+    def log_feed_report(self):
+        """Loguea estado, eventos y latencia de cada feed de la última descarga"""
+        logger.info("📡 Feeds iCal:")
+        for name, report in self.feed_report.items():
+            cached = " (cache)" if report.get('cache') else ""
+            logger.info(f"  {name:15} | {report['estado']:9} | {report.get('eventos', 0):6} eventos | "
+                        f"{report.get('segundos', 0):6.2f}s{cached}")
+    
+    def _load_feed_events(self, name: str, url: str, report: dict) -> list:
+        """
+        Descarga un feed y lo normaliza, reutilizando los eventos parseados en
+        cache cuando el contenido (hash) no cambió
+        """
+        started = time.perf_counter()
+        with span('calendar.descarga', feed=name):
+            body = self.fetch_feed(url)
+        report['descarga_s'] = round(time.perf_counter() - started, 3)
+        
+        key = content_hash(body)
+        if self.feed_cache:
+            cached = self.feed_cache.load_parsed(key)
+            if (cached and cached.get('version') == INDEX_CACHE_VERSION
+                    and cached.get('timezone') == self.timezone.zone):
+                logger.info(f"✅ Eventos de {name} reutilizados desde cache")
+                report['cache'] = True
+                return events_from_json(cached['events'], self.timezone)
+        
+        with span('calendar.parseo', feed=name, feed_bytes=len(body)):
+            events = self.normalize_calendar(Calendar.from_ical(body))
+        if self.feed_cache:
+            try:
+                self.feed_cache.store_parsed(key, {
+                    'version': INDEX_CACHE_VERSION,
+                    'timezone': self.timezone.zone,
+                    'events': events_to_json(events)
+                })
+            except OSError as e:
+                logger.warning(f"⚠️ No se pudo guardar en cache el feed {name}: {e}")
+        return events
+    
+    def _load_index_from_feed(self) -> EventIndex:
+        """Descarga todos los feeds, une sus eventos sin duplicados y arma el índice"""
+        event_lists = self._run_feeds(self._load_feed_events)
+        if event_lists is None:
+            return None
+        
+        with span('calendar.indice', feeds=len(event_lists)):
+            events = dedupe_events(event_lists)
+            index = EventIndex.from_events(events)
+        
+        duplicates = sum(len(feed_events) for feed_events in event_lists) - len(events)
+        if duplicates:
+            incr('calendar.eventos_duplicados', duplicates)
+            logger.info(f"🔁 {duplicates} eventos repetidos entre feeds (se conserva la SEQUENCE más alta)")
+        self._log_index(index)
+        return index
+    
+    def _local_date(self, date):
+        """Convierte un datetime/date a la fecha local del calendario"""
+        if isinstance(date, datetime):
+            if date.tzinfo is not None:
+                return date.astimezone(self.timezone).date()
+            return date.date()
+        return date
+    
+    def compute_metrics(self, events: list) -> dict:
+        """
+        Calcula las métricas por setter para una lista de eventos normalizados
         
         Returns:
             {
@@ -114,80 +496,48 @@ class CalendarExtractor:
                 'Robot': {...}
             }
         """
-        cal = self.download_ical()
-        if not cal:
-            return {}
+        metrics = self._empty_metrics()
+        for event in events:
+            self._count_event(metrics, event)
+        return metrics
+    
+    def _empty_metrics(self) -> dict:
+        """Estructura de métricas por setter en cero (los 4 de siempre + los de setter_rules)"""
+        return {
+            setter: {'agendadas': 0, 'realizadas': 0, 'eventos': []}
+            for setter in self.setter_rules.setters
+        }
+    
+    def _count_event(self, metrics: dict, event: dict):
+        """Suma un evento normalizado a las métricas de su setter"""
+        title = event['title']
+        color = event['color']
+        
+        # Identificar setter y si se completó (una búsqueda en la tabla de reglas)
+        setter, completed = self.setter_rules.classify(title, color)
         
-        # Definir rango de fechas (todo el día)
-        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = start_of_day + timedelta(days=1)
+        if setter == UNKNOWN_SETTER:
+            logger.warning(f"⚠️ Evento sin setter identificado: {title} (color: {color})")
+            return
         
-        # Inicializar métricas
-        metrics = {
-            'Daniela': {'agendadas': 0, 'realizadas': 0, 'eventos': []},
-            'Teresa': {'agendadas': 0, 'realizadas': 0, 'eventos': []},
-            'Matias': {'agendadas': 0, 'realizadas': 0, 'eventos': []},
-            'Robot': {'agendadas': 0, 'realizadas': 0, 'eventos': []}
+        # Registrar evento
+        event_data = {
+            'title': title,
+            'time': event['start'].strftime('%H:%M'),
+            'color': color,
+            'completed': completed
         }
         
-        logger.info(f"Extrayendo eventos para: {date.date()}")
+        metrics[setter]['agendadas'] += 1
+        if completed:
+            metrics[setter]['realizadas'] += 1
         
-        # Procesar eventos
-        for component in cal.walk('VEVENT'):
-            try:
-                # Obtener fecha del evento
-                dtstart = component.get('dtstart').dt
-                
-                # Si es datetime, convertir a timezone correcto
-                if isinstance(dtstart, datetime):
-                    if dtstart.tzinfo is None:
-                        dtstart = self.timezone.localize(dtstart)
-                    else:
-                        dtstart = dtstart.astimezone(self.timezone)
-                else:
-                    # Si es date, convertir a datetime
-                    dtstart = datetime.combine(dtstart, datetime.min.time())
-                    dtstart = self.timezone.localize(dtstart)
-                
-                # Filtrar por fecha
-                if not (start_of_day <= dtstart < end_of_day):
-                    continue
-                
-                # Extraer datos del evento
-                title = str(component.get('summary', 'Sin título'))
-                color = str(component.get('color', ''))
-                
-                # Identificar setter
-                setter = self.identify_setter_by_title_and_color(title, color)
-                
-                if setter == "Desconocido":
-                    logger.warning(f"⚠️ Evento sin setter identificado: {title} (color: {color})")
-                    continue
-                
-                # Determinar si se completó
-                completed = self.is_completed(color)
-                
-                # Registrar evento
-                event_data = {
-                    'title': title,
-                    'time': dtstart.strftime('%H:%M'),
-                    'color': color,
-                    'completed': completed
-                }
-                
-                metrics[setter]['agendadas'] += 1
-                if completed:
-                    metrics[setter]['realizadas'] += 1
-                
-                metrics[setter]['eventos'].append(event_data)
-                
-                logger.debug(f"  {setter}: {title} - {'✅ Realizada' if completed else '❌ No realizada'}")
-                
-            except Exception as e:
-                logger.error(f"Error procesando evento: {e}")
-                continue
+        metrics[setter]['eventos'].append(event_data)
         
-        # Log resumen
+        logger.debug(f"  {setter}: {title} - {'✅ Realizada' if completed else '❌ No realizada'}")
+    
+    def _log_metrics_summary(self, metrics: dict):
+        """Loguea el resumen de reuniones por setter"""
         logger.info("\n" + "="*60)
         logger.info("📊 RESUMEN DE REUNIONES:")
         logger.info("="*60)
@@ -198,32 +548,213 @@ class CalendarExtractor:
                 show_up_rate = (realizadas / agendadas) * 100
                 logger.info(f"{setter:10} | Agendadas: {agendadas:2} | Realizadas: {realizadas:2} | Show-up: {show_up_rate:.1f}%")
         logger.info("="*60)
+    
+    def extract_events(self, date: datetime, cal: Calendar = None) -> dict:
+        """
+        Extrae eventos de una fecha específica
+        
+        Args:
+            date: Día a extraer (date o datetime; si tiene timezone se usa su día local)
+            cal: Calendario ya descargado; si es None se reutiliza el índice
+                 existente o se descarga el feed
+        
+        Returns:
+            {
+                'Daniela': {'agendadas': X, 'realizadas': Y, 'eventos': [...]},
+                'Teresa': {...},
+                'Matias': {...},
+                'Robot': {...}
+            }
+        """
+        day = self._local_date(date)
         
+        if self.streaming and cal is None:
+            metrics = self.extract_events_streaming(day, day).get(day.strftime('%Y-%m-%d'), {})
+            self._log_metrics_summary(metrics)
+            return metrics
+        
+        index = self.get_event_index(cal)
+        if index is None:
+            return {}
+        
+        logger.info(f"Extrayendo eventos para: {day}")
+        
+        metrics = self.compute_metrics(index.events_on(day, self.expander))
+        self.save_expansions()
+        self._log_metrics_summary(metrics)
         return metrics
+    
+    def extract_events_range(self, start_date, end_date, cal: Calendar = None) -> dict:
+        """
+        Extrae las métricas de cada día entre start_date y end_date (inclusive)
+        
+        Returns:
+            {'YYYY-MM-DD': <métricas por setter>, ...}
+        """
+        if self.streaming and cal is None:
+            return self.extract_events_streaming(start_date, end_date)
+        
+        index = self.get_event_index(cal)
+        if index is None:
+            return {}
+        
+        day = self._local_date(start_date)
+        last_day = self._local_date(end_date)
+        logger.info(f"Extrayendo eventos entre {day} y {last_day}")
+        
+        results = {
+            event_day.strftime('%Y-%m-%d'): self.compute_metrics(events)
+            for event_day, events in index.events_between(day, last_day, self.expander).items()
+        }
+        self.save_expansions()
+        return results
+
+    
+    def extract_events_streaming(self, start_date, end_date) -> dict:
+        """
+        Igual que extract_events_range, pero parseando el feed en streaming
+        
+        Cada evento se cuenta apenas se lee y se descarta; sólo se retienen los
+        eventos del rango pedido, así que la memoria no crece con el feed.
+        """
+        first_day = self._local_date(start_date)
+        last_day = self._local_date(end_date)
+        logger.info(f"Extrayendo eventos (streaming) entre {first_day} y {last_day}")
+        
+        results = {}
+        day = first_day
+        while day <= last_day:
+            results[day.strftime('%Y-%m-%d')] = self._empty_metrics()
+            day += timedelta(days=1)
+        
+        # De cada feed sólo se retienen los eventos del rango, las series
+        # recurrentes y los overrides (pocos): un RECURRENCE-ID puede venir
+        # después de su serie y un duplicado puede estar en otro feed
+        def load(name: str, url: str, report: dict) -> list:
+            kept = []
+            for event in self.iter_streamed_events(url):
+                if (event['rrule'] or event['recurrence_id'] is not None
+                        or first_day <= event['start'].date() <= last_day):
+                    kept.append(event)
+            return kept
+        
+        with span('calendar.streaming', feeds=len(self.feeds)):
+            event_lists = self._run_feeds(load)
+        if event_lists is None:
+            return {}
+        
+        recurring = EventIndex()
+        for event in dedupe_events(event_lists):
+            if event['rrule'] or event['recurrence_id'] is not None:
+                recurring.add(event)
+                if event['rrule']:
+                    continue
+                if event['status'] == 'CANCELLED':
+                    continue
+            event_day = event['start'].date()
+            if first_day <= event_day <= last_day:
+                self._count_event(results[event_day.strftime('%Y-%m-%d')], event)
+        
+        for series in recurring.series:
+            for instance in self.expander.expand(series, first_day, last_day, recurring.overrides):
+                self._count_event(results[instance['start'].strftime('%Y-%m-%d')], instance)
+        self.save_expansions()
+        
+        return results
+    
+    def affected_days(self, event: dict, first_day, last_day) -> set:
+        """
+        Días locales cuyas métricas dependen del evento: el de su inicio; una
+        serie, los de sus instancias en la ventana; un override, también el
+        día de la instancia que reemplaza
+        """
+        if event.get('rrule'):
+            return {o.date() for o in self.expander.occurrences(event, first_day, last_day)}
+        days = {event['start'].date()}
+        if event.get('recurrence_id') is not None:
+            days.add(event['recurrence_id'].date())
+        return days
+    
+    def sync_event_store(self, store: EventStore) -> Optional[list]:
+        """
+        Descarga los feeds y aplica sus eventos al almacén SQLite
+        
+        Returns:
+            Días (date) cuyas métricas cambiaron, o None si fallaron todos los feeds
+        """
+        event_lists = self._run_feeds(self._load_feed_events, allow_partial=True)
+        if event_lists is None:
+            return None
+        
+        # Con un feed caído no se sabe qué eventos desaparecieron: no se borra nada
+        complete = not self.failed_feeds()
+        today = datetime.now(self.timezone).date()
+        window = (today - timedelta(days=store.window_days), today)
+        
+        with span('calendar.store', feeds=len(event_lists)):
+            changed = store.apply(
+                dedupe_events(event_lists),
+                self.is_completed,
+                lambda event: self.affected_days(event, *window),
+                complete_snapshot=complete
+            )
+        
+        counts = store.last_apply
+        logger.info(f"🗄️  Almacén de eventos: {counts['nuevos']} nuevos, {counts['actualizados']} actualizados, "
+                    f"{counts['sin_cambios']} sin cambios, {counts['eliminados']} eliminados, "
+                    f"{counts['transiciones']} cambios de color → {len(changed)} días a recalcular")
+        return changed
+    
+    def metrics_from_store(self, store: EventStore, days: list) -> dict:
+        """Métricas por setter de esos días, leyendo sólo sus eventos del almacén"""
+        index = EventIndex.from_events(store.events_for_days(days))
+        results = {
+            day.strftime('%Y-%m-%d'): self.compute_metrics(index.events_on(day, self.expander))
+            for day in days
+        }
+        self.save_expansions()
+        return results
 
 
-def load_config(config_path: str = "config/config.yaml") -> dict:
-    """Carga la configuración desde archivo YAML"""
+def update_extracted_meetings(fecha: str, metrics: dict) -> bool:
+    """
+    Reemplaza las reuniones de data/extracted_YYYYMMDD.json (si existe)
+    
+    Returns:
+        True si el archivo cambió
+    """
+    path = f"data/extracted_{fecha.replace('-', '')}.json"
     try:
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
-    except Exception as e:
-        logger.error(f"Error cargando configuración: {e}")
-        sys.exit(1)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return False
+    data['reuniones'] = metrics
+    return write_json_if_changed(path, data)
 
 
-def main():
-    """Función principal"""
+@instrumented_run('calendar_extractor')
+def main(argv=None, config: dict = None):
+    """Función principal (config ya cargado por el CLI, o config.yaml)"""
+    parser = argparse.ArgumentParser(description="Extracción de Google Calendar (día de ayer)")
+    parser.add_argument('--sync', action='store_true',
+                        help="Aplicar el feed al almacén de eventos (SQLite) y recalcular sólo los días que cambiaron")
+    args = parser.parse_args(argv)
+    
     logger.info("=" * 80)
     logger.info("🗓️  Iniciando extracción de Google Calendar")
     logger.info("=" * 80)
     
     # Cargar configuración
-    config = load_config()
+    config = config or load_config()
+    configure_http(config.get('http'))
     
     # Inicializar extractor
     extractor = CalendarExtractor(config)
     
+    if args.sync:
+        return sync(extractor, config)
+    
     # Fecha a extraer (ayer)
     yesterday = datetime.now(extractor.timezone) - timedelta(days=config['extraction']['days_back'])
     
@@ -245,6 +776,12 @@ def main():
                 status = "✅" if evento['completed'] else "❌"
                 print(f"    {status} {evento['time']} - {evento['title']}")
     
+    stats = extractor.cache_stats()
+    if stats:
+        print(f"\n💾 Cache iCal: feed {stats['feed_hits']} hits / {stats['feed_misses']} misses, "
+              f"parseo {stats['parse_hits']} hits / {stats['parse_misses']} misses")
+    extractor.setter_rules.log_stats()
+    
     logger.info("\n" + "=" * 80)
     logger.info("✅ Extracción de Calendar completada")
     logger.info("=" * 80)
@@ -252,5 +789,38 @@ def main():
     return metrics
 
 
+def sync(extractor: CalendarExtractor, config: dict) -> dict:
+    """
+    Modo incremental: actualiza el almacén de eventos, recalcula las métricas
+    de los días que cambiaron y las escribe en los data/extracted_*.json existentes
+    """
+    store = EventStore.from_config(config['google_calendar'].get('event_store'), extractor.timezone)
+    try:
+        changed = extractor.sync_event_store(store)
+        if changed is None:
+            logger.error("❌ No se pudo descargar ningún feed")
+            sys.exit(1)
+        
+        with span('calendar.recalculo', dias=len(changed)):
+            metrics_by_day = extractor.metrics_from_store(store, changed)
+        
+        updated = [fecha for fecha, metrics in metrics_by_day.items() if update_extracted_meetings(fecha, metrics)]
+        logger.info(f"💾 {len(updated)} archivos data/extracted_*.json actualizados")
+        
+        # Cambios de color detectados en esta sincronización (realizada ↔ no-show)
+        for change in store.transitions(observed_since=store.last_apply['observado'])[-20:]:
+            if change['old_completed'] == change['new_completed']:
+                state = "🎨"
+            else:
+                state = "✅ → ❌" if change['old_completed'] else "❌ → ✅"
+            logger.info(f"  {change['day']} {state} color {change['old_color']} → {change['new_color']} ({change['uid']})")
+        
+        extractor.setter_rules.log_stats()
+        return metrics_by_day
+    finally:
+        store.close()
+
+
 if __name__ == "__main__":
+    configure_logging(LOG_FILE)
     main()
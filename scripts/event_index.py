@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Índice de eventos del calendario por fecha local
+Los eventos simples se indexan por día; las series recurrentes se guardan
+aparte y se expanden sólo para la ventana consultada
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta, date
+from typing import Dict, Iterable, List
+
+import pytz
+
+# Campos datetime de un evento normalizado (para serializar a JSON)
+_DATETIME_FIELDS = ('start', 'recurrence_id')
+
+
+class EventIndex:
+    """Índice fecha local → eventos normalizados + series recurrentes"""
+
+    def __init__(self):
+        self.by_date = defaultdict(list)
+        self.series = []
+        self.overrides = set()   # (uid, instante UTC del RECURRENCE-ID)
+
+    def add(self, event: dict):
+        """Agrega un evento normalizado al índice"""
+        if event.get('recurrence_id') is not None:
+            self.overrides.add((event['uid'], event['recurrence_id'].astimezone(pytz.utc)))
+            # Una instancia cancelada sólo elimina la ocurrencia original
+            if event.get('status') == 'CANCELLED':
+                return
+
+        if event.get('rrule'):
+            self.series.append(event)
+        else:
+            self.by_date[event['start'].date()].append(event)
+
+    @classmethod
+    def from_events(cls, events: Iterable[dict]) -> 'EventIndex':
+        """Construye el índice (ya ordenado) desde eventos normalizados"""
+        index = cls()
+        for event in events:
+            index.add(event)
+        return index.finalize()
+
+    def finalize(self) -> 'EventIndex':
+        """Ordena los eventos de cada día por hora de inicio"""
+        for events in self.by_date.values():
+            events.sort(key=lambda e: e['start'])
+        return self
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.by_date.values()) + len(self.series)
+
+    def days(self) -> int:
+        return len(self.by_date)
+
+    def events_between(self, first_day: date, last_day: date, expander) -> Dict[date, List[dict]]:
+        """
+        Eventos de cada día en [first_day, last_day], con las series expandidas
+
+        Costo: O(eventos en esos días + series recurrentes).
+        """
+        result = {}
+        day = first_day
+        while day <= last_day:
+            result[day] = list(self.by_date.get(day, []))
+            day += timedelta(days=1)
+
+        if self.series:
+            for series in self.series:
+                for instance in expander.expand(series, first_day, last_day, self.overrides):
+                    result[instance['start'].date()].append(instance)
+            for events in result.values():
+                events.sort(key=lambda e: e['start'])
+
+        return result
+
+    def events_on(self, day: date, expander) -> List[dict]:
+        """Eventos de un día, con las series expandidas"""
+        return self.events_between(day, day, expander)[day]
+
+
+def dedupe_events(event_lists: Iterable[List[dict]]) -> List[dict]:
+    """
+    Une los eventos de varios feeds sin duplicados por (UID, RECURRENCE-ID)
+
+    Un mismo evento puede aparecer en más de un calendario (invitados en
+    ambos); gana la SEQUENCE más alta y, con empate, el del primer feed.
+    Los eventos sin UID no se pueden comparar y se conservan todos.
+    """
+    merged = {}
+    anonymous = []
+    for events in event_lists:
+        for event in events:
+            if not event.get('uid'):
+                anonymous.append(event)
+                continue
+            recurrence_id = event.get('recurrence_id')
+            key = (event['uid'], recurrence_id.astimezone(pytz.utc) if recurrence_id is not None else None)
+            current = merged.get(key)
+            if current is None or event.get('sequence', 0) > current.get('sequence', 0):
+                merged[key] = event
+    return list(merged.values()) + anonymous
+
+
+def events_to_json(events: Iterable[dict]) -> list:
+    """Eventos normalizados → lista JSON (datetimes en ISO 8601)"""
+    return [_event_to_json(e) for e in events]
+
+
+def events_from_json(data: list, local_tz) -> List[dict]:
+    """Inverso de events_to_json"""
+    return [_event_from_json(e, local_tz) for e in data]
+
+
+def _event_to_json(event: dict) -> dict:
+    data = dict(event)
+    for field in _DATETIME_FIELDS:
+        if data.get(field) is not None:
+            data[field] = data[field].isoformat()
+    data['exdates'] = [d.isoformat() for d in event.get('exdates') or []]
+    return data
+
+
+def _event_from_json(data: dict, local_tz) -> dict:
+    event = dict(data)
+    for field in _DATETIME_FIELDS:
+        if event.get(field) is not None:
+            event[field] = datetime.fromisoformat(event[field]).astimezone(local_tz)
+    event['exdates'] = [datetime.fromisoformat(d).astimezone(local_tz) for d in data.get('exdates') or []]
+    return event
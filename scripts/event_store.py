@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Almacén persistente de eventos del calendario (SQLite)
+Cada evento se guarda por (UID, RECURRENCE-ID) con su SEQUENCE y
+LAST-MODIFIED; cada descarga del feed se aplica incrementalmente y se informa
+qué días cambiaron, para recalcular sólo esas métricas. También conserva el
+historial de cambios de color (realizada ↔ no-show) que las métricas diarias
+no guardan
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+from datetime import date, datetime, timezone
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+import pytz
+
+from event_index import events_from_json, events_to_json
+from instrumentation import incr
+
+logger = logging.getLogger(__name__)
+
+# Política por defecto (sobreescribible en config['google_calendar']['event_store'])
+DEFAULT_STORE_CONFIG = {
+    'path': 'data/calendar_events.sqlite',
+    'window_days': 90     # ventana (hacia atrás desde hoy) en que se expanden las series
+}
+
+SCHEMA_VERSION = 1
+
+# Campos que versionan el evento (no forman parte de su contenido)
+VERSION_FIELDS = ('sequence', 'last_modified')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    uid TEXT NOT NULL,
+    recurrence_id TEXT NOT NULL,      -- instante UTC ISO; '' para eventos simples y series
+    sequence INTEGER NOT NULL,
+    last_modified TEXT,               -- LAST-MODIFIED UTC ISO (si el feed lo trae)
+    fingerprint TEXT NOT NULL,        -- sha1 del evento normalizado
+    day TEXT NOT NULL,                -- fecha local de inicio (YYYY-MM-DD)
+    recurring INTEGER NOT NULL,       -- 1 = serie u override: afecta otros días
+    color TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    data TEXT NOT NULL,               -- evento normalizado (JSON)
+    first_seen TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    deleted_at TEXT,                  -- ya no aparece en el feed
+    PRIMARY KEY (uid, recurrence_id)
+);
+CREATE INDEX IF NOT EXISTS events_day ON events (day);
+
+CREATE TABLE IF NOT EXISTS transitions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT NOT NULL,
+    recurrence_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    observed_at TEXT NOT NULL,
+    old_color TEXT NOT NULL,
+    new_color TEXT NOT NULL,
+    old_completed INTEGER NOT NULL,
+    new_completed INTEGER NOT NULL,
+    sequence INTEGER NOT NULL,
+    last_modified TEXT
+);
+CREATE INDEX IF NOT EXISTS transitions_event ON transitions (uid, recurrence_id);
+"""
+
+
+def event_key(event: dict) -> Tuple[str, str]:
+    """(UID, RECURRENCE-ID en UTC ISO o ''); sin UID se usa un hash de título + inicio"""
+    uid = event.get('uid')
+    if not uid:
+        raw = f"{event.get('title', '')}\n{event['start'].isoformat()}"
+        uid = 'sin-uid:' + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    recurrence_id = event.get('recurrence_id')
+    return uid, recurrence_id.astimezone(pytz.utc).isoformat() if recurrence_id is not None else ''
+
+
+def content_fingerprint(event: dict) -> str:
+    """Huella del contenido del evento, sin SEQUENCE ni LAST-MODIFIED"""
+    content = {k: v for k, v in events_to_json([event])[0].items() if k not in VERSION_FIELDS}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class EventStore:
+    """
+    Eventos del calendario en SQLite, actualizados por diferencias
+
+    apply() compara cada evento del feed con su fila: una SEQUENCE menor es
+    una copia vieja (se ignora), igual SEQUENCE + LAST-MODIFIED es un evento
+    sin cambios (no se serializa), y si no se compara la huella del contenido.
+    """
+
+    def __init__(self, local_tz, path: str = DEFAULT_STORE_CONFIG['path'],
+                 window_days: int = DEFAULT_STORE_CONFIG['window_days']):
+        self.local_tz = local_tz
+        self.path = path
+        self.window_days = window_days
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.last_apply = {}
+
+    @classmethod
+    def from_config(cls, store_config: Optional[dict], local_tz) -> 'EventStore':
+        """Crea el almacén desde config['google_calendar']['event_store']"""
+        options = {**DEFAULT_STORE_CONFIG, **(store_config or {})}
+        return cls(local_tz, options['path'], options['window_days'])
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def apply(self, events: Iterable[dict], is_completed: Callable[[str], bool],
+              affected_days: Callable[[dict], Set[date]], complete_snapshot: bool = True) -> List[date]:
+        """
+        Aplica los eventos de una descarga y retorna los días cuyas métricas cambiaron
+
+        Args:
+            events: Eventos normalizados (ya sin duplicados entre feeds)
+            is_completed: color → realizada (para el historial de transiciones)
+            affected_days: evento → días locales que toca (una serie, todas sus
+                           instancias en la ventana; un override, ambos días)
+            complete_snapshot: La descarga incluye todos los feeds; sólo entonces
+                               los eventos ausentes se marcan como eliminados
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        existing = {
+            (row[0], row[1]): row[2:]
+            for row in self.conn.execute(
+                "SELECT uid, recurrence_id, sequence, last_modified, fingerprint, color, "
+                "completed, deleted_at FROM events"
+            )
+        }
+
+        counts = {'nuevos': 0, 'actualizados': 0, 'sin_cambios': 0, 'obsoletos': 0,
+                  'eliminados': 0, 'transiciones': 0}
+        changed_days = set()
+        upserts, touches, transitions = [], [], []
+        seen = set()
+        replaced = []   # filas vivas que cambian o se eliminan: sus días viejos también cambian
+
+        for event in events:
+            key = event_key(event)
+            seen.add(key)
+            row = existing.get(key)
+            live = row is not None and row[5] is None
+            sequence = event.get('sequence', 0)
+            last_modified = event.get('last_modified')
+
+            if live and sequence < row[0]:
+                counts['obsoletos'] += 1
+                continue
+            if live and sequence == row[0] and last_modified and last_modified == row[1]:
+                counts['sin_cambios'] += 1
+                continue
+
+            data = json.dumps(events_to_json([event])[0], sort_keys=True, ensure_ascii=False)
+            fingerprint = content_fingerprint(event)
+            if live and fingerprint == row[2]:
+                # Mismo contenido con otra versión: se guarda para saltarlo la próxima vez
+                if (sequence, last_modified) != (row[0], row[1]):
+                    touches.append((sequence, last_modified, now) + key)
+                counts['sin_cambios'] += 1
+                continue
+
+            color = event.get('color', '')
+            completed = int(is_completed(color))
+            day = event['start'].date().isoformat()
+            recurring = int(bool(event.get('rrule')) or event.get('recurrence_id') is not None)
+
+            changed_days |= affected_days(event)
+            if live:
+                replaced.append(key)
+                counts['actualizados'] += 1
+                if color != row[3]:
+                    transitions.append(key + (day, now, row[3], color, row[4], completed,
+                                              sequence, last_modified))
+            else:
+                counts['nuevos'] += 1
+
+            upserts.append(key + (sequence, last_modified, fingerprint, day, recurring, color,
+                                  completed, data, now, now))
+
+        deletions = []
+        if complete_snapshot:
+            for key, row in existing.items():
+                if key not in seen and row[5] is None:
+                    deletions.append((now,) + key)
+                    replaced.append(key)
+            counts['eliminados'] = len(deletions)
+        counts['transiciones'] = len(transitions)
+        
+        # El JSON del evento sólo se lee para las filas reemplazadas (antes de sobrescribirlas)
+        for key in replaced:
+            (data,) = self.conn.execute(
+                "SELECT data FROM events WHERE uid = ? AND recurrence_id = ?", key
+            ).fetchone()
+            changed_days |= affected_days(self._decode(data))
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO events (uid, recurrence_id, sequence, last_modified, fingerprint, day, "
+                "recurring, color, completed, data, first_seen, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (uid, recurrence_id) DO UPDATE SET "
+                "sequence = excluded.sequence, last_modified = excluded.last_modified, "
+                "fingerprint = excluded.fingerprint, day = excluded.day, recurring = excluded.recurring, "
+                "color = excluded.color, completed = excluded.completed, data = excluded.data, "
+                "updated_at = excluded.updated_at, deleted_at = NULL",
+                upserts
+            )
+            self.conn.executemany(
+                "UPDATE events SET sequence = ?, last_modified = ?, updated_at = ? "
+                "WHERE uid = ? AND recurrence_id = ?",
+                touches
+            )
+            self.conn.executemany(
+                "UPDATE events SET deleted_at = ? WHERE uid = ? AND recurrence_id = ?",
+                deletions
+            )
+            self.conn.executemany(
+                "INSERT INTO transitions (uid, recurrence_id, day, observed_at, old_color, new_color, "
+                "old_completed, new_completed, sequence, last_modified) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                transitions
+            )
+
+        for name, value in counts.items():
+            if value:
+                incr(f'calendar.store.{name}', value)
+        self.last_apply = {**counts, 'observado': now}
+        return sorted(changed_days)
+
+    def _decode(self, data: str) -> dict:
+        return events_from_json([json.loads(data)], self.local_tz)[0]
+
+    def events_for_days(self, days: Iterable[date]) -> List[dict]:
+        """
+        Eventos vigentes para calcular las métricas de esos días: los simples
+        de esos días más todas las series y overrides (pocos)
+        """
+        wanted = {day.isoformat() for day in days}
+        if not wanted:
+            return []
+        rows = self.conn.execute(
+            "SELECT day, recurring, data FROM events WHERE deleted_at IS NULL "
+            "AND (recurring = 1 OR day BETWEEN ? AND ?)",
+            (min(wanted), max(wanted))
+        )
+        return events_from_json(
+            [json.loads(data) for day, recurring, data in rows if recurring or day in wanted],
+            self.local_tz
+        )
+
+    def transitions(self, since_day: Optional[str] = None, observed_since: Optional[str] = None) -> List[dict]:
+        """
+        Historial de cambios de color
+
+        Args:
+            since_day: Sólo reuniones desde ese día (YYYY-MM-DD)
+            observed_since: Sólo cambios detectados desde ese instante (UTC ISO)
+        """
+        query = ("SELECT uid, recurrence_id, day, observed_at, old_color, new_color, "
+                 "old_completed, new_completed, sequence, last_modified FROM transitions WHERE 1 = 1")
+        params = []
+        if since_day:
+            query += " AND day >= ?"
+            params.append(since_day)
+        if observed_since:
+            query += " AND observed_at >= ?"
+            params.append(observed_since)
+        columns = ['uid', 'recurrence_id', 'day', 'observed_at', 'old_color', 'new_color',
+                   'old_completed', 'new_completed', 'sequence', 'last_modified']
+        return [
+            {**dict(zip(columns, row)), 'old_completed': bool(row[6]), 'new_completed': bool(row[7])}
+            for row in self.conn.execute(query + " ORDER BY id", params)
+        ]
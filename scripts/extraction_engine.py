@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Motor de extracción concurrente (asyncio)
+Calendar, HubSpot y, opcionalmente, el sheet se consultan al mismo tiempo,
+cada uno con su timeout y bajo un deadline global, así que la extracción
+diaria tarda lo que tarda la fuente más lenta y no la suma de todas
+
+Los extractores siguen usando requests (sesiones compartidas, thread-safe):
+las versiones async corren cada llamada bloqueante en un executor propio.
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+# Timeouts por fuente y deadline global (segundos), sobreescribibles en config['engine']
+DEFAULT_TIMEOUTS = {'calendar': 120, 'hubspot': 60, 'sheet': 90}
+DEFAULT_DEADLINE = 180
+
+
+async def _run_in_executor(executor: ThreadPoolExecutor, name: str, func: Callable, *args):
+    """Corre una llamada bloqueante en el executor, dentro de un span de la fuente"""
+    def call():
+        with span(f'fuente.{name}'):
+            try:
+                return func(*args)
+            except SystemExit as e:
+                # open_worksheet() sale del proceso si faltan las credenciales;
+                # asyncio relanza SystemExit fuera del loop, así que se convierte
+                raise RuntimeError(f"{name} terminó con SystemExit({e.code})") from e
+    return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+
+class AsyncCalendarExtractor:
+    """Versión async de CalendarExtractor"""
+
+    def __init__(self, extractor, executor: ThreadPoolExecutor):
+        self.extractor = extractor
+        self.executor = executor
+
+    async def extract_events(self, date: datetime) -> dict:
+        metrics = await _run_in_executor(self.executor, 'calendar', self.extractor.extract_events, date)
+        # Un feed caído deja las métricas vacías: la fuente se reporta como error, no como ok
+        failed = self.extractor.failed_feeds()
+        if failed:
+            raise RuntimeError(f"feeds con error: {', '.join(failed)}")
+        return metrics
+
+
+class AsyncHubSpotExtractor:
+    """Versión async de HubSpotExtractor"""
+
+    def __init__(self, extractor, executor: ThreadPoolExecutor):
+        self.extractor = extractor
+        self.executor = executor
+
+    async def get_contacts_created(self, date: datetime) -> Optional[int]:
+        return await _run_in_executor(self.executor, 'hubspot', self.extractor.get_contacts_created, date)
+
+
+class AsyncSheetReader:
+    """Lee del sheet "ACT comercial" la columna de un día (carga manual: reservas, inversión...)"""
+
+    def __init__(self, executor: ThreadPoolExecutor):
+        self.executor = executor
+
+    @staticmethod
+    def read_day(date: datetime) -> Optional[dict]:
+        # Import diferido: gspread y las credenciales sólo hacen falta si se usa el sheet
+        from read_sheet_to_json import open_worksheet, bisect_date_column, read_sheet_columns, extract_columns
+
+        worksheet = open_worksheet()
+        date_row = worksheet.row_values(2)
+        col = bisect_date_column(date_row, date.date())
+        if col >= len(date_row):
+            return None
+        records = extract_columns(read_sheet_columns(worksheet, col, col), 0, 0, col_offset=col).to_records()
+        return records[0] if records and records[0]['fecha'] == date.strftime('%Y-%m-%d') else None
+
+    async def read(self, date: datetime) -> Optional[dict]:
+        return await _run_in_executor(self.executor, 'sheet', self.read_day, date)
+
+
+class ExtractionEngine:
+    """
+    Ejecuta las fuentes de un día en paralelo
+
+    Una fuente que falla o excede su timeout no bloquea a las demás: se
+    reporta y se usa un valor por defecto: {} para el calendario, None para
+    los leads (sin dato, no 0) y None para el sheet.
+    """
+
+    def __init__(self, config: dict, calendar_extractor, hubspot_extractor, with_sheet: bool = False):
+        engine_config = config.get('engine') or {}
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(engine_config.get('timeouts') or {})}
+        self.deadline = engine_config.get('deadline', DEFAULT_DEADLINE)
+
+        # Executor propio: un thread que excede su timeout no ocupa el executor por defecto
+        self.executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='fuente')
+        self.calendar = AsyncCalendarExtractor(calendar_extractor, self.executor)
+        self.hubspot = AsyncHubSpotExtractor(hubspot_extractor, self.executor)
+        self.sheet = AsyncSheetReader(self.executor) if with_sheet else None
+
+    async def _source(self, name: str, coro, default) -> Tuple[object, dict]:
+        started = time.perf_counter()
+        try:
+            value = await asyncio.wait_for(coro, timeout=self.timeouts[name])
+            status = 'ok'
+        except asyncio.TimeoutError:
+            logger.error(f"⏱️ {name}: sin respuesta en {self.timeouts[name]}s")
+            value, status = default, 'timeout'
+        except Exception as e:
+            logger.error(f"❌ {name}: {e}")
+            value, status = default, 'error'
+        return value, {'estado': status, 'duracion_s': round(time.perf_counter() - started, 3)}
+
+    async def extract(self, date: datetime) -> Tuple[dict, Dict[str, dict]]:
+        """
+        Extrae todas las fuentes de un día
+
+        Returns:
+            (consolidated_data, {fuente: {'estado': 'ok'|'timeout'|'error'|'deadline', 'duracion_s'}})
+        """
+        sources = {
+            'calendar': (self.calendar.extract_events(date), {}),
+            'hubspot': (self.hubspot.get_contacts_created(date), None),
+        }
+        if self.sheet:
+            sources['sheet'] = (self.sheet.read(date), None)
+
+        tasks = {
+            name: asyncio.create_task(self._source(name, coro, default))
+            for name, (coro, default) in sources.items()
+        }
+        started = time.perf_counter()
+        await asyncio.wait(tasks.values(), timeout=self.deadline)
+
+        values = {}
+        report = {}
+        for name, task in tasks.items():
+            if task.done():
+                values[name], report[name] = task.result()
+            else:
+                task.cancel()
+                logger.error(f"⏱️ {name}: cancelada por el deadline global de {self.deadline}s")
+                values[name] = sources[name][1]
+                report[name] = {'estado': 'deadline', 'duracion_s': round(time.perf_counter() - started, 3)}
+
+        consolidated_data = {
+            'fecha': date.strftime('%Y-%m-%d'),
+            'leads_creados': values['hubspot'],
+            'reuniones': values['calendar']
+        }
+        if self.sheet:
+            consolidated_data['sheet'] = values['sheet']
+        return consolidated_data, report
+
+    def run(self, date: datetime) -> Tuple[dict, Dict[str, dict]]:
+        """Versión sincrónica de extract() para los scripts"""
+        try:
+            return asyncio.run(self.extract(date))
+        finally:
+            # No esperar a threads colgados: sus requests tienen su propio timeout HTTP
+            self.executor.shutdown(wait=False, cancel_futures=True)
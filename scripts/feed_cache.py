@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Cache en disco para el feed iCal
+Guarda el último cuerpo descargado con sus validadores (ETag / Last-Modified)
+para hacer GET condicionales, el resultado parseado indexado por hash de
+contenido y las expansiones de las series recurrentes
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from typing import Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(body: bytes) -> str:
+    """Hash SHA-256 del contenido del feed"""
+    return hashlib.sha256(body).hexdigest()
+
+
+class FeedCache:
+    """Cache de feeds HTTP con validadores y resultados parseados"""
+
+    def __init__(self, cache_dir: str = ".cache/calendar"):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self.stats = {
+            'feed_hits': 0,      # 304 Not Modified, cuerpo reutilizado
+            'feed_misses': 0,    # 200, cuerpo descargado
+            'parse_hits': 0,     # resultado parseado reutilizado
+            'parse_misses': 0    # feed parseado de nuevo
+        }
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _url_key(self, url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]
+
+    def _meta_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, f"feed_{self._url_key(url)}.json")
+
+    def _body_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, f"feed_{self._url_key(url)}.ics")
+
+    def _parsed_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"parsed_{key}.json")
+
+    def _expansions_path(self) -> str:
+        return os.path.join(self.cache_dir, "expansions.json")
+
+    def _load_meta(self, url: str) -> dict:
+        try:
+            with open(self._meta_path(url), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def conditional_headers(self, url: str) -> dict:
+        """Headers If-None-Match / If-Modified-Since para el último feed guardado"""
+        meta = self._load_meta(url)
+        if not meta or not os.path.exists(self._body_path(url)):
+            return {}
+
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def load_body(self, url: str) -> Optional[bytes]:
+        """Retorna el cuerpo guardado (tras un 304) o None si no existe"""
+        try:
+            with open(self._body_path(url), 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+
+        with self._lock:
+            self.stats['feed_hits'] += 1
+        return body
+
+    def iter_body(self, url: str, chunk_size: int = 65536) -> Optional[Iterator[bytes]]:
+        """Versión por bloques de load_body, para parsear en streaming"""
+        try:
+            f = open(self._body_path(url), 'rb')
+        except OSError:
+            return None
+
+        with self._lock:
+            self.stats['feed_hits'] += 1
+
+        def chunks():
+            with f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+
+        return chunks()
+
+    def store_body(self, url: str, body: bytes, etag: str = None, last_modified: str = None) -> None:
+        """Guarda un cuerpo recién descargado con sus validadores"""
+        for _ in self.tee_body(url, [body], etag=etag, last_modified=last_modified):
+            pass
+
+    def tee_body(self, url: str, chunks: Iterable[bytes], etag: str = None,
+                 last_modified: str = None) -> Iterator[bytes]:
+        """
+        Re-entrega los bloques de una descarga mientras los escribe a disco
+
+        El archivo sólo reemplaza a la copia anterior si la descarga termina completa.
+        """
+        with self._lock:
+            self.stats['feed_misses'] += 1
+
+        tmp_path = self._body_path(url) + ".tmp"
+        digest = hashlib.sha256()
+        size = 0
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+                yield chunk
+        os.replace(tmp_path, self._body_path(url))
+
+        # El resultado parseado del contenido anterior ya no sirve
+        previous_hash = self._load_meta(url).get('content_hash')
+        new_hash = digest.hexdigest()
+        if previous_hash and previous_hash != new_hash:
+            try:
+                os.remove(self._parsed_path(previous_hash))
+            except OSError:
+                pass
+
+        meta = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_hash': new_hash,
+            'size': size
+        }
+        with open(self._meta_path(url), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    def load_parsed(self, key: str) -> Optional[dict]:
+        """Retorna el resultado parseado guardado para una clave de contenido"""
+        try:
+            with open(self._parsed_path(key), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.stats['parse_misses'] += 1
+            return None
+
+        with self._lock:
+            self.stats['parse_hits'] += 1
+        return data
+
+    def store_parsed(self, key: str, data: dict) -> None:
+        """Guarda un resultado parseado para una clave de contenido"""
+        tmp_path = self._parsed_path(key) + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self._parsed_path(key))
+
+    def load_expansions(self) -> Optional[dict]:
+        """Expansiones RRULE guardadas por la ejecución anterior (None si no hay)"""
+        try:
+            with open(self._expansions_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store_expansions(self, data: dict) -> None:
+        """Guarda las expansiones RRULE (un solo archivo: las series no dependen del feed)"""
+        tmp_path = self._expansions_path() + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self._expansions_path())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Histórico columnar de métricas diarias
+Un arreglo tipado por métrica, indexado por fecha, que ida y vuelta
+reproduce exactamente los registros de data/latest.json
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+SETTERS = ['Daniela', 'Teresa', 'Matias', 'Robot']
+
+# (ruta del campo en el registro diario, dtype) en el orden de latest.json
+SCHEMA: List[Tuple[Tuple[str, ...], str]] = [
+    (('leads_creados',), 'int64'),
+    (('llamadas_realizadas',), 'int64'),
+    (('reuniones_agendadas_dia',), 'int64'),
+    (('inversion_campanas',), 'int64'),
+    (('costo_por_lead',), 'float64'),
+] + [
+    (('reuniones', setter, field), 'int64')
+    for setter in SETTERS
+    for field in ('agendadas', 'realizadas', 'llamadas')
+] + [
+    (('totales', field), 'int64')
+    for field in ('reuniones_agendadas', 'reuniones_realizadas', 'clientes_con_reserva', 'reservas')
+]
+
+COLUMNS = ['.'.join(path) for path, _ in SCHEMA]
+
+
+def _get_path(record: dict, path: Tuple[str, ...]):
+    value = record
+    for key in path:
+        value = value[key]
+    return value
+
+
+class MetricsHistory:
+    """
+    Histórico de métricas diarias en formato columnar
+
+    Atributos:
+        dates: np.ndarray de datetime64[D], ordenado y sin duplicados
+        columns: {'leads_creados': np.ndarray, 'reuniones.Daniela.agendadas': ..., ...}
+    """
+
+    def __init__(self, dates: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self.columns = {
+            name: np.asarray(columns[name], dtype=dtype)
+            for name, (_, dtype) in zip(COLUMNS, SCHEMA)
+        }
+        for name, values in self.columns.items():
+            if len(values) != len(self.dates):
+                raise ValueError(f"La columna {name} tiene {len(values)} valores para {len(self.dates)} fechas")
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    # ------------------------------------------------------------------
+    # Conversión desde / hacia el esquema de latest.json
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def empty(cls) -> 'MetricsHistory':
+        return cls(np.array([], dtype='datetime64[D]'), {name: [] for name in COLUMNS})
+
+    @classmethod
+    def from_records(cls, records: List[dict]) -> 'MetricsHistory':
+        """Construye el histórico desde la lista 'datos' de latest.json"""
+        if not records:
+            return cls.empty()
+
+        dates = np.array([record['fecha'] for record in records], dtype='datetime64[D]')
+        columns = {
+            name: [_get_path(record, path) for record in records]
+            for name, (path, _) in zip(COLUMNS, SCHEMA)
+        }
+        history = cls(dates, columns)
+        return history._sorted_unique()
+
+    @classmethod
+    def from_latest_json(cls, path: str) -> 'MetricsHistory':
+        """Carga el histórico desde un latest.json"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_records(json.load(f)['datos'])
+
+    def to_records(self) -> List[dict]:
+        """Reconstruye la lista 'datos' con el mismo esquema y orden de claves de latest.json"""
+        fechas = np.datetime_as_string(self.dates, unit='D').tolist()
+        values = {name: self.columns[name].tolist() for name in COLUMNS}
+
+        records = []
+        for i, fecha in enumerate(fechas):
+            record = {'fecha': fecha}
+            for name, (path, _) in zip(COLUMNS, SCHEMA):
+                target = record
+                for key in path[:-1]:
+                    target = target.setdefault(key, {})
+                target[path[-1]] = values[name][i]
+            records.append(record)
+        return records
+
+    # ------------------------------------------------------------------
+    # pandas
+    # ------------------------------------------------------------------
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """DataFrame indexado por fecha, una columna por métrica ('reuniones.Daniela.agendadas', ...)"""
+        return pd.DataFrame(self.columns, index=pd.DatetimeIndex(self.dates, name='fecha'))
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'MetricsHistory':
+        """Inverso de to_dataframe"""
+        return cls(df.index.values.astype('datetime64[D]'),
+                   {name: df[name].to_numpy() for name in COLUMNS})._sorted_unique()
+
+    # ------------------------------------------------------------------
+    # Operaciones vectorizadas
+    # ------------------------------------------------------------------
+
+    def _sorted_unique(self) -> 'MetricsHistory':
+        """Ordena por fecha; ante fechas repetidas gana la última aparición"""
+        if len(self.dates) == 0:
+            return self
+        # Recorrer al revés para que np.unique se quede con la última aparición
+        reversed_dates = self.dates[::-1]
+        _, first_idx = np.unique(reversed_dates, return_index=True)
+        idx = (len(self.dates) - 1 - first_idx)
+        return MetricsHistory(self.dates[idx], {name: values[idx] for name, values in self.columns.items()})
+
+    def merge(self, other: 'MetricsHistory') -> 'MetricsHistory':
+        """Combina dos históricos; los días de `other` reemplazan a los existentes"""
+        dates = np.concatenate([self.dates, other.dates])
+        columns = {name: np.concatenate([self.columns[name], other.columns[name]]) for name in COLUMNS}
+        return MetricsHistory(dates, columns)._sorted_unique()
+
+    def slice(self, start: Optional[str] = None, end: Optional[str] = None) -> 'MetricsHistory':
+        """Subconjunto de días en [start, end] (YYYY-MM-DD, inclusive)"""
+        mask = np.ones(len(self.dates), dtype=bool)
+        if start:
+            mask &= self.dates >= np.datetime64(start, 'D')
+        if end:
+            mask &= self.dates <= np.datetime64(end, 'D')
+        return MetricsHistory(self.dates[mask], {name: values[mask] for name, values in self.columns.items()})
+
+    def totals(self) -> Dict[str, float]:
+        """Suma de cada métrica sobre todo el histórico"""
+        return {name: values.sum().item() for name, values in self.columns.items()}
+
+    def resample(self, freq: str) -> pd.DataFrame:
+        """Sumas por período (pandas offset alias: 'W-MON', 'MS', ...)"""
+        return self.to_dataframe().resample(freq).sum()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Parser iCal en streaming
+Lee el feed por bloques y entrega un registro liviano por VEVENT, sin
+construir el árbol completo de componentes en memoria
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+import logging
+from datetime import datetime
+from typing import Iterable, Iterator, Tuple
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+# Propiedades que pueden repetirse dentro de un VEVENT
+MULTI_VALUED = {'EXDATE', 'RDATE'}
+
+
+def _iter_raw_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Corta los bloques de bytes en líneas físicas"""
+    buffer = b''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        lines = buffer.split(b'\n')
+        buffer = lines.pop()
+        yield from lines
+    if buffer:
+        yield buffer
+
+
+def iter_unfolded_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """
+    Convierte bloques de bytes en líneas de contenido ya "desplegadas"
+    (RFC 5545: una línea que empieza con espacio o tab continúa la anterior)
+    """
+    current = None
+    for raw in _iter_raw_lines(chunks):
+        raw = raw.rstrip(b'\r')
+        if raw[:1] in (b' ', b'\t'):
+            if current is not None:
+                current += raw[1:]
+            continue
+        if current is not None:
+            yield current.decode('utf-8', errors='replace')
+        current = raw
+
+    if current:
+        yield current.decode('utf-8', errors='replace')
+
+
+def parse_content_line(line: str) -> Tuple[str, dict, str]:
+    """
+    Separa una línea de contenido en (NOMBRE, parámetros, valor)
+
+    Ejemplo:
+        'DTSTART;TZID=America/Santiago:20260105T100000'
+        → ('DTSTART', {'TZID': 'America/Santiago'}, '20260105T100000')
+    """
+    # Camino rápido: sin comillas no hay ':' ni ';' escondidos en parámetros
+    if '"' not in line:
+        head, sep, value = line.partition(':')
+        if not sep:
+            return line.upper(), {}, ''
+        parts = head.split(';')
+        params = {}
+        for part in parts[1:]:
+            key, eq, val = part.partition('=')
+            if eq:
+                params[key.upper()] = val
+        return parts[0].upper(), params, value
+
+    in_quotes = False
+    colon = -1
+    for i, ch in enumerate(line):
+        if ch == '"':
+            in_quotes = not in_quotes
+        elif ch == ':' and not in_quotes:
+            colon = i
+            break
+
+    if colon == -1:
+        return line.upper(), {}, ''
+
+    head, value = line[:colon], line[colon + 1:]
+
+    parts = []
+    in_quotes = False
+    start = 0
+    for i, ch in enumerate(head):
+        if ch == '"':
+            in_quotes = not in_quotes
+        elif ch == ';' and not in_quotes:
+            parts.append(head[start:i])
+            start = i + 1
+    parts.append(head[start:])
+
+    params = {}
+    for part in parts[1:]:
+        if '=' in part:
+            key, val = part.split('=', 1)
+            params[key.upper()] = val.strip('"')
+
+    return parts[0].upper(), params, value
+
+
+def unescape_text(value: str) -> str:
+    """Deshace el escape de valores TEXT (\\n, \\, \\; \\\\)"""
+    if '\\' not in value:
+        return value
+
+    out = []
+    i = 0
+    while i < len(value):
+        ch = value[i]
+        if ch == '\\' and i + 1 < len(value):
+            nxt = value[i + 1]
+            out.append('\n' if nxt in 'nN' else nxt)
+            i += 2
+            continue
+        out.append(ch)
+        i += 1
+    return ''.join(out)
+
+
+def parse_ical_datetime(value: str, params: dict, default_tz):
+    """
+    Convierte un valor DATE / DATE-TIME de iCal
+
+    Returns:
+        date para VALUE=DATE, datetime con timezone en otro caso
+        (los valores "flotantes" se interpretan en default_tz)
+    """
+    value = value.strip()
+    if params.get('VALUE') == 'DATE' or len(value) == 8:
+        return datetime.strptime(value[:8], '%Y%m%d').date()
+
+    if value.endswith('Z'):
+        return datetime.strptime(value[:-1], '%Y%m%dT%H%M%S').replace(tzinfo=pytz.utc)
+
+    naive = datetime.strptime(value, '%Y%m%dT%H%M%S')
+    tz = default_tz
+    if 'TZID' in params:
+        try:
+            tz = pytz.timezone(params['TZID'])
+        except pytz.UnknownTimeZoneError:
+            logger.debug(f"TZID desconocido: {params['TZID']}")
+    return tz.localize(naive)
+
+
+def iter_vevents(chunks: Iterable[bytes]) -> Iterator[dict]:
+    """
+    Entrega un registro por cada VEVENT del feed
+
+    Cada registro es un dict NOMBRE → (valor, parámetros); las propiedades de
+    MULTI_VALUED se acumulan en una lista. Las propiedades de subcomponentes
+    (p.ej. VALARM) se ignoran.
+    """
+    record = None
+    depth = 0
+
+    for line in iter_unfolded_lines(chunks):
+        if not line:
+            continue
+        name, params, value = parse_content_line(line)
+
+        if name == 'BEGIN':
+            if record is not None:
+                depth += 1
+            elif value.upper() == 'VEVENT':
+                record = {}
+                depth = 1
+            continue
+
+        if name == 'END':
+            if record is None:
+                continue
+            depth -= 1
+            if depth == 0:
+                yield record
+                record = None
+            continue
+
+        if record is None or depth != 1:
+            continue
+
+        if name in MULTI_VALUED:
+            record.setdefault(name, []).append((value, params))
+        elif name not in record:
+            record[name] = (value, params)
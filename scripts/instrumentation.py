@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Métricas de ejecución: spans con duración y contadores de I/O
+Cada script registra sus etapas con `span()` y sus volúmenes con `incr()`
+(requests HTTP, bytes descargados, eventos parseados, celdas escritas...);
+al terminar, `instrumented_run` guarda el resumen en logs/run_metrics.json
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+import os
+import json
+import time
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from publish import atomic_write
+
+logger = logging.getLogger(__name__)
+
+RUN_METRICS_FILE = 'logs/run_metrics.json'
+
+
+class RunMetrics:
+    """
+    Spans y contadores de una ejecución
+
+    Los spans se anidan por thread; cada span guarda cuánto cambió cada
+    contador mientras estuvo abierto (incluye lo que sumen otros threads).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = datetime.now()
+        self._t0 = time.perf_counter()
+        self.spans = []
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.status = 'ok'
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def incr(self, counter: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] += value
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Mide una etapa
+
+        Uso:
+            with span('calendar.parseo', feed_bytes=len(body)) as s:
+                ...
+                s['eventos'] = n   # atributos extra
+        """
+        stack = self._stack()
+        record = {'nombre': name, 'padre': stack[-1]['nombre'] if stack else None, **attributes}
+        with self._lock:
+            before = dict(self.counters)
+        started = time.perf_counter()
+        stack.append(record)
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            stack.pop()
+            record['inicio_s'] = round(started - self._t0, 4)
+            record['duracion_s'] = round(time.perf_counter() - started, 4)
+            with self._lock:
+                deltas = {k: v - before.get(k, 0) for k, v in self.counters.items() if v != before.get(k, 0)}
+                if deltas:
+                    record['contadores'] = deltas
+                self.spans.append(record)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                'inicio': self.started_at.isoformat(timespec='seconds'),
+                'duracion_s': round(time.perf_counter() - self._t0, 4),
+                'estado': self.status,
+                'contadores': dict(sorted(self.counters.items())),
+                'spans': sorted(self.spans, key=lambda s: s['inicio_s'])
+            }
+
+    def log_summary(self, emit: Callable[[str], None] = None) -> None:
+        """Resume spans y contadores (con logger.info, o print en los scripts sin logging)"""
+        emit = emit or logger.info
+        data = self.to_dict()
+        emit(f"\n⏱️  Métricas de ejecución ({self.name}): {data['duracion_s']:.2f}s")
+        for record in data['spans']:
+            indent = '  ' if record['padre'] else ''
+            emit(f"  {indent}{record['nombre']:<28} {record['duracion_s']:>8.2f}s")
+        for counter, value in data['contadores'].items():
+            emit(f"  {counter:<30} {value:>10,}")
+
+
+# Ejecución actual (una por proceso)
+_current = RunMetrics('default')
+
+
+def start_run(name: str) -> RunMetrics:
+    """Inicia una ejecución nueva y la deja como actual"""
+    global _current
+    _current = RunMetrics(name)
+    return _current
+
+
+def current_run() -> RunMetrics:
+    return _current
+
+
+def span(name: str, **attributes):
+    """Span sobre la ejecución actual"""
+    return _current.span(name, **attributes)
+
+
+def incr(counter: str, value: int = 1) -> None:
+    """Suma a un contador de la ejecución actual"""
+    _current.incr(counter, value)
+
+
+def count_bytes(chunks: Iterable[bytes], counter: str = 'http.bytes') -> Iterator[bytes]:
+    """Deja pasar los bloques de una descarga en streaming sumando su tamaño"""
+    total = 0
+    try:
+        for chunk in chunks:
+            total += len(chunk)
+            yield chunk
+    finally:
+        incr(counter, total)
+
+
+def write_run_metrics(path: str = RUN_METRICS_FILE, run: Optional[RunMetrics] = None) -> str:
+    """
+    Guarda la ejecución en path, bajo la clave de su nombre
+
+    Los demás scripts del mismo job conservan su entrada, así que un solo
+    archivo muestra todas las etapas de la corrida nocturna.
+    """
+    run = run or _current
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    data[run.name] = run.to_dict()
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    atomic_write(path, json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8'))
+    return path
+
+
+def instrumented_run(name: str, path: str = RUN_METRICS_FILE,
+                     emit: Callable[[str], None] = None) -> Callable:
+    """
+    Decorador para el main() de un script: abre la ejecución, la envuelve en
+    un span 'total' y guarda run_metrics.json al terminar (también si falla)
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            run = start_run(name)
+            try:
+                with run.span('total'):
+                    return func(*args, **kwargs)
+            except SystemExit as e:
+                if e.code not in (None, 0):
+                    run.status = 'error'
+                raise
+            except BaseException:
+                run.status = 'error'
+                raise
+            finally:
+                try:
+                    write_run_metrics(path, run)
+                    run.log_summary(emit)
+                except OSError as e:
+                    logger.warning(f"⚠️ No se pudo guardar {path}: {e}")
+        return wrapper
+    return decorator
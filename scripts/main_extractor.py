@@ -9,61 +9,136 @@ Fecha: Enero 2026
 
 import os
 import sys
-import json
-import yaml
+import time
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List
+import argparse
+from datetime import datetime, timedelta, date as date_cls
+from typing import Dict, Iterator, List, Optional
 import requests
+import pytz
+from dateutil.parser import isoparse
 
 # Importar extractores
 sys.path.append(os.path.dirname(__file__))
 from calendar_extractor import CalendarExtractor
+from extraction_engine import ExtractionEngine
+from utils import (configure_http, get_http_policy, get_http_stats, get_rate_limiter,
+                   get_shared_session, parse_retry_after)
+from publish import write_json_if_changed
+from response_cache import ResponseCache
+from instrumentation import incr, instrumented_run, span
+from runtime import configure_logging, load_config
 
-# Configurar logging
-os.makedirs('logs', exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/main_extraction.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger(__name__)
 
+LOG_FILE = 'logs/main_extraction.log'
+
+
+# Límites del endpoint de búsqueda de HubSpot (CRM v3)
+SEARCH_PAGE_SIZE = 100
+SEARCH_RESULTS_CAP = 10000
+
+
+class HubSpotError(RuntimeError):
+    """Request a HubSpot que falló (error HTTP, red o 429 persistente)"""
+
 
 class HubSpotExtractor:
     """Extrae datos de HubSpot vía API"""
     
-    def __init__(self, api_key: str, account_id: str):
+    def __init__(self, api_key: str, account_id: str, timezone: str = "America/Santiago",
+                 cache: Optional[ResponseCache] = None):
         self.api_key = api_key
         self.account_id = account_id
+        self.timezone = pytz.timezone(timezone)
         self.base_url = "https://api.hubapi.com"
+        self.session = get_shared_session('hubspot')
+        policy = get_http_policy('hubspot')
+        self.timeout = policy['timeout']
+        self.backoff_factor = policy['backoff_factor']
+        self.max_throttle_retries = policy.get('max_throttle_retries', 6)
+        # Token bucket compartido por todos los threads (None = sin límite)
+        self.rate_limiter = get_rate_limiter('hubspot')
+        # Cache en disco de búsquedas sobre días cerrados (None = deshabilitado)
+        self.cache = cache
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
     
-    def _make_request(self, endpoint: str, params: dict = None, method: str = "GET") -> dict:
-        """Hace request a la API de HubSpot con manejo de errores"""
+    def _make_request(self, endpoint: str, params: dict = None, method: str = "GET",
+                      window_end_ms: Optional[int] = None) -> dict:
+        """
+        Hace request a la API de HubSpot, pasando por el cache si la consulta
+        termina en un día ya cerrado (window_end_ms, epoch en ms)
+        """
+        ttl = self.cache.ttl_for(window_end_ms) if self.cache and window_end_ms is not None else 0
+        if ttl == 0:
+            return self._send(endpoint, params, method)
+        
+        key = ResponseCache.make_key(method, endpoint, params, namespace=str(self.account_id))
+        data = self.cache.get(key)
+        if data is None:
+            data = self._send(endpoint, params, method)
+            self.cache.put(key, data, ttl, endpoint=endpoint)
+        return data
+    
+    def _send(self, endpoint: str, params: dict = None, method: str = "GET") -> dict:
+        """
+        Hace request a la API de HubSpot respetando su rate limit
+        
+        Cada request toma un token del bucket compartido. Un 429 pausa el
+        bucket (todos los threads) durante el Retry-After y se reintenta; los
+        demás errores se propagan como HubSpotError en vez de retornar {}.
+        """
         url = f"{self.base_url}{endpoint}"
-        try:
-            if method == "POST":
-                response = requests.post(url, headers=self.headers, json=params)
-            else:
-                response = requests.get(url, headers=self.headers, params=params)
+        for attempt in range(self.max_throttle_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                if method == "POST":
+                    response = self.session.post(url, headers=self.headers, json=params, timeout=self.timeout)
+                else:
+                    response = self.session.get(url, headers=self.headers, params=params, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                raise HubSpotError(f"Error en request a HubSpot: {e}") from e
             
-            response.raise_for_status()
+            if self.rate_limiter:
+                self.rate_limiter.update_from_headers(response.headers)
+            
+            if response.status_code == 429 and attempt < self.max_throttle_retries:
+                wait = parse_retry_after(response.headers.get('Retry-After'),
+                                         default=max(1.0, self.backoff_factor * 2 ** attempt))
+                logger.warning(f"⏳ HubSpot 429 (intento {attempt + 1}/{self.max_throttle_retries + 1}), "
+                               f"esperando {wait:.1f}s")
+                if self.rate_limiter:
+                    self.rate_limiter.pause(wait)
+                else:
+                    time.sleep(wait)
+                continue
+            
+            if response.status_code == 429:
+                raise HubSpotError(f"HubSpot respondió 429 en {self.max_throttle_retries + 1} intentos: {endpoint}")
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                raise HubSpotError(f"Error en request a HubSpot: {e}") from e
+            incr('http.bytes', len(response.content))
             return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error en request a HubSpot: {e}")
-            return {}
     
     def get_contacts_created(self, date: datetime) -> int:
-        """Obtiene cantidad de contactos creados en una fecha específica"""
-        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = start_of_day + timedelta(days=1)
+        """
+        Obtiene cantidad de contactos creados en una fecha específica
+        
+        El día es el de la timezone del extractor (como en get_contacts_created_range),
+        no la medianoche del servidor donde corre el script.
+        
+        Raises:
+            HubSpotError: si la búsqueda falla (un error no se reporta como 0 leads)
+        """
+        day = date.astimezone(self.timezone).date() if date.tzinfo else date.date()
+        start_of_day = self.timezone.localize(datetime.combine(day, datetime.min.time()))
+        end_of_day = self.timezone.localize(datetime.combine(day + timedelta(days=1), datetime.min.time()))
         
         start_ts = int(start_of_day.timestamp() * 1000)
         end_ts = int(end_of_day.timestamp() * 1000)
@@ -88,34 +163,263 @@ class HubSpotExtractor:
             "limit": 100
         }
         
-        try:
-            data = self._make_request(endpoint, params=body, method="POST")
-            total = data.get('total', 0)
-            logger.info(f"📊 Contactos creados el {date.date()}: {total}")
-            return total
-        except Exception as e:
-            logger.error(f"Error obteniendo contactos creados: {e}")
-            return 0
-
-
-def load_config(config_path: str = "config/config.yaml") -> dict:
-    """Carga la configuración desde archivo YAML"""
-    try:
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
-    except Exception as e:
-        logger.error(f"Error cargando configuración: {e}")
+        data = self._make_request(endpoint, params=body, method="POST", window_end_ms=end_ts)
+        total = data.get('total', 0)
+        logger.info(f"📊 Contactos creados el {day}: {total}")
+        return total
+    
+    def iter_contacts_created(self, start_ts: int, end_ts: int,
+                              properties: Optional[List[str]] = None) -> Iterator[dict]:
+        """
+        Itera los contactos creados en [start_ts, end_ts) (epoch en ms)
+        
+        Pagina la búsqueda con el cursor `after`, ordenando por createdate.
+        HubSpot no entrega más de 10.000 resultados por búsqueda, así que al
+        acercarse al límite se reinicia la búsqueda desde el último createdate
+        visto, saltando los contactos de ese instante que ya se entregaron.
+        """
+        endpoint = "/crm/v3/objects/contacts/search"
+        properties = properties or ["createdate"]
+        if "createdate" not in properties:
+            properties = ["createdate"] + list(properties)
+        
+        lower_ts = start_ts
+        boundary_ids = set()
+        
+        while True:
+            after = None
+            fetched = 0
+            last_ts = None
+            last_ids = set()
+            
+            while True:
+                body = {
+                    "filterGroups": [{
+                        "filters": [
+                            {"propertyName": "createdate", "operator": "GTE", "value": str(lower_ts)},
+                            {"propertyName": "createdate", "operator": "LT", "value": str(end_ts)}
+                        ]
+                    }],
+                    "sorts": [{"propertyName": "createdate", "direction": "ASCENDING"}],
+                    "properties": properties,
+                    "limit": SEARCH_PAGE_SIZE
+                }
+                if after:
+                    body["after"] = after
+                
+                data = self._make_request(endpoint, params=body, method="POST", window_end_ms=end_ts)
+                
+                for contact in data.get('results', []):
+                    created = contact.get('properties', {}).get('createdate')
+                    if not created:
+                        continue
+                    created_ts = int(isoparse(created).timestamp() * 1000)
+                    if created_ts != last_ts:
+                        last_ts = created_ts
+                        last_ids = set()
+                    last_ids.add(contact.get('id'))
+                    
+                    if created_ts == lower_ts and contact.get('id') in boundary_ids:
+                        continue
+                    yield contact
+                
+                fetched += len(data.get('results', []))
+                incr('hubspot.contactos', len(data.get('results', [])))
+                after = data.get('paging', {}).get('next', {}).get('after')
+                if not after:
+                    return
+                if fetched + SEARCH_PAGE_SIZE > SEARCH_RESULTS_CAP:
+                    break
+            
+            # Reiniciar la búsqueda desde el último instante visto
+            if last_ts is None or last_ts == lower_ts:
+                logger.warning("⚠️ Más de 10.000 contactos con el mismo createdate, resultados truncados")
+                return
+            lower_ts = last_ts
+            boundary_ids = last_ids
+    
+    def _bucket_contacts_by_day(self, start_date: date_cls, end_date: date_cls,
+                                keep_records: bool,
+                                properties: Optional[List[str]] = None) -> Dict[str, dict]:
+        """Agrupa por día local los contactos creados entre start_date y end_date (inclusive)"""
+        window_start = self.timezone.localize(datetime.combine(start_date, datetime.min.time()))
+        window_end = self.timezone.localize(
+            datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        )
+        
+        buckets = {}
+        day = start_date
+        while day <= end_date:
+            buckets[day.strftime('%Y-%m-%d')] = {'total': 0, 'contactos': []}
+            day += timedelta(days=1)
+        
+        contacts = self.iter_contacts_created(
+            int(window_start.timestamp() * 1000),
+            int(window_end.timestamp() * 1000),
+            properties=properties
+        )
+        for contact in contacts:
+            created = isoparse(contact['properties']['createdate']).astimezone(self.timezone)
+            bucket = buckets.get(created.strftime('%Y-%m-%d'))
+            if bucket is None:
+                continue
+            bucket['total'] += 1
+            if keep_records:
+                bucket['contactos'].append({
+                    'id': contact.get('id'),
+                    'createdate': created.isoformat(),
+                    **{k: v for k, v in contact.get('properties', {}).items() if k != 'createdate'}
+                })
+        
+        return buckets
+    
+    def get_contacts_created_range(self, start_date: date_cls, end_date: date_cls) -> Dict[str, int]:
+        """
+        Obtiene la cantidad de contactos creados por día en un rango de fechas
+        
+        Una sola búsqueda paginada cubre todo el rango (en vez de un request por día).
+        
+        Returns:
+            {'YYYY-MM-DD': total, ...} para cada día del rango, incluidos los días en 0
+        """
+        buckets = self._bucket_contacts_by_day(start_date, end_date, keep_records=False)
+        counts = {fecha: bucket['total'] for fecha, bucket in buckets.items()}
+        logger.info(f"📊 Contactos creados entre {start_date} y {end_date}: {sum(counts.values())}")
+        return counts
+    
+    def get_contacts_by_day(self, start_date: date_cls, end_date: date_cls,
+                            properties: Optional[List[str]] = None) -> Dict[str, List[dict]]:
+        """
+        Obtiene los contactos creados en un rango, agrupados por día local
+        
+        Returns:
+            {'YYYY-MM-DD': [{'id': ..., 'createdate': ..., <properties>}, ...], ...}
+        """
+        buckets = self._bucket_contacts_by_day(start_date, end_date, keep_records=True,
+                                               properties=properties)
+        return {fecha: bucket['contactos'] for fecha, bucket in buckets.items()}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parsea los argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Extracción de datos HubSpot + Google Calendar")
+    parser.add_argument('--from', dest='date_from', type=date_cls.fromisoformat,
+                        help="Primer día del backfill (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='date_to', type=date_cls.fromisoformat,
+                        help="Último día del backfill, inclusive (YYYY-MM-DD). Default: --from")
+    parser.add_argument('--with-sheet', action='store_true',
+                        help="Leer también la columna del día en el sheet (carga manual)")
+    parser.add_argument('--bypass-cache', action='store_true',
+                        help="Consultar HubSpot aunque la respuesta esté en cache (y refrescarla)")
+    return parser.parse_args(argv)
+
+
+def log_calendar_cache_stats(calendar_extractor: CalendarExtractor):
+    """Loguea hits/misses del cache del feed iCal y los hits por regla de setter"""
+    stats = calendar_extractor.cache_stats()
+    if stats:
+        logger.info(f"\nCache iCal:")
+        logger.info(f"  Feed    | Hits: {stats['feed_hits']:2} | Misses: {stats['feed_misses']:2}")
+        logger.info(f"  Parseo  | Hits: {stats['parse_hits']:2} | Misses: {stats['parse_misses']:2}")
+        expansions = calendar_extractor.expander.stats
+        logger.info(f"  RRULE   | Hits: {expansions['hits']:2} | Misses: {expansions['expansions']:2}")
+    calendar_extractor.setter_rules.log_stats()
+
+
+def log_hubspot_cache_stats(hubspot_extractor: HubSpotExtractor):
+    """Loguea hits/misses del cache de respuestas de HubSpot"""
+    if hubspot_extractor.cache:
+        stats = hubspot_extractor.cache.stats
+        logger.info(f"\nCache HubSpot:")
+        logger.info(f"  Búsquedas | Hits: {stats['hits']:3} | Misses: {stats['misses']:3} | "
+                    f"Expiradas: {stats['expired']:3} | Desalojadas: {stats['evicted']:3}")
+
+
+def save_extracted(consolidated_data: dict) -> str:
+    """Guarda los datos consolidados de un día en data/extracted_YYYYMMDD.json"""
+    os.makedirs('data', exist_ok=True)
+    output_file = f"data/extracted_{consolidated_data['fecha'].replace('-', '')}.json"
+    if not write_json_if_changed(output_file, consolidated_data):
+        logger.info(f"⏭️  {output_file} sin cambios")
+    return output_file
+
+
+def run_backfill(config: dict, hubspot_extractor: HubSpotExtractor,
+                 date_from: date_cls, date_to: date_cls) -> List[dict]:
+    """
+    Extrae un rango de días: descarga el calendario y busca los leads en HubSpot
+    una sola vez para todo el rango, y guarda el archivo de cada día
+    """
+    if date_to < date_from:
+        logger.error(f"❌ Rango inválido: {date_from} > {date_to}")
         sys.exit(1)
+    
+    days = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+    logger.info(f"📅 Backfill de {len(days)} días: {date_from} → {date_to}")
+    
+    started = time.perf_counter()
+    
+    calendar_extractor = CalendarExtractor(config)
+    with span('calendar', dias=len(days)):
+        calendar_by_day = calendar_extractor.extract_events_range(date_from, date_to)
+    if not calendar_by_day:
+        logger.warning("⚠️ Sin calendario: las reuniones quedarán vacías")
+    
+    # Una sola búsqueda paginada cubre los leads de todo el rango
+    with span('hubspot', dias=len(days)):
+        try:
+            leads_by_day = hubspot_extractor.get_contacts_created_range(date_from, date_to)
+        except HubSpotError as e:
+            # Un error no se reporta como 0 leads: los días quedan sin dato
+            logger.error(f"❌ Error consultando HubSpot para el rango: {e}")
+            leads_by_day = {}
+    
+    results = []
+    with span('guardado', dias=len(days)):
+        for day in days:
+            fecha = day.strftime('%Y-%m-%d')
+            consolidated = {
+                'fecha': fecha,
+                'leads_creados': leads_by_day.get(fecha),
+                'reuniones': calendar_by_day.get(fecha, {})
+            }
+            try:
+                save_extracted(consolidated)
+            except OSError as e:
+                logger.error(f"❌ Error guardando {fecha}: {e}")
+                continue
+            results.append(consolidated)
+    
+    elapsed = time.perf_counter() - started
+    
+    logger.info("\n" + "="*80)
+    logger.info("✅ RESUMEN DE BACKFILL")
+    logger.info("="*80)
+    logger.info(f"Días procesados: {len(results)}/{len(days)}")
+    for data in results:
+        agendadas = sum(m['agendadas'] for m in data['reuniones'].values())
+        realizadas = sum(m['realizadas'] for m in data['reuniones'].values())
+        leads = 'n/d' if data['leads_creados'] is None else data['leads_creados']
+        logger.info(f"  {data['fecha']} | Leads: {leads:>3} | Agendadas: {agendadas:2} | Realizadas: {realizadas:2}")
+    log_calendar_cache_stats(calendar_extractor)
+    log_hubspot_cache_stats(hubspot_extractor)
+    logger.info(f"⏱️  {elapsed:.1f}s ({len(results) / elapsed if elapsed > 0 else 0:.2f} días/s)")
+    
+    return results
 
 
-def main():
-    """Función principal - Ejecuta extracción completa"""
+@instrumented_run('main_extractor')
+def main(argv: Optional[List[str]] = None, config: Optional[dict] = None):
+    """Función principal - Ejecuta extracción completa (config ya cargado por el CLI, o config.yaml)"""
+    args = parse_args(argv)
+    
     logger.info("=" * 80)
     logger.info("🚀 INICIANDO EXTRACCIÓN COMPLETA")
     logger.info("=" * 80)
     
     # Cargar configuración
-    config = load_config()
+    config = config or load_config()
+    configure_http(config.get('http'))
     
     # Validar API key
     api_key = config['hubspot']['api_key']
@@ -123,33 +427,42 @@ def main():
         logger.error("❌ ERROR: Debes configurar tu API key de HubSpot en config/config.yaml")
         sys.exit(1)
     
+    hubspot_cache = ResponseCache.from_config(config['hubspot'].get('cache'), bypass=args.bypass_cache)
+    
+    # Modo backfill (--from/--to)
+    if args.date_from:
+        hubspot_extractor = HubSpotExtractor(
+            api_key=api_key,
+            account_id=config['hubspot']['account_id'],
+            timezone=config['extraction']['timezone'],
+            cache=hubspot_cache
+        )
+        return run_backfill(config, hubspot_extractor, args.date_from, args.date_to or args.date_from)
+    
     # Fecha a procesar (ayer)
     yesterday = datetime.now() - timedelta(days=config['extraction']['days_back'])
     logger.info(f"📅 Procesando datos para: {yesterday.date()}")
     
     # ========================================
-    # 1. EXTRACCIÓN DE GOOGLE CALENDAR
+    # 1. EXTRACCIÓN CONCURRENTE (CALENDAR + HUBSPOT [+ SHEET])
     # ========================================
     logger.info("\n" + "="*80)
-    logger.info("🗓️  PASO 1: Extracción de Google Calendar")
+    logger.info("🗓️  PASO 1-2: Extracción de Google Calendar y HubSpot en paralelo")
     logger.info("="*80)
     
     calendar_extractor = CalendarExtractor(config)
-    calendar_metrics = calendar_extractor.extract_events(yesterday)
-    
-    # ========================================
-    # 2. EXTRACCIÓN DE HUBSPOT
-    # ========================================
-    logger.info("\n" + "="*80)
-    logger.info("📊 PASO 2: Extracción de HubSpot")
-    logger.info("="*80)
-    
     hubspot_extractor = HubSpotExtractor(
         api_key=api_key,
-        account_id=config['hubspot']['account_id']
+        account_id=config['hubspot']['account_id'],
+        timezone=config['extraction']['timezone'],
+        cache=hubspot_cache
     )
+    engine = ExtractionEngine(config, calendar_extractor, hubspot_extractor, with_sheet=args.with_sheet)
     
-    leads_creados = hubspot_extractor.get_contacts_created(yesterday)
+    with span('extraccion', fuentes=3 if args.with_sheet else 2):
+        consolidated_data, sources_report = engine.run(yesterday)
+    calendar_metrics = consolidated_data['reuniones']
+    leads_creados = consolidated_data['leads_creados']
     
     # ========================================
     # 3. CONSOLIDAR DATOS
@@ -158,17 +471,12 @@ def main():
     logger.info("📋 PASO 3: Consolidando datos")
     logger.info("="*80)
     
-    consolidated_data = {
-        'fecha': yesterday.strftime('%Y-%m-%d'),
-        'leads_creados': leads_creados,
-        'reuniones': calendar_metrics
-    }
+    for source, report in sources_report.items():
+        logger.info(f"  {source:10} | {report['estado']:8} | {report['duracion_s']:.2f}s")
     
     # Guardar en JSON para debugging
-    os.makedirs('data', exist_ok=True)
-    output_file = f"data/extracted_{yesterday.strftime('%Y%m%d')}.json"
-    with open(output_file, 'w') as f:
-        json.dump(consolidated_data, f, indent=2)
+    with span('guardado'):
+        output_file = save_extracted(consolidated_data)
     logger.info(f"💾 Datos guardados en: {output_file}")
     
     # ========================================
@@ -178,7 +486,10 @@ def main():
     logger.info("✅ RESUMEN DE EXTRACCIÓN")
     logger.info("="*80)
     logger.info(f"Fecha procesada: {yesterday.date()}")
-    logger.info(f"Leads creados: {leads_creados}")
+    if leads_creados is None:
+        logger.error("Leads creados: sin dato (la extracción de HubSpot falló)")
+    else:
+        logger.info(f"Leads creados: {leads_creados}")
     logger.info(f"\nReuniones por setter:")
     
     for setter, metrics in calendar_metrics.items():
@@ -186,6 +497,13 @@ def main():
             show_up = (metrics['realizadas'] / metrics['agendadas']) * 100
             logger.info(f"  {setter:10} | Agendadas: {metrics['agendadas']:2} | Realizadas: {metrics['realizadas']:2} | Show-up: {show_up:.1f}%")
     
+    log_calendar_cache_stats(calendar_extractor)
+    log_hubspot_cache_stats(hubspot_extractor)
+    
+    logger.info(f"\nConexiones HTTP:")
+    for service, stats in get_http_stats().items():
+        logger.info(f"  {service:10} | Requests: {stats['requests']:3} | Abiertas: {stats['connections_opened']:2} | Reutilizadas: {stats['connections_reused']:3}")
+    
     logger.info("\n" + "="*80)
     logger.info("🎉 EXTRACCIÓN COMPLETADA EXITOSAMENTE")
     logger.info("="*80)
@@ -194,4 +512,5 @@ def main():
 
 
 if __name__ == "__main__":
+    configure_logging(LOG_FILE)
     main()
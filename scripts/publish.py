@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Etapa de publicación de los JSON del dashboard
+Además del archivo legible (indentado) escribe una variante minificada, que
+es la que lee el dashboard (Vercel la comprime al servirla según Accept-Encoding).
+Las escrituras son atómicas y se omiten si los datos (sin campos volátiles)
+no cambiaron, para no generar commits ni deploys vacíos
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+import os
+import json
+import hashlib
+from typing import Dict, Iterable, Optional
+
+# Campos que cambian en cada ejecución aunque los datos sean los mismos
+VOLATILE_FIELDS = ('fecha_actualizacion',)
+
+
+def encode_pretty(data: dict) -> bytes:
+    """JSON indentado (para debugging y diffs legibles)"""
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def encode_minified(data: dict) -> bytes:
+    """JSON sin espacios ni indentación"""
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def encode_variants(data: dict) -> Dict[str, bytes]:
+    """
+    Retorna {sufijo: bytes} para cada variante publicada
+
+    Sufijos: '.json' (indentado) y '.min.json'
+    """
+    return {
+        '.json': encode_pretty(data),
+        '.min.json': encode_minified(data),
+    }
+
+
+def data_hash(data: dict, volatile: Iterable[str] = VOLATILE_FIELDS) -> str:
+    """SHA-256 del contenido canónico, sin los campos volátiles de primer nivel"""
+    stable = {k: v for k, v in data.items() if k not in volatile}
+    canonical = json.dumps(stable, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def existing_data_hash(path: str, volatile: Iterable[str] = VOLATILE_FIELDS) -> Optional[str]:
+    """data_hash del JSON ya publicado en path (None si no existe o no se puede leer)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return data_hash(json.load(f), volatile)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def atomic_write(path: str, body: bytes) -> None:
+    """Escribe a un temporal y lo renombra: nunca queda un archivo a medio escribir"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+def write_json_if_changed(path: str, data: dict, volatile: Iterable[str] = VOLATILE_FIELDS) -> bool:
+    """
+    Escribe un JSON indentado sólo si sus datos cambiaron
+
+    Returns:
+        True si se escribió, False si se omitió por no haber cambios
+    """
+    if existing_data_hash(path, volatile) == data_hash(data, volatile):
+        return False
+    atomic_write(path, encode_pretty(data))
+    return True
+
+
+def write_variants(data: dict, base_path: str, volatile: Iterable[str] = VOLATILE_FIELDS) -> Dict[str, int]:
+    """
+    Escribe todas las variantes de un JSON publicado
+
+    Si el archivo indentado existente tiene los mismos datos (ignorando los
+    campos volátiles) y todas las variantes existen, no se escribe nada.
+
+    Args:
+        data: Contenido a publicar
+        base_path: Ruta sin extensión (p.ej. 'data/latest')
+        volatile: Campos de primer nivel que no cuentan como cambio
+
+    Returns:
+        {ruta: bytes escritos}; vacío si no hubo cambios
+    """
+    suffixes = ['.json', '.min.json']
+    unchanged = existing_data_hash(f"{base_path}.json", volatile) == data_hash(data, volatile)
+    if unchanged and all(os.path.exists(f"{base_path}{suffix}") for suffix in suffixes):
+        return {}
+
+    sizes = {}
+    for suffix, body in encode_variants(data).items():
+        path = f"{base_path}{suffix}"
+        atomic_write(path, body)
+        sizes[path] = len(body)
+    return sizes
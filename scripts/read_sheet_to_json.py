@@ -10,10 +10,20 @@ Fecha: Enero 2026
 import os
 import sys
 import json
+import argparse
 import gspread
+from gspread.utils import rowcol_to_a1
 from google.oauth2.service_account import Credentials
 from datetime import datetime, timedelta
 
+sys.path.append(os.path.dirname(__file__))
+from history_store import MetricsHistory
+from rollups import build_rollups
+from shards import write_month_shards
+from publish import data_hash, write_variants
+from sheet_parser import SheetParser, report_malformed
+from instrumentation import incr, instrumented_run, span
+
 # ID del Google Sheet
 SHEET_ID = "1E15l2Ac6EJsMEWS5SaOJnQHkNs6VQISBF1XfZ4NfrK4"
 SHEET_NAME = "ACT comercial"
@@ -21,33 +31,57 @@ SHEET_NAME = "ACT comercial"
 # Scopes necesarios para Google Sheets API
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly']
 
+# Última fila con datos que lee extract_data_from_column (Fila 25 = costo por lead)
+LAST_DATA_ROW = 25
 
-def read_sheet_with_service_account():
+# Días ya ingeridos que se vuelven a leer en modo incremental (correcciones manuales)
+RECHECK_DAYS = 3
+
+# Rutas publicadas sin extensión: se escriben .json y .min.json
+OUTPUT_BASE = 'data/latest'
+ROLLUPS_BASE = 'data/rollups'
+OUTPUT_FILE = OUTPUT_BASE + '.json'
+ROLLUPS_FILE = ROLLUPS_BASE + '.json'
+
+# Parser de la matriz (tabla de filas compilada una sola vez)
+SHEET_PARSER = SheetParser()
+
+
+def open_worksheet():
     """
-    Lee el Google Sheet usando Service Account
+    Abre la hoja "ACT comercial" usando Service Account
     """
-    try:
-        # Cargar credenciales
-        credentials_path = 'config/google_credentials.json'
+    # Cargar credenciales
+    credentials_path = 'config/google_credentials.json'
+
+    if not os.path.exists(credentials_path):
+        print(f"❌ No se encontró {credentials_path}")
+        print("💡 Asegúrate de que el archivo de credenciales existe")
+        sys.exit(1)
+
+    print(f"🔐 Cargando credenciales desde {credentials_path}...")
+    creds = Credentials.from_service_account_file(credentials_path, scopes=SCOPES)
 
-        if not os.path.exists(credentials_path):
-            print(f"❌ No se encontró {credentials_path}")
-            print("💡 Asegúrate de que el archivo de credenciales existe")
-            sys.exit(1)
+    # Autenticar con gspread
+    client = gspread.authorize(creds)
 
-        print(f"🔐 Cargando credenciales desde {credentials_path}...")
-        creds = Credentials.from_service_account_file(credentials_path, scopes=SCOPES)
+    print(f"📥 Abriendo Google Sheet...")
+    sheet = client.open_by_key(SHEET_ID)
+    return sheet.worksheet(SHEET_NAME)
 
-        # Autenticar con gspread
-        client = gspread.authorize(creds)
 
-        print(f"📥 Abriendo Google Sheet...")
-        sheet = client.open_by_key(SHEET_ID)
-        worksheet = sheet.worksheet(SHEET_NAME)
+def read_sheet_with_service_account():
+    """
+    Lee el Google Sheet usando Service Account
+    """
+    try:
+        worksheet = open_worksheet()
 
         # Obtener todos los valores
         print(f"📊 Descargando datos...")
-        all_values = worksheet.get_all_values()
+        with span('sheet.lectura'):
+            all_values = worksheet.get_all_values()
+        incr('sheet.celdas_leidas', sum(len(row) for row in all_values))
 
         print(f"✅ Descargado {len(all_values)} filas")
         return all_values
@@ -67,6 +101,94 @@ def parse_date(date_str):
         return None
 
 
+def read_sheet_columns(worksheet, first_col, last_col):
+    """
+    Lee sólo el bloque de columnas [first_col, last_col] (0-indexed) hasta LAST_DATA_ROW
+
+    Retorna las filas con la misma forma que get_all_values(), pero con la
+    columna first_col en el índice 0.
+    """
+    a1_range = f"{rowcol_to_a1(1, first_col + 1)}:{rowcol_to_a1(LAST_DATA_ROW, last_col + 1)}"
+    print(f"📊 Descargando rango {a1_range}...")
+    with span('sheet.lectura', rango=a1_range):
+        rows = worksheet.get(a1_range)
+    incr('sheet.celdas_leidas', sum(len(row) for row in rows))
+    print(f"✅ Descargado {last_col - first_col + 1} columnas")
+    return [list(row) for row in rows]
+
+
+def bisect_date_column(date_row, target_date, lo=0):
+    """
+    Búsqueda binaria en la fila de fechas (ordenada)
+
+    Retorna el índice de la primera columna con fecha >= target_date, o
+    len(date_row) si no hay ninguna. Las celdas vacías o sin fecha se saltan
+    tomando la siguiente celda con fecha válida a su derecha.
+    """
+    hi = len(date_row)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        j = mid
+        fecha = None
+        while j < hi:
+            fecha = parse_date(date_row[j]) if date_row[j].strip() else None
+            if fecha:
+                break
+            j += 1
+
+        if fecha is None or fecha.date() >= target_date:
+            hi = mid
+        else:
+            lo = j + 1
+    return lo
+
+
+def load_existing_output(output_file):
+    """Carga el latest.json existente (o None si no existe o está corrupto)"""
+    try:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if data.get('datos') else None
+
+
+def extract_incremental(existing, yesterday, recheck_days=RECHECK_DAYS):
+    """
+    Extrae sólo los días posteriores al último ingerido (más recheck_days
+    días ya guardados) y los combina con el histórico existente
+
+    Los días re-leídos reemplazan a los guardados.
+    """
+    history = MetricsHistory.from_records(existing['datos'])
+    last_fecha = datetime.strptime(existing['fecha_ultimo_dato'], "%Y-%m-%d")
+    recheck_from = (last_fecha - timedelta(days=recheck_days)).date()
+    print(f"♻️  Modo incremental: último día guardado {last_fecha.date()}, re-leyendo desde {recheck_from}")
+
+    try:
+        worksheet = open_worksheet()
+        date_row = worksheet.row_values(2)
+
+        first_col = bisect_date_column(date_row, recheck_from)
+        last_col = bisect_date_column(date_row, yesterday.date() + timedelta(days=1), lo=first_col) - 1
+
+        if last_col < first_col:
+            print("✅ No hay días nuevos en el sheet")
+            return history
+
+        rows = read_sheet_columns(worksheet, first_col, last_col)
+    except Exception as e:
+        print(f"❌ Error leyendo sheet: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+    new_days = extract_columns(rows, 0, last_col - first_col, col_offset=first_col)
+
+    print(f"📅 Días re-leídos/nuevos: {len(new_days)}")
+    return history.merge(new_days)
+
+
 def find_yesterday_column(rows, yesterday):
     """
     Encuentra la última columna que contiene datos hasta AYER
@@ -93,13 +215,21 @@ def find_yesterday_column(rows, yesterday):
     return last_valid_col
 
 
+def extract_columns(rows, first_col, last_col, col_offset=0):
+    """Parsea las columnas [first_col, last_col] y reporta las celdas inválidas"""
+    with span('sheet.parseo'):
+        history, issues = SHEET_PARSER.parse(rows, first_col, last_col, col_offset=col_offset)
+    incr('sheet.dias_parseados', len(history))
+    incr('sheet.celdas_invalidas', len(issues))
+    report_malformed(issues)
+    return history
+
+
 def extract_all_data_until_yesterday(rows, last_col_index):
     """
     Extrae TODOS los datos desde el inicio hasta la columna de AYER
-    Retorna una lista con todos los días
+    Retorna un MetricsHistory con todos los días
     """
-    all_days = []
-
     # Empezar desde la primera columna con fecha (normalmente columna 0 o 1)
     # Buscar la primera columna que tenga una fecha válida
     date_row = rows[1] if len(rows) > 1 else []
@@ -112,133 +242,47 @@ def extract_all_data_until_yesterday(rows, last_col_index):
 
     if first_col == -1:
         print("❌ No se encontró ninguna columna con fechas válidas")
-        return []
+        return MetricsHistory.empty()
 
     print(f"📅 Extrayendo datos desde columna {first_col} hasta {last_col_index}")
 
-    # Extraer datos de cada columna
-    for col_idx in range(first_col, last_col_index + 1):
-        data = extract_data_from_column(rows, col_idx)
-        if data:
-            all_days.append(data)
+    # Todas las columnas de una vez (cada fila del sheet como vector)
+    return extract_columns(rows, first_col, last_col_index)
 
-    return all_days
 
+def extract_full(yesterday):
+    """Lee el sheet completo y extrae todos los días hasta ayer"""
+    # Leer sheet
+    rows = read_sheet_with_service_account()
 
-def extract_data_from_column(rows, col_index):
-    """Extrae datos de una columna específica"""
-    try:
-        # Fila 2 tiene la fecha (índice 1 en lista 0-based)
-        fecha_str = rows[1][col_index].strip() if len(rows) > 1 and col_index < len(rows[1]) else ""
-
-        if not fecha_str:
-            return None
-
-        fecha = parse_date(fecha_str)
-        if not fecha:
-            return None
-
-        # Extraer valores (recordar que las filas son 0-indexed)
-        def get_value(row_index):
-            try:
-                if row_index < len(rows) and col_index < len(rows[row_index]):
-                    val = rows[row_index][col_index].strip()
-                    return int(val) if val else 0
-                return 0
-            except:
-                return 0
-
-        def get_money_value(row_index):
-            try:
-                if row_index < len(rows) and col_index < len(rows[row_index]):
-                    val = rows[row_index][col_index].strip()
-                    # Remover símbolos de moneda y puntos/comas
-                    val = val.replace('$', '').replace('.', '').replace(',', '').strip()
-                    return int(val) if val else 0
-                return 0
-            except:
-                return 0
-
-        def get_decimal_value(row_index):
-            try:
-                if row_index < len(rows) and col_index < len(rows[row_index]):
-                    val = rows[row_index][col_index].strip()
-                    # Remover símbolos de moneda y convertir coma a punto
-                    val = val.replace('$', '').replace('.', '').replace(',', '.').strip()
-                    return float(val) if val else 0.0
-                return 0.0
-            except:
-                return 0.0
-
-        # Filas según la estructura del sheet (0-indexed):
-        # Fila 3 = índice 2, Fila 4 = índice 3, etc.
-        reuniones_agendadas = get_value(2)  # Fila 3
-        reuniones_realizadas = get_value(3)  # Fila 4
-        clientes_con_reserva = get_value(4)  # Fila 5
-        reservas = get_value(5)  # Fila 6
-
-        # Setters
-        dani_llamadas = get_value(9)   # Fila 10
-        dani_reuniones = get_value(10)  # Fila 11
-        tere_llamadas = get_value(11)  # Fila 12
-        tere_reuniones = get_value(12)  # Fila 13
-        mati_llamadas = get_value(13)  # Fila 14
-        mati_reuniones = get_value(14)  # Fila 15
-        robot_llamadas = get_value(15)  # Fila 16
-        robot_reuniones = get_value(16)  # Fila 17
-
-        leads_creados = get_value(20)  # Fila 21
-        llamadas_realizadas = get_value(21)  # Fila 22
-        reuniones_agendadas_dia = get_value(22)  # Fila 23
-        inversion_campanas = get_money_value(23)  # Fila 24
-        costo_por_lead = get_decimal_value(24)  # Fila 25
-
-        # Construir estructura de datos
-        data = {
-            "fecha": fecha.strftime("%Y-%m-%d"),
-            "leads_creados": leads_creados,
-            "llamadas_realizadas": llamadas_realizadas,
-            "reuniones_agendadas_dia": reuniones_agendadas_dia,
-            "inversion_campanas": inversion_campanas,
-            "costo_por_lead": round(costo_por_lead, 3),
-            "reuniones": {
-                "Daniela": {
-                    "agendadas": dani_reuniones,
-                    "realizadas": dani_reuniones,
-                    "llamadas": dani_llamadas
-                },
-                "Teresa": {
-                    "agendadas": tere_reuniones,
-                    "realizadas": tere_reuniones,
-                    "llamadas": tere_llamadas
-                },
-                "Matias": {
-                    "agendadas": mati_reuniones,
-                    "realizadas": mati_reuniones,
-                    "llamadas": mati_llamadas
-                },
-                "Robot": {
-                    "agendadas": robot_reuniones,
-                    "realizadas": robot_reuniones,
-                    "llamadas": robot_llamadas
-                }
-            },
-            "totales": {
-                "reuniones_agendadas": reuniones_agendadas,
-                "reuniones_realizadas": reuniones_realizadas,
-                "clientes_con_reserva": clientes_con_reserva,
-                "reservas": reservas
-            }
-        }
+    # Encontrar la última columna válida (hasta ayer)
+    last_col = find_yesterday_column(rows, yesterday)
 
-        return data
+    if last_col == -1:
+        print("❌ No se encontraron datos hasta ayer")
+        sys.exit(1)
+
+    fecha_limite = rows[1][last_col] if len(rows) > 1 else "?"
+    print(f"✅ Última fecha válida encontrada: {fecha_limite} (columna {last_col})")
+
+    # Extraer TODOS los datos desde el inicio hasta ayer
+    return extract_all_data_until_yesterday(rows, last_col)
+
+
+def parse_args(argv=None):
+    """Parsea los argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Genera data/latest.json desde el Google Sheet")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Leer sólo los días nuevos y combinarlos con el latest.json existente")
+    parser.add_argument('--recheck-days', type=int, default=RECHECK_DAYS,
+                        help=f"Días ya guardados que se vuelven a leer en modo incremental (default: {RECHECK_DAYS})")
+    return parser.parse_args(argv)
 
-    except Exception as e:
-        print(f"⚠️  Error extrayendo datos de columna {col_index}: {e}")
-        return None
 
+@instrumented_run('read_sheet_to_json', emit=print)
+def main(argv=None):
+    args = parse_args(argv)
 
-def main():
     print("=" * 80)
     print("🗄️  LEYENDO GOOGLE SHEET - INFORME DIARIO ARE")
     print("📊 Extrayendo TODOS los datos acumulados hasta AYER")
@@ -247,23 +291,17 @@ def main():
     # Calcular fecha de ayer
     yesterday = datetime.now() - timedelta(days=1)
     print(f"\n📅 Fecha límite: {yesterday.strftime('%d/%m/%Y')} (AYER)")
-    print(f"📊 Se extraerán TODOS los datos desde el inicio hasta esta fecha")
 
-    # Leer sheet
-    rows = read_sheet_with_service_account()
+    existing = load_existing_output(OUTPUT_FILE) if args.incremental else None
+    if existing:
+        history = extract_incremental(existing, yesterday, args.recheck_days)
+    else:
+        if args.incremental:
+            print(f"⚠️  No hay un {OUTPUT_FILE} válido, se hará una lectura completa")
+        print(f"📊 Se extraerán TODOS los datos desde el inicio hasta esta fecha")
+        history = extract_full(yesterday)
 
-    # Encontrar la última columna válida (hasta ayer)
-    last_col = find_yesterday_column(rows, yesterday)
-
-    if last_col == -1:
-        print("❌ No se encontraron datos hasta ayer")
-        sys.exit(1)
-
-    fecha_limite = rows[1][last_col] if len(rows) > 1 else "?"
-    print(f"✅ Última fecha válida encontrada: {fecha_limite} (columna {last_col})")
-
-    # Extraer TODOS los datos desde el inicio hasta ayer
-    all_data = extract_all_data_until_yesterday(rows, last_col)
+    all_data = history.to_records()
 
     if not all_data:
         print("❌ No se pudieron extraer los datos")
@@ -280,16 +318,40 @@ def main():
         "total_dias": len(all_data),
         "datos": all_data
     }
+    # Identifica los datos publicados: rollups.json lo copia y el dashboard
+    # sólo usa sus acumulados si coincide con el latest.json que cargó
+    output_data["hash_datos"] = data_hash(output_data)
 
     # Crear carpeta data si no existe
     os.makedirs('data', exist_ok=True)
 
-    # Guardar en latest.json
-    output_file = 'data/latest.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    with span('publicacion'):
+        # Guardar en latest.json (+ variante minificada), sólo si cambió
+        output_file = OUTPUT_FILE
+        sizes = write_variants(output_data, OUTPUT_BASE)
+
+        # Rollups precalculados para el dashboard
+        rollups_data = {
+            "fecha_actualizacion": output_data["fecha_actualizacion"],
+            "fecha_ultimo_dato": output_data["fecha_ultimo_dato"],
+            "total_dias": output_data["total_dias"],
+            "hash_datos": output_data["hash_datos"],
+            **build_rollups(history)
+        }
+        sizes.update(write_variants(rollups_data, ROLLUPS_BASE))
+
+        # Un archivo por mes + manifest (rangos, hashes y tamaños)
+        write_month_shards(history, output_data["fecha_actualizacion"])
+    incr('publicacion.archivos_escritos', len(sizes))
+    incr('publicacion.bytes_escritos', sum(sizes.values()))
 
     print(f"\n✅ Datos guardados en: {output_file}")
+    print(f"✅ Rollups guardados en: {ROLLUPS_FILE}")
+    if sizes:
+        for path, size in sizes.items():
+            print(f"   📦 {path}: {size / 1024:.1f} KB")
+    else:
+        print("   ⏭️  Sin cambios en los datos: no se reescribió ningún archivo")
     print(f"📊 Total días procesados: {len(all_data)}")
     print(f"📈 Último día: {all_data[-1]['fecha']}")
     print(f"📞 Leads totales último día: {all_data[-1]['leads_creados']}")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Expansión de eventos recurrentes (RRULE) acotada a una ventana de fechas
+Aplica EXDATE y las instancias modificadas (RECURRENCE-ID), y memoiza las
+expansiones por UID/SEQUENCE para no expandir dos veces la misma serie; el
+memo se puede exportar a JSON para reutilizarlo en la próxima ejecución
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta, date
+from typing import List, Optional
+
+import pytz
+from dateutil.rrule import rrulestr
+
+from ical_stream import parse_ical_datetime
+
+logger = logging.getLogger(__name__)
+
+# Días que se expanden más allá de la ventana pedida: la extracción diaria
+# de mañana cae dentro de la expansión (persistida) de hoy
+EXPANSION_HORIZON_DAYS = 31
+
+
+def _event_tz(tzid: Optional[str], default_tz):
+    """Timezone en la que se expande la serie (la de su DTSTART original)"""
+    if not tzid:
+        return default_tz
+    try:
+        return pytz.timezone(tzid)
+    except pytz.UnknownTimeZoneError:
+        return default_tz
+
+
+def _naive_until(rule: str, tz) -> str:
+    """
+    Reescribe UNTIL como hora local "flotante" de la serie
+
+    La expansión se hace en hora de pared (naive) para respetar los cambios
+    de horario, y dateutil exige que UNTIL sea naive en ese caso.
+    """
+    parts = []
+    for part in rule.split(';'):
+        key, _, value = part.partition('=')
+        if key.upper() == 'UNTIL' and value:
+            until = parse_ical_datetime(value, {}, tz)
+            if isinstance(until, datetime):
+                until = until.astimezone(tz).replace(tzinfo=None)
+            else:
+                until = datetime.combine(until, datetime.max.time()).replace(microsecond=0)
+            part = f"UNTIL={until.strftime('%Y%m%dT%H%M%S')}"
+        parts.append(part)
+    return ';'.join(parts)
+
+
+def expand_rrule(rule: str, start: datetime, tzid: Optional[str], local_tz,
+                 first_day: date, last_day: date) -> List[datetime]:
+    """
+    Retorna los inicios de la serie cuyo día local cae en [first_day, last_day]
+
+    Args:
+        rule: Valor de la propiedad RRULE (p.ej. 'FREQ=WEEKLY;BYDAY=MO')
+        start: DTSTART de la serie, con timezone
+        tzid: Timezone original del DTSTART (None = flotante / fecha)
+        local_tz: Timezone del calendario (la de las métricas)
+    """
+    tz = _event_tz(tzid, local_tz)
+    wall_start = start.astimezone(tz).replace(tzinfo=None)
+
+    window_start = local_tz.localize(datetime.combine(first_day, datetime.min.time()))
+    window_end = local_tz.localize(datetime.combine(last_day + timedelta(days=1), datetime.min.time()))
+    # Margen de un día para cubrir diferencias de offset entre timezones
+    after = window_start.astimezone(tz).replace(tzinfo=None) - timedelta(days=1)
+    before = window_end.astimezone(tz).replace(tzinfo=None) + timedelta(days=1)
+
+    rrule = rrulestr(_naive_until(rule, tz), dtstart=wall_start)
+
+    occurrences = []
+    for wall in rrule.between(after, before, inc=True):
+        occurrence = tz.localize(wall).astimezone(local_tz)
+        if window_start <= occurrence < window_end:
+            occurrences.append(occurrence)
+    return occurrences
+
+
+class RecurrenceExpander:
+    """
+    Expande series recurrentes memoizando por (UID, SEQUENCE)
+
+    Para cada serie se guarda la ventana ya expandida; una consulta dentro de
+    esa ventana sólo filtra. Una consulta fuera de ella re-expande desde su
+    primer día hasta horizon_days después del último (la unión con la ventana
+    anterior si se solapan), así que días consecutivos no re-expanden.
+    """
+
+    def __init__(self, local_tz, horizon_days: int = EXPANSION_HORIZON_DAYS):
+        self.local_tz = local_tz
+        self.horizon_days = horizon_days
+        self._memo = {}
+        self._used = set()      # claves consultadas en esta ejecución (las que se exportan)
+        self.dirty = False      # hay expansiones nuevas desde la última exportación
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'expansions': 0}
+
+    def occurrences(self, series: dict, first_day: date, last_day: date) -> List[datetime]:
+        """Inicios de la serie en la ventana, sin aplicar EXDATE ni overrides"""
+        key = (series['uid'], series.get('sequence', 0), series['rrule'], series['start'])
+
+        with self._lock:
+            self._used.add(key)
+            memo = self._memo.get(key)
+            if memo and memo[0] <= first_day and last_day <= memo[1]:
+                self.stats['hits'] += 1
+                return [o for o in memo[2] if first_day <= o.date() <= last_day]
+
+            window = (first_day, last_day + timedelta(days=self.horizon_days))
+            if memo and memo[0] <= window[1] and window[0] <= memo[1]:
+                window = (min(window[0], memo[0]), max(window[1], memo[1]))
+            self.stats['expansions'] += 1
+
+        requested = (first_day, last_day)
+        first_day, last_day = window
+
+        try:
+            expanded = expand_rrule(series['rrule'], series['start'], series.get('tzid'),
+                                    self.local_tz, first_day, last_day)
+        except Exception as e:
+            logger.error(f"Error expandiendo RRULE de {series['uid']}: {e}")
+            return []
+
+        with self._lock:
+            self._memo[key] = (first_day, last_day, expanded)
+            self.dirty = True
+        return [o for o in expanded if requested[0] <= o.date() <= requested[1]]
+
+    def to_json(self) -> list:
+        """Expansiones de las series consultadas en esta ejecución, serializables a JSON"""
+        with self._lock:
+            entries = [(key, self._memo[key]) for key in self._used if key in self._memo]
+        return [
+            {
+                'uid': uid, 'sequence': sequence, 'rrule': rule, 'start': start.isoformat(),
+                'desde': first_day.isoformat(), 'hasta': last_day.isoformat(),
+                'inicios': [o.isoformat() for o in expanded]
+            }
+            for (uid, sequence, rule, start), (first_day, last_day, expanded) in entries
+        ]
+
+    def load_json(self, entries: list) -> None:
+        """Carga expansiones exportadas con to_json (no pisa las ya calculadas)"""
+        with self._lock:
+            for entry in entries:
+                key = (entry['uid'], entry['sequence'], entry['rrule'], datetime.fromisoformat(entry['start']))
+                if key not in self._memo:
+                    self._memo[key] = (
+                        date.fromisoformat(entry['desde']),
+                        date.fromisoformat(entry['hasta']),
+                        [datetime.fromisoformat(o).astimezone(self.local_tz) for o in entry['inicios']]
+                    )
+
+    def expand(self, series: dict, first_day: date, last_day: date, overrides: set) -> List[dict]:
+        """
+        Retorna las instancias de la serie en la ventana como eventos normalizados
+
+        Se excluyen los EXDATE y las instancias reemplazadas por un VEVENT con
+        RECURRENCE-ID (que se indexan por separado con su propio inicio).
+        """
+        excluded = {d.astimezone(pytz.utc) for d in series.get('exdates') or []}
+
+        instances = []
+        for start in self.occurrences(series, first_day, last_day):
+            if not (first_day <= start.date() <= last_day):
+                continue
+            instant = start.astimezone(pytz.utc)
+            if instant in excluded or (series['uid'], instant) in overrides:
+                continue
+            instances.append({**series, 'start': start, 'rrule': None, 'exdates': []})
+        return instances
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Cache en disco de respuestas de la API de HubSpot
+Las búsquedas sobre días ya cerrados no cambian: se guardan por endpoint +
+cuerpo canónico del request, con un TTL que depende de la antigüedad del día
+consultado y un tamaño máximo con desalojo LRU
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Optional
+
+from instrumentation import incr
+from publish import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Política por defecto (sobreescribible en config['hubspot']['cache'])
+DEFAULT_CACHE_CONFIG = {
+    'enabled': True,
+    'dir': '.cache/hubspot',
+    'max_mb': 50,
+    'fresh_days': 2,      # días más recientes que esto no se cachean (importaciones tardías)
+    'settled_days': 30,   # días más antiguos que esto no expiran
+    'ttl_hours': 24       # TTL de los días intermedios
+}
+
+
+class ResponseCache:
+    """
+    Respuestas JSON guardadas en un archivo por clave
+
+    El LRU usa el mtime de cada archivo (se actualiza en cada hit), así que
+    el orden sobrevive entre ejecuciones sin un índice aparte.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_CONFIG['dir'],
+                 max_bytes: int = DEFAULT_CACHE_CONFIG['max_mb'] * 1024 * 1024,
+                 fresh_days: float = DEFAULT_CACHE_CONFIG['fresh_days'],
+                 settled_days: float = DEFAULT_CACHE_CONFIG['settled_days'],
+                 ttl_hours: float = DEFAULT_CACHE_CONFIG['ttl_hours'],
+                 bypass: bool = False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.fresh_days = fresh_days
+        self.settled_days = settled_days
+        self.ttl_hours = ttl_hours
+        self.bypass = bypass
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'stored': 0, 'evicted': 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, cache_config: Optional[dict], bypass: bool = False) -> Optional['ResponseCache']:
+        """Crea el cache desde config['hubspot']['cache'] (None si está deshabilitado)"""
+        options = {**DEFAULT_CACHE_CONFIG, **(cache_config or {})}
+        if not options['enabled']:
+            return None
+        return cls(
+            cache_dir=options['dir'],
+            max_bytes=int(options['max_mb'] * 1024 * 1024),
+            fresh_days=options['fresh_days'],
+            settled_days=options['settled_days'],
+            ttl_hours=options['ttl_hours'],
+            bypass=bypass
+        )
+
+    def ttl_for(self, window_end_ms: int) -> Optional[float]:
+        """
+        TTL (segundos) de una consulta según la antigüedad del fin de su ventana
+
+        Returns:
+            0 = no cachear, None = no expira
+        """
+        age_days = (time.time() - window_end_ms / 1000) / 86400
+        if age_days < self.fresh_days:
+            return 0
+        if age_days >= self.settled_days:
+            return None
+        return self.ttl_hours * 3600
+
+    @staticmethod
+    def make_key(method: str, endpoint: str, body: Optional[dict], namespace: str = '') -> str:
+        """Clave por cuenta + método + endpoint + cuerpo canónico (claves ordenadas, sin espacios)"""
+        canonical = json.dumps(body or {}, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        raw = f"{namespace}\n{method.upper()}\n{endpoint}\n{canonical}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+        incr(f'hubspot.cache.{stat}')
+
+    def get(self, key: str) -> Optional[dict]:
+        """Respuesta guardada y vigente, o None (siempre None en modo bypass)"""
+        if self.bypass:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count('misses')
+            return None
+
+        expires_at = entry.get('expires_at')
+        if expires_at is not None and expires_at < time.time():
+            self._count('expired')
+            self._count('misses')
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count('hits')
+        return entry['response']
+
+    def put(self, key: str, response: dict, ttl: Optional[float], endpoint: str = '') -> None:
+        """Guarda una respuesta (ttl None = no expira) y desaloja las menos usadas si hace falta"""
+        now = time.time()
+        body = json.dumps({
+            'endpoint': endpoint,
+            'stored_at': now,
+            'expires_at': None if ttl is None else now + ttl,
+            'response': response
+        }, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+        path = self._path(key)
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+        atomic_write(path, body)
+        self._count('stored')
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += len(body) - previous
+            if self._total_bytes > self.max_bytes:
+                self._evict(keep=path)
+
+    def _entries(self) -> list:
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.json') and entry.is_file():
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self, keep: str) -> None:
+        """Borra las entradas con mtime más antiguo hasta quedar bajo el 90% del máximo"""
+        target = self.max_bytes * 0.9
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.stats['evicted'] += 1
+            incr('hubspot.cache.evicted')
+        self._total_bytes = total
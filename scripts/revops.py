@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+CLI unificado del pipeline RevOps ARE
+
+Uso:
+    python3 scripts/revops.py extract [--from YYYY-MM-DD --to YYYY-MM-DD] [--with-sheet] [--bypass-cache]
+    python3 scripts/revops.py calendar [--sync]
+    python3 scripts/revops.py sheet-read [--incremental] [--recheck-days N]
+    python3 scripts/revops.py sheet-update [--from YYYY-MM-DD --to YYYY-MM-DD]
+    python3 scripts/revops.py verify [--offline]
+
+Cada subcomando importa su módulo recién al ejecutarse: `verify` y `--help`
+no cargan requests, icalendar, gspread ni pandas. El config se lee una sola
+vez aquí y se pasa al subcomando; el logging se configura al ejecutar.
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+import os
+import sys
+import argparse
+import importlib
+
+sys.path.append(os.path.dirname(__file__))
+from runtime import DEFAULT_CONFIG_PATH, configure_logging, load_config
+
+# Qué recibe el subcomando del --config: el config ya cargado o sólo la ruta
+CONFIG, CONFIG_PATH = 'config', 'config_path'
+
+# subcomando → (módulo, config que recibe o None, archivo de log, ayuda)
+COMMANDS = {
+    'extract': ('main_extractor', CONFIG, 'logs/main_extraction.log',
+                "Extrae HubSpot + Calendar del día (o un rango con --from/--to)"),
+    'calendar': ('calendar_extractor', CONFIG, 'logs/calendar_extraction.log',
+                 "Extrae las métricas de Google Calendar del día (--sync: incremental con SQLite)"),
+    'sheet-read': ('read_sheet_to_json', None, None,
+                   "Lee el sheet ACT comercial y publica data/latest.json"),
+    'sheet-update': ('sheet_updater', CONFIG, 'logs/sheet_update.log',
+                     "Escribe en el Informe Diario los días ya extraídos"),
+    'verify': ('verify_setup', CONFIG_PATH, None,
+               "Verifica Python, dependencias, config y conexiones"),
+}
+
+
+def parse_args(argv=None):
+    """Parsea el subcomando; el resto de los argumentos los parsea el módulo"""
+    parser = argparse.ArgumentParser(prog='revops', description="Pipeline RevOps ARE")
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH,
+                        help=f"Archivo de configuración (default: {DEFAULT_CONFIG_PATH})")
+    subparsers = parser.add_subparsers(dest='command', metavar='COMANDO', required=True)
+    for name, (_, _, _, help_text) in COMMANDS.items():
+        # add_help=False: `revops extract --help` muestra la ayuda del módulo
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    return parser.parse_known_args(argv)
+
+
+def main(argv=None):
+    args, rest = parse_args(argv)
+    module_name, config_arg, log_file, _ = COMMANDS[args.command]
+
+    kwargs = {}
+    # `revops <cmd> --help` no necesita config ni crea archivos de log
+    if '-h' not in rest and '--help' not in rest:
+        configure_logging(log_file)
+        if config_arg == CONFIG:
+            kwargs['config'] = load_config(args.config)
+        elif config_arg == CONFIG_PATH:
+            kwargs['config_path'] = args.config
+
+    module = importlib.import_module(module_name)
+    return module.main(rest, **kwargs)
+
+
+if __name__ == "__main__":
+    main()
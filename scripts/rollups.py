@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Rollups precalculados del histórico de métricas
+Totales semanales, mensuales y del período completo, tasas por setter,
+costo por lead y sumas acumuladas para que el dashboard no recorra
+todos los días en cada filtro
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from history_store import MetricsHistory, SETTERS, COLUMNS
+
+# Métricas sumables (costo_por_lead es un promedio y se recalcula)
+SUMMABLE = [name for name in COLUMNS if name != 'costo_por_lead']
+
+
+def _rate(numerator: float, denominator: float) -> float:
+    """Porcentaje con un decimal (0 si el denominador es 0)"""
+    return round(numerator / denominator * 100, 1) if denominator else 0.0
+
+
+def kpis(sums: Dict[str, float]) -> dict:
+    """
+    Calcula los KPIs del dashboard a partir de sumas por métrica
+
+    Mismas fórmulas que index.html: costo por lead = inversión / leads,
+    show-up = realizadas / agendadas, conversión día = agendadas día / llamadas.
+    """
+    leads = sums['leads_creados']
+    agendadas = sums['totales.reuniones_agendadas']
+    llamadas = sums['llamadas_realizadas']
+
+    setters = {}
+    for setter in SETTERS:
+        s_llamadas = sums[f'reuniones.{setter}.llamadas']
+        s_agendadas = sums[f'reuniones.{setter}.agendadas']
+        s_realizadas = sums[f'reuniones.{setter}.realizadas']
+        setters[setter] = {
+            'llamadas': s_llamadas,
+            'agendadas': s_agendadas,
+            'realizadas': s_realizadas,
+            'show_up_rate': _rate(s_realizadas, s_agendadas),
+            'tasa_conversion': _rate(s_agendadas, s_llamadas)
+        }
+
+    return {
+        'leads_creados': leads,
+        'llamadas_realizadas': llamadas,
+        'reuniones_agendadas_dia': sums['reuniones_agendadas_dia'],
+        'inversion_campanas': sums['inversion_campanas'],
+        'costo_por_lead': round(sums['inversion_campanas'] / leads, 2) if leads else 0.0,
+        'reuniones_agendadas': agendadas,
+        'reuniones_realizadas': sums['totales.reuniones_realizadas'],
+        'clientes_con_reserva': sums['totales.clientes_con_reserva'],
+        'reservas': sums['totales.reservas'],
+        'show_up_rate': _rate(sums['totales.reuniones_realizadas'], agendadas),
+        'tasa_conversion_dia': _rate(sums['reuniones_agendadas_dia'], llamadas),
+        'setters': setters
+    }
+
+
+def _period_rollups(df: pd.DataFrame, freq: str, label_format: str) -> list:
+    """KPIs por período (resample de pandas sobre las métricas sumables)"""
+    if df.empty:
+        return []
+
+    grouped = df[SUMMABLE].resample(freq)
+    sums = grouped.sum()
+    dias = grouped.size()
+    desde = df['_fecha'].resample(freq).min()
+    hasta = df['_fecha'].resample(freq).max()
+
+    periods = []
+    for label, row in zip(sums.index, sums.to_dict('records')):
+        if dias[label] == 0:
+            continue
+        periods.append({
+            'periodo': label.strftime(label_format),
+            'desde': desde[label].strftime('%Y-%m-%d'),
+            'hasta': hasta[label].strftime('%Y-%m-%d'),
+            'dias': int(dias[label]),
+            **kpis({k: int(v) for k, v in row.items()})
+        })
+    return periods
+
+
+def build_rollups(history: MetricsHistory) -> dict:
+    """
+    Construye el artefacto de rollups
+
+    Returns:
+        {
+            'total': {KPIs del período completo},
+            'semanal': [{'periodo': 'YYYY-MM-DD' (lunes), 'desde', 'hasta', 'dias', KPIs...}],
+            'mensual': [{'periodo': 'YYYY-MM', ...}],
+            'acumulado': {'fechas': [...], '<métrica>': [suma acumulada por día], ...}
+        }
+    """
+    df = history.to_dataframe()
+    df['_fecha'] = df.index
+
+    totals = {name: history.columns[name].sum().item() for name in SUMMABLE}
+
+    # Semanas de lunes a domingo, etiquetadas por el lunes
+    weekly = _period_rollups(df, 'W-SUN', '%Y-%m-%d')
+    for week in weekly:
+        week['periodo'] = (pd.Timestamp(week['periodo']) - pd.Timedelta(days=6)).strftime('%Y-%m-%d')
+
+    acumulado = {'fechas': np.datetime_as_string(history.dates, unit='D').tolist()}
+    for name in SUMMABLE:
+        acumulado[name] = np.cumsum(history.columns[name]).tolist()
+
+    return {
+        'total': kpis(totals),
+        'semanal': weekly,
+        'mensual': _period_rollups(df, 'MS', '%Y-%m'),
+        'acumulado': acumulado
+    }
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Configuración de ejecución compartida por los scripts y el CLI
+Carga de config.yaml y configuración de logging, sin imports pesados a nivel
+de módulo: importar este archivo no debe sumar tiempo al arranque
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+import os
+import sys
+import logging
+from typing import Optional
+
+DEFAULT_CONFIG_PATH = 'config/config.yaml'
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+logger = logging.getLogger(__name__)
+
+
+def load_config(config_path: str = DEFAULT_CONFIG_PATH) -> dict:
+    """Carga la configuración desde archivo YAML"""
+    import yaml  # diferido: sólo los comandos que leen el config pagan el import
+
+    try:
+        with open(config_path, 'r') as f:
+            return yaml.safe_load(f)
+    except Exception as e:
+        logger.error(f"Error cargando configuración: {e}")
+        sys.exit(1)
+
+
+def configure_logging(log_file: Optional[str] = None, level: int = logging.INFO) -> None:
+    """
+    Configura el logging del proceso (consola y, opcionalmente, un archivo en logs/)
+
+    Se llama al ejecutar un comando, nunca al importar un módulo: así importar
+    un extractor (benchmarks, harness de replay, otro script) no crea logs/
+    ni abre archivos.
+    """
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+        handlers.insert(0, logging.FileHandler(log_file))
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers, force=True)
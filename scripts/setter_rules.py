@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Reglas de clasificación de eventos del calendario por setter
+Compila la configuración de google_calendar en una tabla color → reglas con
+regex precompiladas y memoiza el resultado por (color, prefijo normalizado
+del título): en un feed grande clasificar un evento es una búsqueda en dict
+
+Configuración (en config['google_calendar']):
+    setter_rules:            # opcional; se evalúan en orden, gana la primera
+      - setter: "Robot"
+        colors: ["9", "6", "11"]
+        title_prefix: "Asesoría Inmobiliaria"   # literal, sin distinguir mayúsculas
+      - setter: "Matias"
+        colors: ["9"]
+      - setter: "Nuevo Setter"
+        colors: ["5"]
+        title_pattern: "llamada|demo"           # regex sobre el inicio del título
+    title_prefix_chars: 40   # caracteres que se miran con title_pattern
+
+Sin setter_rules, las reglas salen de color_mapping, no_show_colors,
+robot_title_pattern y human_title_pattern (la configuración histórica).
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+import re
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Setters que siempre aparecen en las métricas (el sheet y el histórico los esperan)
+DEFAULT_SETTERS = ['Daniela', 'Teresa', 'Matias', 'Robot']
+UNKNOWN_SETTER = 'Desconocido'
+
+# Valor de color_mapping para el color que comparten Matias y Robot
+SHARED_COLOR_LABEL = 'Azul'
+
+DEFAULT_TITLE_PREFIX_CHARS = 40
+MAX_MEMO_ENTRIES = 50000
+
+
+def normalize_title(title: str, prefix_chars: Optional[int] = None) -> str:
+    """Inicio del título sin espacios a la izquierda, en minúsculas (casefold)"""
+    title = title.lstrip()
+    if prefix_chars is None:
+        return title.casefold()
+    return title[:prefix_chars].casefold()[:prefix_chars]
+
+
+def rules_from_legacy_config(calendar_config: dict) -> List[dict]:
+    """
+    Traduce color_mapping + patrones de título a setter_rules
+
+    - Azul (color_mapping = "Azul") con título del robot → Robot; también con
+      un color de no-show, porque el broker cambia el color pero no el título
+    - Azul con título humano → Matias; azul sin patrón claro → Matias
+    - Cualquier otro color del mapping → el setter indicado
+    """
+    color_mapping = calendar_config.get('color_mapping') or {}
+    no_show_colors = list(calendar_config.get('no_show_colors') or [])
+    shared = [str(color) for color, name in color_mapping.items() if name == SHARED_COLOR_LABEL]
+    robot_pattern = calendar_config.get('robot_title_pattern')
+    human_pattern = calendar_config.get('human_title_pattern')
+
+    rules = []
+    if shared and robot_pattern:
+        rules.append({'name': 'robot_titulo', 'setter': 'Robot',
+                      'colors': shared + no_show_colors, 'title_prefix': robot_pattern})
+    if shared and human_pattern:
+        rules.append({'name': 'matias_titulo', 'setter': 'Matias',
+                      'colors': shared, 'title_prefix': human_pattern})
+    if shared:
+        rules.append({'name': 'matias_color', 'setter': 'Matias', 'colors': shared})
+    for color, name in color_mapping.items():
+        if name != SHARED_COLOR_LABEL:
+            rules.append({'name': f'color_{color}', 'setter': name, 'colors': [str(color)]})
+    return rules
+
+
+class _CompiledRule:
+    """Regla lista para evaluar: colores como set y título como regex compilada"""
+
+    def __init__(self, spec: dict, index: int):
+        self.setter = spec['setter']
+        self.name = spec.get('name') or f"{index}_{self.setter}"
+        self.colors = frozenset(str(color) for color in spec.get('colors') or [])
+
+        self.prefix_chars = 0
+        self.regex = None
+        if spec.get('title_prefix'):
+            literal = normalize_title(spec['title_prefix'])
+            self.regex = re.compile(re.escape(literal))
+            self.prefix_chars = len(literal)
+        elif spec.get('title_pattern'):
+            self.regex = re.compile(spec['title_pattern'], re.IGNORECASE)
+            self.prefix_chars = None  # lo define title_prefix_chars
+
+    def matches(self, title_prefix: str) -> bool:
+        return self.regex is None or self.regex.match(title_prefix) is not None
+
+
+class SetterRules:
+    """
+    Clasificador de eventos (título, color) → (setter, realizada)
+
+    Sólo el inicio del título decide la regla, así que la clave de memoización
+    es (color, prefijo): todas las "Asesoría Inmobiliaria - <lead>" de un mismo
+    color comparten la entrada. Los conteos por regla incluyen los hits del memo.
+    """
+
+    def __init__(self, calendar_config: dict):
+        specs = calendar_config.get('setter_rules') or rules_from_legacy_config(calendar_config)
+        self.rules = [_CompiledRule(spec, i) for i, spec in enumerate(specs)]
+        self.no_show_colors = frozenset(str(color) for color in calendar_config.get('no_show_colors') or [])
+
+        # Largo del prefijo: el literal más largo, o title_prefix_chars si hay regex
+        lengths = [rule.prefix_chars for rule in self.rules if rule.regex is not None]
+        default_chars = calendar_config.get('title_prefix_chars', DEFAULT_TITLE_PREFIX_CHARS)
+        self.prefix_chars = max((default_chars if n is None else n for n in lengths), default=0)
+
+        # Tabla de despacho: color → reglas aplicables en orden (las sin colores aplican a todos)
+        wildcard = tuple(rule for rule in self.rules if not rule.colors)
+        colors = {color for rule in self.rules for color in rule.colors}
+        self._table: Dict[str, Tuple[_CompiledRule, ...]] = {
+            color: tuple(rule for rule in self.rules if not rule.colors or color in rule.colors)
+            for color in colors
+        }
+        self._wildcard = wildcard
+
+        self.setters = list(DEFAULT_SETTERS)
+        for rule in self.rules:
+            if rule.setter not in self.setters:
+                self.setters.append(rule.setter)
+
+        # Sin lock: dict.get/set son atómicos con el GIL y los conteos son
+        # informativos (con varios threads pueden perder algún incremento)
+        self._memo: Dict[Tuple[str, str], Tuple[Optional[str], str, bool]] = {}
+        self.hits = {rule.name: 0 for rule in self.rules}
+        self.hits[UNKNOWN_SETTER] = 0
+        self.memo_misses = 0
+
+    def _resolve(self, color: str, title_prefix: str) -> Tuple[Optional[str], str, bool]:
+        """(nombre de la regla o None, setter, realizada) sin memo"""
+        completed = color not in self.no_show_colors
+        for rule in self._table.get(color, self._wildcard):
+            if rule.matches(title_prefix):
+                return rule.name, rule.setter, completed
+        return None, UNKNOWN_SETTER, completed
+
+    def classify(self, title: str, color: str) -> Tuple[str, bool]:
+        """
+        Clasifica un evento
+
+        Returns:
+            (setter o 'Desconocido', realizada: el color no es de no-show)
+        """
+        key = (color, normalize_title(title, self.prefix_chars))
+        result = self._memo.get(key)
+        if result is None:
+            result = self._resolve(*key)
+            if len(self._memo) < MAX_MEMO_ENTRIES:
+                self._memo[key] = result
+            self.memo_misses += 1
+        self.hits[result[0] or UNKNOWN_SETTER] += 1
+        return result[1], result[2]
+
+    def stats(self) -> dict:
+        """Hits por regla y del memo (acumulados desde que se creó el clasificador)"""
+        total = sum(self.hits.values())
+        return {
+            'reglas': dict(self.hits),
+            'memo_hits': total - self.memo_misses,
+            'memo_misses': self.memo_misses,
+            'memo_entradas': len(self._memo)
+        }
+
+    def log_stats(self) -> None:
+        """Loguea los hits por regla"""
+        stats = self.stats()
+        total = stats['memo_hits'] + stats['memo_misses']
+        if not total:
+            return
+        logger.info(f"\nReglas de setter ({total} eventos, memo {stats['memo_hits']}/{total} hits, "
+                    f"{stats['memo_entradas']} claves):")
+        for name, hits in stats['reglas'].items():
+            if hits:
+                logger.info(f"  {name:20} | {hits:6}")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Particiona el histórico en un archivo por mes más un manifest
+Los clientes pueden bajar sólo los meses que necesitan, y un commit diario
+sólo modifica el shard del mes en curso
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+import os
+import json
+import hashlib
+
+import numpy as np
+
+from history_store import MetricsHistory
+from publish import atomic_write, write_json_if_changed
+
+SHARDS_DIR = 'data/shards'
+MANIFEST_FILE = 'data/manifest.json'
+
+
+def _encode(data: dict) -> bytes:
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _read_bytes(path: str) -> bytes:
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def split_by_month(history: MetricsHistory) -> dict:
+    """Retorna {'YYYY-MM': MetricsHistory del mes} (vectorizado sobre las fechas)"""
+    months = history.dates.astype('datetime64[M]')
+    labels, starts = np.unique(months, return_index=True)
+    bounds = list(starts) + [len(history)]
+
+    result = {}
+    for label, start, end in zip(labels, bounds[:-1], bounds[1:]):
+        result[str(label)] = MetricsHistory(
+            history.dates[start:end],
+            {name: values[start:end] for name, values in history.columns.items()}
+        )
+    return result
+
+
+def write_month_shards(history: MetricsHistory, fecha_actualizacion: str,
+                       shards_dir: str = SHARDS_DIR, manifest_file: str = MANIFEST_FILE) -> dict:
+    """
+    Escribe data/shards/YYYY-MM.json por mes y data/manifest.json
+
+    Los shards no llevan timestamps, así que un mes sin cambios produce
+    exactamente los mismos bytes y no se reescribe.
+
+    Returns:
+        El manifest escrito
+    """
+    os.makedirs(shards_dir, exist_ok=True)
+
+    entries = []
+    written = 0
+    for mes, month in split_by_month(history).items():
+        datos = month.to_records()
+        body = _encode({
+            'mes': mes,
+            'desde': datos[0]['fecha'],
+            'hasta': datos[-1]['fecha'],
+            'total_dias': len(datos),
+            'datos': datos
+        })
+
+        archivo = f"{mes}.json"
+        path = os.path.join(shards_dir, archivo)
+        if _read_bytes(path) != body:
+            atomic_write(path, body)
+            written += 1
+
+        entries.append({
+            'mes': mes,
+            'archivo': f"shards/{archivo}",
+            'desde': datos[0]['fecha'],
+            'hasta': datos[-1]['fecha'],
+            'dias': len(datos),
+            'sha256': hashlib.sha256(body).hexdigest(),
+            'bytes': len(body)
+        })
+
+    # Eliminar shards de meses que ya no existen
+    current = {f"{entry['mes']}.json" for entry in entries}
+    for name in os.listdir(shards_dir):
+        if name.endswith('.json') and name not in current:
+            os.remove(os.path.join(shards_dir, name))
+
+    manifest = {
+        'fecha_actualizacion': fecha_actualizacion,
+        'fecha_ultimo_dato': entries[-1]['hasta'] if entries else None,
+        'total_dias': len(history),
+        'shards': entries
+    }
+    manifest_written = write_json_if_changed(manifest_file, manifest)
+
+    print(f"🧩 Shards mensuales: {len(entries)} ({written} reescritos) → {manifest_file}"
+          f"{'' if manifest_written else ' (sin cambios)'}")
+    return manifest
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Parser declarativo de la matriz del sheet "ACT comercial"
+Una tabla (fila, campo, tipo) describe qué hay en cada fila; el parser procesa
+cada fila completa como un vector (todas las fechas a la vez) y reporta las
+celdas con formato inválido en vez de convertirlas silenciosamente en 0
+
+Autor: Felipe Barros
+Fecha: Enero 2026
+"""
+
+import re
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from gspread.utils import rowcol_to_a1
+
+from history_store import MetricsHistory, SCHEMA, COLUMNS
+
+# Fila con las fechas DD/MM/YYYY (0-indexed: fila 2 del sheet)
+DATE_ROW = 1
+
+# (fila 0-indexed, ruta del campo en latest.json, tipo de celda)
+# Fila 3 del sheet = índice 2, etc. Las reuniones de cada setter se usan
+# tanto para 'agendadas' como para 'realizadas'.
+ROW_SPEC: List[Tuple[int, Tuple[str, ...], str]] = [
+    (2, ('totales', 'reuniones_agendadas'), 'int'),
+    (3, ('totales', 'reuniones_realizadas'), 'int'),
+    (4, ('totales', 'clientes_con_reserva'), 'int'),
+    (5, ('totales', 'reservas'), 'int'),
+
+    (9, ('reuniones', 'Daniela', 'llamadas'), 'int'),
+    (10, ('reuniones', 'Daniela', 'agendadas'), 'int'),
+    (10, ('reuniones', 'Daniela', 'realizadas'), 'int'),
+    (11, ('reuniones', 'Teresa', 'llamadas'), 'int'),
+    (12, ('reuniones', 'Teresa', 'agendadas'), 'int'),
+    (12, ('reuniones', 'Teresa', 'realizadas'), 'int'),
+    (13, ('reuniones', 'Matias', 'llamadas'), 'int'),
+    (14, ('reuniones', 'Matias', 'agendadas'), 'int'),
+    (14, ('reuniones', 'Matias', 'realizadas'), 'int'),
+    (15, ('reuniones', 'Robot', 'llamadas'), 'int'),
+    (16, ('reuniones', 'Robot', 'agendadas'), 'int'),
+    (16, ('reuniones', 'Robot', 'realizadas'), 'int'),
+
+    (20, ('leads_creados',), 'int'),
+    (21, ('llamadas_realizadas',), 'int'),
+    (22, ('reuniones_agendadas_dia',), 'int'),
+    (23, ('inversion_campanas',), 'money'),
+    (24, ('costo_por_lead',), 'decimal'),
+]
+
+# Separador para procesar una fila completa como un único string
+_SEP = '\t'
+
+_INT_PATTERN = r'[+-]?\d+'
+_DECIMAL_PATTERN = r'[+-]?(?:\d+(?:\.\d*)?|\.\d+)'
+
+
+def _clean_int(joined: str) -> str:
+    return joined
+
+
+def _clean_money(joined: str) -> str:
+    # CLP: "$1.234.567" -> "1234567"
+    return joined.replace('$', '').replace('.', '').replace(',', '')
+
+
+def _clean_decimal(joined: str) -> str:
+    # "$1.234,5" -> "1234.5" (punto de miles, coma decimal)
+    return joined.replace('$', '').replace('.', '').replace(',', '.')
+
+
+# tipo -> (limpieza de la fila completa, formato válido de una celda,
+#         caracteres que obligan a revisar la celda, dtype)
+CELL_KINDS = {
+    'int': (_clean_int, _INT_PATTERN, r'[^0-9\t]', 'int64'),
+    'money': (_clean_money, _INT_PATTERN, r'[^0-9\t]', 'int64'),
+    'decimal': (_clean_decimal, _DECIMAL_PATTERN, r'[^0-9.\t]', 'float64'),
+}
+
+
+def _iso_date(cell: str) -> str:
+    """'DD/MM/YYYY' -> 'YYYY-MM-DD' ('NaT' si la celda no es una fecha)"""
+    cell = cell.strip()
+    if '/' in cell:
+        try:
+            return datetime.strptime(cell, "%d/%m/%Y").strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+    return 'NaT'
+
+
+def _parse_dates(cells: List[str]) -> np.ndarray:
+    """Fila de fechas -> datetime64[D] (NaT en las celdas que no son fecha)"""
+    iso = [f"{c[6:]}-{c[3:5]}-{c[:2]}" if len(c) == 10 and c[2] == '/' and c[5] == '/' else _iso_date(c)
+           for c in cells]
+    try:
+        return np.array(iso, dtype='datetime64[D]')
+    except ValueError:
+        # Alguna celda con forma de fecha pero inválida (p.ej. 31/02/2026)
+        return pd.to_datetime(pd.Series(iso, dtype=object), format='%Y-%m-%d',
+                              errors='coerce').to_numpy().astype('datetime64[D]')
+
+
+class SheetParser:
+    """
+    Parser compilado a partir de una tabla de filas
+
+    Cada fila del sheet se procesa una sola vez aunque alimente varios campos:
+    la limpieza (strip, símbolos CLP, coma decimal) y la validación se hacen
+    sobre la fila completa unida en un string, y la conversión numérica con
+    NumPy. Las celdas vacías valen 0; las que no calzan con el formato de su
+    tipo también valen 0 pero se reportan en `issues`.
+    """
+
+    def __init__(self, spec: List[Tuple[int, Tuple[str, ...], str]] = ROW_SPEC):
+        known = {path for path, _ in SCHEMA}
+        self.rows = OrderedDict()
+        for row_index, path, kind in spec:
+            if kind not in CELL_KINDS:
+                raise ValueError(f"Tipo de celda desconocido '{kind}' en fila {row_index + 1}")
+            if path not in known:
+                raise ValueError(f"Campo {'.'.join(path)} no existe en el esquema de latest.json")
+            fields = self.rows.setdefault((row_index, kind), [])
+            fields.append('.'.join(path))
+
+        covered = {name for fields in self.rows.values() for name in fields}
+        missing = [name for name in COLUMNS if name not in covered]
+        if missing:
+            raise ValueError(f"La tabla de filas no cubre los campos: {', '.join(missing)}")
+
+        # Patrones compilados por tipo: formato de una celda y caracteres que
+        # obligan a revisar una celda individualmente
+        self._cell_patterns = {kind: re.compile(spec[1]) for kind, spec in CELL_KINDS.items()}
+        self._slow_chars = {kind: re.compile(spec[2]) for kind, spec in CELL_KINDS.items()}
+
+    @staticmethod
+    def _row_cells(rows: List[List[str]], row_index: int, first_col: int, width: int) -> List[str]:
+        """Celdas [first_col, first_col + width) de una fila, rellenando con '' si es más corta"""
+        row = rows[row_index] if row_index < len(rows) else []
+        cells = list(row[first_col:first_col + width])
+        cells.extend([''] * (width - len(cells)))
+        return cells
+
+    def _parse_row(self, cells: List[str], kind: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Retorna (valores, máscara de celdas inválidas) de una fila"""
+        clean, _, _, dtype = CELL_KINDS[kind]
+        joined = _SEP.join(cells)
+        cleaned = clean(joined)
+
+        # Camino rápido: la fila se valida y limpia como un único string y
+        # sólo las celdas con caracteres fuera de lo esperado (espacios,
+        # signos, texto) se revisan una por una
+        if joined.count(_SEP) == len(cells) - 1:
+            parts = cleaned.split(_SEP)
+            malformed = np.zeros(len(parts), dtype=bool)
+
+            suspicious = [match.start() for match in self._slow_chars[kind].finditer(cleaned)]
+            if suspicious:
+                lengths = np.fromiter(map(len, parts), dtype=np.int64, count=len(parts)) + 1
+                starts = np.cumsum(lengths) - lengths
+                pattern = self._cell_patterns[kind]
+                for i in np.unique(np.searchsorted(starts, suspicious, side='right') - 1).tolist():
+                    part = parts[i].strip()
+                    valid = pattern.fullmatch(part) is not None
+                    parts[i] = part if valid else ''
+                    malformed[i] = bool(part) and not valid
+
+            try:
+                values = np.array([part or '0' for part in parts], dtype=dtype)
+                return self._round(values, kind), malformed
+            except ValueError:
+                pass
+
+        # Camino lento, celda por celda (p.ej. '1.2.3' en una fila decimal)
+        pattern = self._cell_patterns[kind]
+        parts = [clean(cell).strip() for cell in cells]
+        ok = [pattern.fullmatch(part) is not None for part in parts]
+        values = np.array([part if valid else '0' for part, valid in zip(parts, ok)], dtype=dtype)
+        malformed = np.array([bool(part) and not valid for part, valid in zip(parts, ok)], dtype=bool)
+        return self._round(values, kind), malformed
+
+    @staticmethod
+    def _round(values: np.ndarray, kind: str) -> np.ndarray:
+        # round() de Python (no np.round) para reproducir exactamente los valores históricos
+        if kind == 'decimal':
+            return np.array([round(v, 3) for v in values.tolist()], dtype=values.dtype)
+        return values
+
+    def parse(self, rows: List[List[str]], first_col: int = 0, last_col: Optional[int] = None,
+              col_offset: int = 0) -> Tuple[MetricsHistory, List[dict]]:
+        """
+        Parsea las columnas [first_col, last_col] de la matriz
+
+        Args:
+            rows: Filas tal como las retorna gspread (get_all_values / get)
+            first_col, last_col: Rango de columnas (0-indexed, inclusive)
+            col_offset: Columna del sheet que corresponde al índice 0 de rows
+                (sólo para reportar las celdas en notación A1)
+
+        Returns:
+            (MetricsHistory con las columnas que tienen fecha válida,
+             [{'celda': 'AB12', 'fecha': 'YYYY-MM-DD', 'valor': '...'}] celdas inválidas)
+        """
+        if last_col is None:
+            last_col = max((len(row) for row in rows), default=0) - 1
+        width = max(last_col - first_col + 1, 0)
+
+        dates = _parse_dates(self._row_cells(rows, DATE_ROW, first_col, width))
+        valid = ~np.isnat(dates)
+        cols = np.flatnonzero(valid)
+        dates = dates[valid]
+        fechas = np.datetime_as_string(dates, unit='D')
+
+        columns = {}
+        issues = []
+        for (row_index, kind), fields in self.rows.items():
+            cells = self._row_cells(rows, row_index, first_col, width)
+            if len(cols) < width:
+                cells = [cells[i] for i in cols.tolist()]
+            values, malformed = self._parse_row(cells, kind)
+
+            for i in np.flatnonzero(malformed).tolist():
+                issues.append({
+                    'celda': rowcol_to_a1(row_index + 1, col_offset + first_col + int(cols[i]) + 1),
+                    'fecha': str(fechas[i]),
+                    'valor': cells[i]
+                })
+
+            for name in fields:
+                columns[name] = values
+
+        history = MetricsHistory(dates, columns)._sorted_unique()
+        issues.sort(key=lambda issue: (issue['fecha'], issue['celda']))
+        return history, issues
+
+
+def report_malformed(issues: List[dict], limit: int = 10) -> None:
+    """Imprime las celdas inválidas (las primeras `limit`)"""
+    if not issues:
+        return
+    print(f"⚠️  {len(issues)} celdas con formato inválido (se tomaron como 0):")
+    for issue in issues[:limit]:
+        print(f"   {issue['celda']} ({issue['fecha']}): {issue['valor']!r}")
+    if len(issues) > limit:
+        print(f"   ... y {len(issues) - limit} más")
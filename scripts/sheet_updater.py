@@ -8,82 +8,152 @@ Autor: Felipe Barros
 
 import os
 import sys
-import yaml
+import json
 import logging
+import argparse
 import gspread
-from datetime import datetime, timedelta
+from gspread.utils import rowcol_to_a1
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
 
 sys.path.append(os.path.dirname(__file__))
+from instrumentation import incr, instrumented_run, span
+from runtime import configure_logging, load_config
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+LOG_FILE = 'logs/sheet_update.log'
+
+
+# Fila de la fecha en el sheet (1-indexed)
+DATE_ROW = 2
+
+# Filas que se escriben automáticamente (1-indexed) y cómo obtener su valor
+AUTO_ROWS = [
+    (3, lambda cal, hub: sum(d['agendadas'] for d in cal.values())),    # Reuniones agendadas
+    (4, lambda cal, hub: sum(d['realizadas'] for d in cal.values())),   # Reuniones realizadas
+    (11, lambda cal, hub: cal.get('Daniela', {}).get('agendadas', 0)),
+    (13, lambda cal, hub: cal.get('Teresa', {}).get('agendadas', 0)),
+    (15, lambda cal, hub: cal.get('Matias', {}).get('agendadas', 0)),
+    (17, lambda cal, hub: cal.get('Robot', {}).get('agendadas', 0)),
+    (21, lambda cal, hub: hub.get('leads_creados', 0)),                 # Leads creados
+]
+
 
 class GoogleSheetUpdater:
     """Actualiza el Google Sheet con acceso público"""
     
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, client: gspread.Client = None):
         self.config = config
         self.sheet_id = config['google_sheets']['informe_diario_id']
         self.worksheet_name = config['google_sheets']['worksheet_name']
         
-        # Autenticar con OAuth usando acceso público
-        try:
-            gc = gspread.oauth(
-                credentials_filename='config/credentials.json',
-                authorized_user_filename='config/authorized_user.json'
-            )
-            self.client = gc
-            logger.info("✅ Autenticado con Google Sheets")
-        except:
-            logger.warning("⚠️ Sin credenciales OAuth - modo simulación")
-            self.client = None
+        # Cliente ya autenticado (p.ej. el harness de replay): no se pasa por OAuth
+        if client is not None:
+            self.client = client
+        else:
+            # Autenticar con OAuth usando acceso público
+            try:
+                gc = gspread.oauth(
+                    credentials_filename='config/credentials.json',
+                    authorized_user_filename='config/authorized_user.json'
+                )
+                self.client = gc
+                logger.info("✅ Autenticado con Google Sheets")
+            except:
+                logger.warning("⚠️ Sin credenciales OAuth - modo simulación")
+                self.client = None
+        
+        # Se resuelven una sola vez por ejecución
+        self._worksheet = None
+        self._date_columns = None
+        self._next_column = None
     
-    def update_sheet(self, date: datetime, calendar_data: dict, hubspot_data: dict):
-        """Actualiza el sheet"""
+    def _get_worksheet(self):
+        """Abre la hoja una sola vez por ejecución"""
+        if self._worksheet is None:
+            sheet = self.client.open_by_key(self.sheet_id)
+            self._worksheet = sheet.worksheet(self.worksheet_name)
+        return self._worksheet
+    
+    def _resolve_column(self, worksheet, date_str: str) -> Tuple[int, bool]:
+        """
+        Retorna (columna 1-indexed, es_nueva) para una fecha DD/MM/YYYY
         
+        La fila de fechas se lee una sola vez; las fechas que no existen se
+        asignan a columnas nuevas consecutivas al final.
+        """
+        if self._date_columns is None:
+            dates_row = worksheet.row_values(DATE_ROW)
+            self._date_columns = {}
+            for i, cell in enumerate(dates_row):
+                self._date_columns.setdefault(cell.strip(), i + 1)
+            self._next_column = len(dates_row) + 1
+        
+        col_index = self._date_columns.get(date_str)
+        if col_index is not None:
+            return col_index, False
+        
+        col_index = self._next_column
+        self._next_column += 1
+        self._date_columns[date_str] = col_index
+        return col_index, True
+    
+    def build_updates(self, worksheet, days: List[Tuple[datetime, dict, dict]]) -> List[dict]:
+        """Arma la lista de rangos A1 → valores para todos los días"""
+        updates = []
+        for date, calendar_data, hubspot_data in days:
+            date_str = date.strftime("%d/%m/%Y")
+            col_index, is_new = self._resolve_column(worksheet, date_str)
+            
+            if is_new:
+                updates.append({'range': rowcol_to_a1(DATE_ROW, col_index), 'values': [[date_str]]})
+            
+            # Datos automáticos
+            for row, get_value in AUTO_ROWS:
+                updates.append({
+                    'range': rowcol_to_a1(row, col_index),
+                    'values': [[get_value(calendar_data, hubspot_data)]]
+                })
+        return updates
+    
+    def update_days(self, days: List[Tuple[datetime, dict, dict]]) -> bool:
+        """
+        Actualiza el sheet para varios días en un solo batch_update
+        
+        Args:
+            days: Lista de (fecha, calendar_data, hubspot_data)
+        """
         if not self.client:
             logger.warning("⚠️ Modo simulación - datos que se actualizarían:")
-            self._print_would_update(date, calendar_data, hubspot_data)
+            for date, calendar_data, hubspot_data in days:
+                self._print_would_update(date, calendar_data, hubspot_data)
             return True  # Retornar True para que no falle en GitHub Actions
         
         try:
-            sheet = self.client.open_by_key(self.sheet_id)
-            worksheet = sheet.worksheet(self.worksheet_name)
-            
-            date_str = date.strftime("%d/%m/%Y")
-            
-            # Buscar columna de fecha
-            dates_row = worksheet.row_values(2)
-            
-            try:
-                col_index = dates_row.index(date_str) + 1
-            except ValueError:
-                col_index = len(dates_row) + 1
-                worksheet.update_cell(2, col_index, date_str)
-            
-            # Actualizar datos automáticos
-            total_agendadas = sum(d['agendadas'] for d in calendar_data.values())
-            total_realizadas = sum(d['realizadas'] for d in calendar_data.values())
-            
-            worksheet.update_cell(3, col_index, total_agendadas)
-            worksheet.update_cell(4, col_index, total_realizadas)
-            worksheet.update_cell(11, col_index, calendar_data.get('Daniela', {}).get('agendadas', 0))
-            worksheet.update_cell(13, col_index, calendar_data.get('Teresa', {}).get('agendadas', 0))
-            worksheet.update_cell(15, col_index, calendar_data.get('Matias', {}).get('agendadas', 0))
-            worksheet.update_cell(17, col_index, calendar_data.get('Robot', {}).get('agendadas', 0))
-            worksheet.update_cell(21, col_index, hubspot_data.get('leads_creados', 0))
+            with span('sheet.escritura', dias=len(days)):
+                worksheet = self._get_worksheet()
+                updates = self.build_updates(worksheet, days)
+                if updates:
+                    worksheet.batch_update(updates, value_input_option='USER_ENTERED')
+                    incr('sheet.celdas_escritas', len(updates))
+                    incr('sheet.columnas_escritas', len(days))
             
-            logger.info("✅ Sheet actualizado exitosamente")
+            logger.info(f"✅ Sheet actualizado exitosamente ({len(days)} días, {len(updates)} celdas, 1 batch_update)")
             return True
             
         except Exception as e:
+            # Las columnas nuevas asignadas en build_updates no llegaron al sheet:
+            # la fila de fechas se vuelve a leer en el próximo intento
+            self._date_columns = None
+            self._next_column = None
             logger.error(f"❌ Error: {e}")
             return False
     
+    def update_sheet(self, date: datetime, calendar_data: dict, hubspot_data: dict):
+        """Actualiza el sheet"""
+        return self.update_days([(date, calendar_data, hubspot_data)])
+    
     def _print_would_update(self, date: datetime, calendar_data: dict, hubspot_data: dict):
         """Imprime qué se actualizaría"""
         date_str = date.strftime("%d/%m/%Y")
@@ -96,3 +166,59 @@ class GoogleSheetUpdater:
         print(f"✅ Matias: {calendar_data.get('Matias', {}).get('agendadas', 0)}")
         print(f"✅ Robot: {calendar_data.get('Robot', {}).get('agendadas', 0)}")
         print(f"✅ Leads creados: {hubspot_data.get('leads_creados', 0)}\n")
+
+
+def load_extracted(day: date) -> Optional[dict]:
+    """Lee data/extracted_YYYYMMDD.json (escrito por main_extractor) o None si no existe"""
+    path = f"data/extracted_{day.strftime('%Y%m%d')}.json"
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parsea los argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Escribe en el Informe Diario los días ya extraídos (data/extracted_*.json)")
+    parser.add_argument('--from', dest='date_from', type=date.fromisoformat,
+                        help="Primer día a escribir (YYYY-MM-DD). Default: el día que procesa la extracción diaria")
+    parser.add_argument('--to', dest='date_to', type=date.fromisoformat,
+                        help="Último día, inclusive (YYYY-MM-DD). Default: --from")
+    return parser.parse_args(argv)
+
+
+@instrumented_run('sheet_updater')
+def main(argv: Optional[List[str]] = None, config: Optional[dict] = None):
+    """Función principal (config ya cargado por el CLI, o config.yaml)"""
+    args = parse_args(argv)
+    config = config or load_config()
+    
+    date_from = args.date_from or (datetime.now() - timedelta(days=config['extraction']['days_back'])).date()
+    date_to = args.date_to or date_from
+    if date_to < date_from:
+        logger.error(f"❌ Rango inválido: {date_from} > {date_to}")
+        sys.exit(1)
+    
+    days = []
+    for i in range((date_to - date_from).days + 1):
+        day = date_from + timedelta(days=i)
+        data = load_extracted(day)
+        if data is None:
+            logger.warning(f"⚠️ {day}: sin data/extracted_{day.strftime('%Y%m%d')}.json, se omite")
+            continue
+        # leads None (HubSpot falló) se escribe como null: la API no toca esa celda
+        days.append((datetime.combine(day, datetime.min.time()), data['reuniones'],
+                     {'leads_creados': data['leads_creados']}))
+    
+    if not days:
+        logger.error("❌ No hay días extraídos para escribir")
+        sys.exit(1)
+    
+    if not GoogleSheetUpdater(config).update_days(days):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    configure_logging(LOG_FILE)
+    main()
@@ -10,18 +10,26 @@ Fecha: Enero 2026
 import time
 import logging
 import functools
-from typing import Callable, Any, Optional
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Callable, Any, Mapping, Optional
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from instrumentation import incr
+
 logger = logging.getLogger(__name__)
 
 
 def create_session_with_retries(
     retries: int = 3,
     backoff_factor: float = 0.5,
-    status_forcelist: tuple = (500, 502, 503, 504)
+    status_forcelist: tuple = (500, 502, 503, 504),
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    respect_retry_after: bool = True
 ) -> requests.Session:
     """
     Crea una sesión de requests con retry automático
@@ -30,6 +38,10 @@ def create_session_with_retries(
         retries: Número de reintentos
         backoff_factor: Factor de espera exponencial (0.5 = 0.5s, 1s, 2s...)
         status_forcelist: Códigos HTTP que deben reintentar
+        pool_connections: Cantidad de pools (hosts) que se mantienen abiertos
+        pool_maxsize: Conexiones keep-alive máximas por host
+        respect_retry_after: Reintentar (esperando) los 413/429/503 con Retry-After
+                             aunque no estén en status_forcelist
 
     Returns:
         requests.Session configurada con retry logic
@@ -40,16 +52,264 @@ def create_session_with_retries(
         total=retries,
         backoff_factor=backoff_factor,
         status_forcelist=status_forcelist,
+        respect_retry_after_header=respect_retry_after,
         allowed_methods=["HEAD", "GET", "POST", "PUT", "DELETE", "OPTIONS", "TRACE"]
     )
 
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    adapter = HTTPAdapter(
+        max_retries=retry_strategy,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize
+    )
     session.mount("http://", adapter)
     session.mount("https://", adapter)
 
     return session
 
 
+# Política HTTP por servicio (sobrescribible desde la sección `http` del config)
+DEFAULT_HTTP_POLICIES = {
+    'default': {'retries': 3, 'backoff_factor': 0.5, 'status_forcelist': [500, 502, 503, 504], 'timeout': 30},
+    # HubSpot: urllib3 no reintenta los 429 (ni siquiera con Retry-After, que por
+    # defecto respeta fuera de status_forcelist): los maneja sólo HubSpotExtractor,
+    # pausando el token bucket compartido por todos los threads
+    'hubspot': {'retries': 5, 'backoff_factor': 0.5, 'status_forcelist': [500, 502, 503, 504], 'timeout': 30,
+                'respect_retry_after': False,
+                'rate_per_second': 4, 'burst': 4, 'max_throttle_retries': 6},
+    'calendar': {'retries': 3, 'backoff_factor': 1.0, 'status_forcelist': [500, 502, 503, 504], 'timeout': 30},
+}
+
+_http_config = {}
+_shared_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def configure_http(http_config: Optional[dict]) -> None:
+    """
+    Define la configuración de transporte HTTP compartido
+
+    Ejemplo (config.yaml):
+        http:
+          pool_connections: 4
+          pool_maxsize: 10
+          hubspot:
+            retries: 5
+            backoff_factor: 0.5
+
+    Las sesiones ya creadas se cierran para que tomen la nueva configuración.
+    """
+    global _http_config
+    close_shared_sessions()
+    _http_config = dict(http_config or {})
+
+
+def get_http_policy(service: str) -> dict:
+    """Retorna la política de retry/timeout de un servicio, con los overrides del config"""
+    policy = dict(DEFAULT_HTTP_POLICIES['default'])
+    policy.update(DEFAULT_HTTP_POLICIES.get(service, {}))
+    policy.update(_http_config.get(service) or {})
+    return policy
+
+
+def _count_response(service: str) -> Callable:
+    """Hook de requests que cuenta las respuestas del servicio en las métricas de ejecución"""
+    def hook(response, *args, **kwargs):
+        incr('http.requests')
+        incr(f'http.{service}.requests')
+        if response.status_code == 304:
+            incr(f'http.{service}.not_modified')
+        elif response.status_code >= 400:
+            incr(f'http.{service}.errores')
+    return hook
+
+
+def get_shared_session(service: str = 'default') -> requests.Session:
+    """
+    Retorna la sesión HTTP compartida de un servicio
+
+    Todas las llamadas a un mismo servicio reutilizan el pool de conexiones
+    keep-alive, evitando un handshake TLS por request.
+    """
+    with _sessions_lock:
+        session = _shared_sessions.get(service)
+        if session is None:
+            policy = get_http_policy(service)
+            session = create_session_with_retries(
+                retries=policy['retries'],
+                backoff_factor=policy['backoff_factor'],
+                status_forcelist=tuple(policy['status_forcelist']),
+                pool_connections=_http_config.get('pool_connections', 10),
+                pool_maxsize=_http_config.get('pool_maxsize', 10),
+                respect_retry_after=policy.get('respect_retry_after', True)
+            )
+            session.hooks['response'].append(_count_response(service))
+            _shared_sessions[service] = session
+        return session
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe: limita los requests por segundo de un servicio
+
+    Lo comparten todos los threads que usan el servicio, así que un backfill
+    con N workers no supera el límite de la API. Además de la tasa
+    configurada, se ajusta con los headers de rate limit de cada respuesta y
+    se pausa completo (todos los threads) cuando el servidor responde 429.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, service: str = 'default'):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.service = service
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Espera hasta tener un token; retorna los segundos esperados"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+        if waited:
+            incr(f'http.{self.service}.throttle.esperas')
+            incr(f'http.{self.service}.throttle.espera_ms', int(waited * 1000))
+        return waited
+
+    def pause(self, seconds: float) -> None:
+        """Bloquea el bucket durante `seconds` (p.ej. el Retry-After de un 429)"""
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self.tokens = 0.0
+            self._updated = now
+        incr(f'http.{self.service}.throttle.429')
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Ajusta el bucket con los headers de rate limit de HubSpot
+
+        X-HubSpot-RateLimit-Secondly(-Remaining) o -Max/-Remaining/-Interval-Milliseconds:
+        la tasa baja si el servidor informa un límite menor al configurado y los
+        tokens disponibles nunca superan lo que el servidor dice que queda.
+        """
+        limits = []
+        secondly = _int_header(headers, 'X-HubSpot-RateLimit-Secondly')
+        if secondly:
+            limits.append((secondly, 1.0, _int_header(headers, 'X-HubSpot-RateLimit-Secondly-Remaining')))
+        maximum = _int_header(headers, 'X-HubSpot-RateLimit-Max')
+        interval_ms = _int_header(headers, 'X-HubSpot-RateLimit-Interval-Milliseconds')
+        if maximum and interval_ms:
+            limits.append((maximum, interval_ms / 1000, _int_header(headers, 'X-HubSpot-RateLimit-Remaining')))
+        if not limits:
+            return
+
+        with self._lock:
+            self._refill(time.monotonic())
+            for limit, window, remaining in limits:
+                if limit / window < self.rate:
+                    self.rate = limit / window
+                    self.capacity = max(1.0, min(self.capacity, float(limit)))
+                if remaining is not None:
+                    self.tokens = min(self.tokens, float(remaining))
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_retry_after(value: Optional[str], default: float) -> float:
+    """Segundos a esperar según un header Retry-After (segundos o fecha HTTP)"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+_rate_limiters = {}
+
+
+def get_rate_limiter(service: str) -> Optional[TokenBucket]:
+    """
+    Retorna el token bucket compartido de un servicio (None si su política
+    no define rate_per_second)
+    """
+    with _sessions_lock:
+        limiter = _rate_limiters.get(service)
+        if limiter is None:
+            policy = get_http_policy(service)
+            if not policy.get('rate_per_second'):
+                return None
+            limiter = TokenBucket(policy['rate_per_second'], policy.get('burst'), service=service)
+            _rate_limiters[service] = limiter
+        return limiter
+
+
+def get_http_stats() -> dict:
+    """
+    Retorna contadores de conexiones por servicio
+
+    Returns:
+        {'hubspot': {'requests': N, 'connections_opened': X, 'connections_reused': Y}, ...}
+    """
+    stats = {}
+    with _sessions_lock:
+        for service, session in _shared_sessions.items():
+            requests_count = 0
+            opened = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    requests_count += pool.num_requests
+                    opened += pool.num_connections
+            stats[service] = {
+                'requests': requests_count,
+                'connections_opened': opened,
+                'connections_reused': max(0, requests_count - opened)
+            }
+    return stats
+
+
+def close_shared_sessions() -> None:
+    """Cierra todas las sesiones compartidas y sus conexiones (y descarta los rate limiters)"""
+    with _sessions_lock:
+        for session in _shared_sessions.values():
+            session.close()
+        _shared_sessions.clear()
+        _rate_limiters.clear()
+
+
 def retry_on_exception(
     max_attempts: int = 3,
     delay: float = 1.0,
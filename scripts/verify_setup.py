@@ -6,8 +6,25 @@ Valida que todo esté listo antes de ejecutar
 
 import os
 import sys
-import yaml
-import requests
+import argparse
+from importlib.util import find_spec
+
+sys.path.append(os.path.dirname(__file__))
+from runtime import DEFAULT_CONFIG_PATH
+
+# módulo importable → paquete de pip (sólo se busca el módulo, no se importa:
+# `verify` debe arrancar en decenas de ms aunque pandas/gspread estén instalados)
+REQUIRED_MODULES = {
+    'requests': 'requests',
+    'yaml': 'pyyaml',
+    'icalendar': 'icalendar',
+    'pytz': 'pytz',
+    'dateutil': 'python-dateutil',
+    'gspread': 'gspread',
+    'google.oauth2': 'google-auth',
+    'numpy': 'numpy',
+    'pandas': 'pandas',
+}
 
 def print_header(text):
     """Imprime header bonito"""
@@ -29,40 +46,42 @@ def check_python():
 def check_dependencies():
     """Verifica dependencias instaladas"""
     print("\n📦 Verificando dependencias...")
-    required = ['requests', 'yaml', 'icalendar', 'pytz']
     missing = []
     
-    for module in required:
+    for module, package in REQUIRED_MODULES.items():
         try:
-            __import__(module)
-            print(f"   ✅ {module}")
+            found = find_spec(module) is not None
         except ImportError:
+            found = False
+        if found:
+            print(f"   ✅ {module}")
+        else:
             print(f"   ❌ {module} (faltante)")
-            missing.append(module)
+            missing.append(package)
     
     if missing:
         print(f"\n   💡 Instala con: pip3 install {' '.join(missing)}")
         return False
     return True
 
-def check_config():
+def check_config(config_path=DEFAULT_CONFIG_PATH):
     """Verifica archivo de configuración"""
     print("\n⚙️  Verificando configuración...")
-    config_path = 'config/config.yaml'
 
     if not os.path.exists(config_path):
-        print("   ❌ config.yaml no encontrado")
+        print(f"   ❌ {config_path} no encontrado")
         return False, None
     
-    print("   ✅ config.yaml existe")
+    print(f"   ✅ {config_path} existe")
     
     try:
+        import yaml
         with open(config_path, 'r') as f:
             config = yaml.safe_load(f)
-        print("   ✅ config.yaml válido")
+        print(f"   ✅ {config_path} válido")
         return True, config
     except Exception as e:
-        print(f"   ❌ Error leyendo config.yaml: {e}")
+        print(f"   ❌ Error leyendo {config_path}: {e}")
         return False, None
 
 def check_hubspot_api(api_key):
@@ -77,6 +96,7 @@ def check_hubspot_api(api_key):
     headers = {"Authorization": f"Bearer {api_key}"}
     
     try:
+        import requests
         response = requests.get(
             "https://api.hubapi.com/crm/v3/objects/contacts?limit=1",
             headers=headers,
@@ -101,6 +121,7 @@ def check_calendar(ical_url):
     print("\n📅 Verificando Google Calendar...")
     
     try:
+        import requests
         response = requests.get(ical_url, timeout=10)
         
         if response.status_code == 200:
@@ -137,7 +158,16 @@ def check_directories():
 
     return True
 
-def main():
+def parse_args(argv=None):
+    """Parsea los argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Verifica que todo esté listo antes de ejecutar")
+    parser.add_argument('--offline', action='store_true',
+                        help="No probar las conexiones a HubSpot ni a Google Calendar")
+    return parser.parse_args(argv)
+
+def main(argv=None, config_path=DEFAULT_CONFIG_PATH):
+    """Corre las verificaciones (config_path: el --config del CLI)"""
+    args = parse_args(argv)
     print_header("🔍 VERIFICACIÓN DE CONFIGURACIÓN")
     
     checks = []
@@ -149,17 +179,23 @@ def main():
     checks.append(('Dependencias', check_dependencies()))
     
     # Config file
-    config_ok, config = check_config()
+    config_ok, config = check_config(config_path)
     checks.append(('Config file', config_ok))
     
     # HubSpot API
-    if config_ok and config:
+    if args.offline:
+        checks.append(('HubSpot API', None))
+        checks.append(('Google Calendar', None))
+    elif config_ok and config:
         api_key = config.get('hubspot', {}).get('api_key', 'TU_API_KEY_AQUI')
         checks.append(('HubSpot API', check_hubspot_api(api_key)))
         
-        # Calendar
-        ical_url = config.get('google_calendar', {}).get('ical_url', '')
-        checks.append(('Google Calendar', check_calendar(ical_url)))
+        # Calendar (google_calendar.feeds o el ical_url único)
+        calendar_config = config.get('google_calendar', {})
+        feeds = calendar_config.get('feeds') or [calendar_config.get('ical_url', '')]
+        for feed in feeds:
+            ical_url = feed if isinstance(feed, str) else feed.get('ical_url', '')
+            checks.append(('Google Calendar', check_calendar(ical_url)))
     else:
         checks.append(('HubSpot API', False))
         checks.append(('Google Calendar', False))
@@ -170,24 +206,30 @@ def main():
     # Resumen
     print_header("📊 RESUMEN")
     
-    all_ok = all(check[1] for check in checks)
+    all_ok = all(status is not False for _, status in checks)
     
     for name, status in checks:
-        symbol = "✅" if status else "❌"
-        print(f"{symbol} {name}")
+        if status is None:
+            print(f"⏭️  {name} (omitido, --offline)")
+        else:
+            symbol = "✅" if status else "❌"
+            print(f"{symbol} {name}")
     
     print("\n" + "="*60)
     
     if all_ok:
         print("✅ TODO LISTO PARA EJECUTAR")
         print("\n📝 Próximo paso:")
-        print("   python3 scripts/main_extractor.py")
+        print("   python3 scripts/revops.py extract")
     else:
         print("⚠️  CONFIGURACIÓN INCOMPLETA")
         print("\n📝 Revisa los items marcados con ❌")
         print("📖 Consulta: QUICKSTART.md o README.md")
     
     print("="*60)
+    
+    if not all_ok:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,8 @@
+"""Configuración de pytest: los tests importan los módulos de scripts/ y benchmarks/ como los scripts"""
+
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for folder in ('scripts', 'benchmarks'):
+    sys.path.insert(0, os.path.join(ROOT, folder))
@@ -0,0 +1,110 @@
+"""
+Tests de EventStore.apply: eventos nuevos, obsoletos (SEQUENCE menor), sin
+cambios, con sólo otra versión (touch), actualizados con cambio de color y
+eliminados sólo cuando la descarga está completa
+"""
+
+from datetime import date, datetime
+
+import pytest
+import pytz
+
+from event_store import EventStore
+
+SANTIAGO = pytz.timezone('America/Santiago')
+NO_SHOW = '11'
+
+
+def event(uid: str, day: int, color: str = '9', sequence: int = 0,
+          last_modified: str = '2025-01-01T00:00:00+00:00', **fields) -> dict:
+    data = {
+        'uid': uid, 'title': f'Asesoría Inmobiliaria - {uid}', 'color': color,
+        'start': SANTIAGO.localize(datetime(2025, 1, day, 10)), 'sequence': sequence,
+        'status': 'CONFIRMED', 'tzid': 'America/Santiago', 'rrule': None, 'exdates': [],
+        'recurrence_id': None, 'last_modified': last_modified
+    }
+    data.update(fields)
+    return data
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EventStore(SANTIAGO, str(tmp_path / 'events.sqlite'))
+    yield store
+    store.close()
+
+
+def apply(store: EventStore, events: list, complete: bool = True) -> list:
+    return store.apply(events, lambda color: color != NO_SHOW,
+                       lambda e: {e['start'].date()}, complete_snapshot=complete)
+
+
+def counts(store: EventStore) -> dict:
+    return {k: v for k, v in store.last_apply.items() if k != 'observado' and v}
+
+
+def test_new_events_mark_their_days(store):
+    assert apply(store, [event('a', 2), event('b', 3)]) == [date(2025, 1, 2), date(2025, 1, 3)]
+    assert counts(store) == {'nuevos': 2}
+    assert [e['uid'] for e in store.events_for_days([date(2025, 1, 2)])] == ['a']
+
+
+def test_same_version_is_unchanged(store):
+    apply(store, [event('a', 2)])
+    assert apply(store, [event('a', 2)]) == []
+    assert counts(store) == {'sin_cambios': 1}
+
+
+def test_lower_sequence_is_obsolete(store):
+    apply(store, [event('a', 2, sequence=3)])
+    assert apply(store, [event('a', 5, sequence=2, last_modified='2025-01-05T00:00:00+00:00')]) == []
+    assert counts(store) == {'obsoletos': 1}
+    assert store.events_for_days([date(2025, 1, 2)])[0]['sequence'] == 3
+
+
+def test_new_version_with_same_content_is_touched(store):
+    apply(store, [event('a', 2)])
+    bumped = event('a', 2, sequence=1, last_modified='2025-01-02T00:00:00+00:00')
+
+    assert apply(store, [bumped]) == []
+    assert counts(store) == {'sin_cambios': 1}
+    # La versión quedó guardada: la próxima vez se salta sin comparar la huella
+    assert apply(store, [bumped]) == []
+    row = store.conn.execute("SELECT sequence, last_modified FROM events WHERE uid = 'a'").fetchone()
+    assert row == (1, '2025-01-02T00:00:00+00:00')
+
+
+def test_moved_event_marks_old_and_new_day(store):
+    apply(store, [event('a', 2)])
+    moved = event('a', 6, sequence=1, last_modified='2025-01-03T00:00:00+00:00')
+
+    assert apply(store, [moved]) == [date(2025, 1, 2), date(2025, 1, 6)]
+    assert counts(store) == {'actualizados': 1}
+    assert store.events_for_days([date(2025, 1, 2)]) == []
+
+
+def test_color_change_records_transition(store):
+    apply(store, [event('a', 2)])
+    no_show = event('a', 2, color=NO_SHOW, last_modified='2025-01-03T00:00:00+00:00')
+
+    assert apply(store, [no_show]) == [date(2025, 1, 2)]
+    assert counts(store) == {'actualizados': 1, 'transiciones': 1}
+    [change] = store.transitions(observed_since=store.last_apply['observado'])
+    assert (change['uid'], change['day'], change['old_color'], change['new_color']) == ('a', '2025-01-02', '9', NO_SHOW)
+    assert (change['old_completed'], change['new_completed']) == (True, False)
+
+
+def test_missing_events_are_deleted_only_on_complete_snapshot(store):
+    apply(store, [event('a', 2), event('b', 3)])
+
+    # Con un feed caído no se sabe si 'b' desapareció: no se borra
+    assert apply(store, [event('a', 2)], complete=False) == []
+    assert counts(store) == {'sin_cambios': 1}
+
+    assert apply(store, [event('a', 2)]) == [date(2025, 1, 3)]
+    assert counts(store) == {'sin_cambios': 1, 'eliminados': 1}
+    assert store.events_for_days([date(2025, 1, 3)]) == []
+
+    # Si vuelve a aparecer se trata como nuevo
+    assert apply(store, [event('a', 2), event('b', 3)]) == [date(2025, 1, 3)]
+    assert counts(store) == {'nuevos': 1, 'sin_cambios': 1}
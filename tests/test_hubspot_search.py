@@ -0,0 +1,99 @@
+"""
+Tests de HubSpotExtractor.iter_contacts_created contra SyntheticHubSpotSession
+Paginación con `after`, reinicio de la búsqueda al acercarse al límite de
+10.000 resultados y dedupe de los contactos del instante de reinicio
+"""
+
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+import synthetic
+from main_extractor import SEARCH_RESULTS_CAP, HubSpotExtractor
+
+TZ = 'America/Santiago'
+
+
+def make_extractor(contacts: list) -> HubSpotExtractor:
+    extractor = HubSpotExtractor('test-token', 'test', timezone=TZ)
+    extractor.session = synthetic.SyntheticHubSpotSession(contacts)
+    extractor.rate_limiter = None
+    return extractor
+
+
+def epoch_ms(day: date) -> int:
+    return int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def expected_by_day(contacts: list, extractor: HubSpotExtractor, start: date, end: date) -> dict:
+    """Conteo por día local calculado directamente sobre la lista de contactos"""
+    counts = Counter(
+        datetime.fromtimestamp(ts / 1000, tz=timezone.utc).astimezone(extractor.timezone).strftime('%Y-%m-%d')
+        for ts, _ in contacts
+    )
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    return {day.strftime('%Y-%m-%d'): counts.get(day.strftime('%Y-%m-%d'), 0) for day in days}
+
+
+def test_window_over_search_cap_restarts_without_duplicates():
+    contacts = synthetic.hubspot_contacts(25000, date(2025, 1, 1), 10, burst_rate=0.05)
+    extractor = make_extractor(contacts)
+
+    ids = [c['id'] for c in extractor.iter_contacts_created(epoch_ms(date(2025, 1, 1)),
+                                                             epoch_ms(date(2025, 1, 11)))]
+
+    assert len(ids) == len(set(ids)) == len(contacts)
+    assert ids == [contact_id for _, contact_id in contacts]
+
+    # Los días locales completos del rango, agrupados desde la misma búsqueda
+    start, end = date(2025, 1, 2), date(2025, 1, 9)
+    assert extractor.get_contacts_created_range(start, end) == expected_by_day(contacts, extractor, start, end)
+
+
+def test_contacts_on_restart_timestamp_are_not_repeated():
+    base = epoch_ms(date(2025, 3, 1))
+    # Los primeros 10.000 resultados terminan a mitad de una importación
+    # masiva de 200 contactos con el mismo createdate
+    before = SEARCH_RESULTS_CAP - 50
+    contacts = [(base + i * 1000, str(100000 + i)) for i in range(before)]
+    burst_ts = contacts[-1][0] + 1000
+    contacts += [(burst_ts, str(200000 + i)) for i in range(200)]
+    contacts += [(burst_ts + (i + 1) * 1000, str(300000 + i)) for i in range(500)]
+    extractor = make_extractor(contacts)
+
+    ids = [c['id'] for c in extractor.iter_contacts_created(base, burst_ts + 10 ** 9)]
+
+    assert len(ids) == len(set(ids)) == len(contacts)
+    assert Counter(ids) == Counter(contact_id for _, contact_id in contacts)
+
+
+def test_empty_window():
+    contacts = synthetic.hubspot_contacts(500, date(2025, 1, 1), 5)
+    extractor = make_extractor(contacts)
+
+    assert list(extractor.iter_contacts_created(epoch_ms(date(2025, 2, 1)), epoch_ms(date(2025, 2, 3)))) == []
+    assert extractor.session.requests == 1
+    assert extractor.get_contacts_created_range(date(2025, 2, 1), date(2025, 2, 3)) == {
+        '2025-02-01': 0, '2025-02-02': 0, '2025-02-03': 0
+    }
+
+
+@pytest.mark.parametrize('start, end', [(date(2025, 1, 3), date(2025, 1, 3)), (date(2025, 1, 2), date(2025, 1, 4))])
+def test_range_counts_match_source(start, end):
+    contacts = synthetic.hubspot_contacts(3000, date(2025, 1, 1), 5, burst_rate=0.2)
+    extractor = make_extractor(contacts)
+
+    assert extractor.get_contacts_created_range(start, end) == expected_by_day(contacts, extractor, start, end)
+
+
+def test_daily_count_matches_range_bucket():
+    contacts = synthetic.hubspot_contacts(2000, date(2025, 1, 1), 10, burst_rate=0.1)
+    extractor = make_extractor(contacts)
+
+    by_day = extractor.get_contacts_created_range(date(2025, 1, 2), date(2025, 1, 5))
+    # Medianoche naive y con timezone: ambas cuentan el día local del extractor
+    for fecha, total in by_day.items():
+        day = date.fromisoformat(fecha)
+        assert extractor.get_contacts_created(datetime(day.year, day.month, day.day)) == total
+        assert extractor.get_contacts_created(extractor.timezone.localize(datetime(day.year, day.month, day.day, 12))) == total
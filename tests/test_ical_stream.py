@@ -0,0 +1,109 @@
+"""
+Tests del parser iCal en streaming (ical_stream)
+Líneas plegadas partidas entre bloques, escapes de TEXT, parámetros con
+comillas, fechas DATE / DATE-TIME y propiedades de subcomponentes
+"""
+
+from datetime import date, datetime
+
+import pytz
+
+from ical_stream import (iter_unfolded_lines, iter_vevents, parse_content_line,
+                         parse_ical_datetime, unescape_text)
+
+SANTIAGO = pytz.timezone('America/Santiago')
+
+FEED = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "BEGIN:VEVENT\r\n"
+    "UID:evento-1@are\r\n"
+    "SUMMARY:Asesoría Inmobiliaria - Juan\\, Pérez\\; 2 dptos\\nsegunda lín\r\n"
+    " ea plegada\r\n"
+    "DTSTART;TZID=America/Santiago:20250106T100000\r\n"
+    "EXDATE;TZID=America/Santiago:20250113T100000\r\n"
+    "EXDATE;TZID=America/Santiago:20250120T100000,20250127T100000\r\n"
+    "BEGIN:VALARM\r\n"
+    "SUMMARY:alarma\r\n"
+    "UID:no-es-del-evento\r\n"
+    "END:VALARM\r\n"
+    "COLOR:9\r\n"
+    "END:VEVENT\r\n"
+    "BEGIN:VEVENT\r\n"
+    "UID:evento-2@are\r\n"
+    "SUMMARY:Llamada\r\n"
+    "DTSTART:20250107T150000Z\r\n"
+    "END:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+).encode('utf-8')
+
+
+def chunked(body: bytes, size: int) -> list:
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def test_unfolding_is_independent_of_chunk_boundaries():
+    expected = list(iter_unfolded_lines([FEED]))
+    # Bloques de 1 byte parten CRLF, caracteres UTF-8 y las líneas plegadas
+    for size in (1, 2, 3, 7, 64):
+        assert list(iter_unfolded_lines(chunked(FEED, size))) == expected
+
+    summary = next(line for line in expected if line.startswith('SUMMARY:Asesoría'))
+    assert summary.endswith('lín' + 'ea plegada')
+    assert not any(line.startswith(' ') for line in expected)
+
+
+def test_tab_continuation_and_missing_final_newline():
+    body = b"SUMMARY:uno\n\tdos\nUID:x"
+    assert list(iter_unfolded_lines(chunked(body, 4))) == ['SUMMARY:unodos', 'UID:x']
+
+
+def test_unescape_text():
+    assert unescape_text('Juan\\, Pérez\\; 2 dptos\\nfin') == 'Juan, Pérez; 2 dptos\nfin'
+    assert unescape_text('ruta C:\\\\datos') == 'ruta C:\\datos'
+    assert unescape_text('salto\\Nmayúscula') == 'salto\nmayúscula'
+    assert unescape_text('sin escapes') == 'sin escapes'
+    assert unescape_text('barra final\\') == 'barra final\\'
+
+
+def test_parse_content_line_with_quoted_params():
+    assert parse_content_line('DTSTART;TZID=America/Santiago:20260105T100000') == (
+        'DTSTART', {'TZID': 'America/Santiago'}, '20260105T100000'
+    )
+    # ':' y ';' dentro de comillas no separan el valor ni los parámetros
+    name, params, value = parse_content_line(
+        'ATTENDEE;CN="Pérez; Juan";DELEGATED-FROM="mailto:a@b.cl":mailto:juan@are.cl'
+    )
+    assert name == 'ATTENDEE'
+    assert params == {'CN': 'Pérez; Juan', 'DELEGATED-FROM': 'mailto:a@b.cl'}
+    assert value == 'mailto:juan@are.cl'
+
+    assert parse_content_line('summary:valor: con dos puntos') == ('SUMMARY', {}, 'valor: con dos puntos')
+    assert parse_content_line('SIN-VALOR') == ('SIN-VALOR', {}, '')
+
+
+def test_parse_ical_datetime():
+    assert parse_ical_datetime('20250106', {'VALUE': 'DATE'}, SANTIAGO) == date(2025, 1, 6)
+    assert parse_ical_datetime('20250107T150000Z', {}, SANTIAGO) == datetime(2025, 1, 7, 15, tzinfo=pytz.utc)
+
+    local = parse_ical_datetime('20250106T100000', {'TZID': 'America/Santiago'}, pytz.utc)
+    assert local == SANTIAGO.localize(datetime(2025, 1, 6, 10))
+
+    # Flotante o TZID desconocido: se interpreta en la timezone por defecto
+    assert parse_ical_datetime('20250106T100000', {}, SANTIAGO) == local
+    assert parse_ical_datetime('20250106T100000', {'TZID': 'Nada/Inventada'}, SANTIAGO) == local
+
+
+def test_iter_vevents_records():
+    records = list(iter_vevents(chunked(FEED, 5)))
+    assert [r['UID'][0] for r in records] == ['evento-1@are', 'evento-2@are']
+
+    first = records[0]
+    # Las propiedades del VALARM no pisan las del evento
+    assert unescape_text(first['SUMMARY'][0]).startswith('Asesoría Inmobiliaria - Juan, Pérez; 2 dptos\nsegunda')
+    assert first['COLOR'] == ('9', {})
+    assert first['EXDATE'] == [
+        ('20250113T100000', {'TZID': 'America/Santiago'}),
+        ('20250120T100000,20250127T100000', {'TZID': 'America/Santiago'}),
+    ]
+    assert 'EXDATE' not in records[1]
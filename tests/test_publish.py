@@ -0,0 +1,70 @@
+"""
+Tests de la etapa de publicación: el hash de datos ignora los campos
+volátiles y las escrituras se omiten cuando los datos no cambiaron
+"""
+
+import json
+import os
+
+from publish import data_hash, write_json_if_changed, write_variants
+
+DATA = {
+    'fecha_actualizacion': '2025-01-02 08:00:00',
+    'fecha_ultimo_dato': '2025-01-01',
+    'total_dias': 1,
+    'datos': [{'fecha': '2025-01-01', 'leads_creados': 12, 'notas': 'reunión'}]
+}
+
+
+def with_changes(**changes) -> dict:
+    return {**DATA, **changes}
+
+
+def test_data_hash_ignores_volatile_fields_and_key_order():
+    reordered = dict(reversed(list(DATA.items())))
+    assert data_hash(reordered) == data_hash(DATA)
+    assert data_hash(with_changes(fecha_actualizacion='2025-01-03 08:00:00')) == data_hash(DATA)
+    assert data_hash(with_changes(total_dias=2)) != data_hash(DATA)
+
+
+def test_write_json_if_changed_skips_same_data(tmp_path):
+    path = str(tmp_path / 'extracted.json')
+
+    assert write_json_if_changed(path, DATA)
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == DATA
+    os.utime(path, (0, 0))
+
+    # Sólo cambió la fecha de actualización: no se reescribe
+    assert not write_json_if_changed(path, with_changes(fecha_actualizacion='2025-01-03 08:00:00'))
+    assert os.stat(path).st_mtime == 0
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['fecha_actualizacion'] == DATA['fecha_actualizacion']
+
+    changed = with_changes(datos=[{**DATA['datos'][0], 'leads_creados': 13}])
+    assert write_json_if_changed(path, changed)
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == changed
+    assert not os.path.exists(path + '.tmp')
+
+
+def test_write_json_if_changed_rewrites_unreadable_file(tmp_path):
+    path = tmp_path / 'extracted.json'
+    path.write_text('{"truncado": ')
+    assert write_json_if_changed(str(path), DATA)
+    assert json.loads(path.read_text(encoding='utf-8')) == DATA
+
+
+def test_write_variants_skips_when_unchanged_and_restores_missing(tmp_path):
+    base = str(tmp_path / 'latest')
+
+    sizes = write_variants(DATA, base)
+    assert sorted(sizes) == [base + '.json', base + '.min.json']
+    with open(base + '.min.json', encoding='utf-8') as f:
+        assert json.load(f) == DATA
+
+    assert write_variants(with_changes(fecha_actualizacion='2025-01-03 08:00:00'), base) == {}
+
+    # Falta una variante: se reescriben aunque los datos sean los mismos
+    os.remove(base + '.min.json')
+    assert sorted(write_variants(DATA, base)) == [base + '.json', base + '.min.json']
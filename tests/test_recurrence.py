@@ -0,0 +1,97 @@
+"""
+Tests de la expansión de series recurrentes (recurrence)
+UNTIL en UTC y como fecha, cambios de horario, EXDATE, overrides
+(RECURRENCE-ID) y el memo exportable de RecurrenceExpander
+"""
+
+from datetime import date, datetime
+
+import pytz
+
+from recurrence import RecurrenceExpander, expand_rrule
+
+SANTIAGO = pytz.timezone('America/Santiago')
+
+
+def local(*args) -> datetime:
+    return SANTIAGO.localize(datetime(*args))
+
+
+def weekly_series(**overrides) -> dict:
+    series = {
+        'uid': 'serie-1@are', 'title': 'Reunión semanal', 'color': '9',
+        'start': local(2025, 3, 3, 10), 'sequence': 0, 'status': 'CONFIRMED',
+        'tzid': 'America/Santiago', 'rrule': 'FREQ=WEEKLY;BYDAY=MO', 'exdates': [],
+        'recurrence_id': None, 'last_modified': None
+    }
+    series.update(overrides)
+    return series
+
+
+def test_weekly_keeps_wall_time_across_dst_change():
+    # Santiago deja el horario de verano el 6 de abril de 2025 (-03 → -04)
+    starts = expand_rrule('FREQ=WEEKLY;BYDAY=MO', local(2025, 3, 24, 10), 'America/Santiago',
+                          SANTIAGO, date(2025, 3, 24), date(2025, 4, 14))
+
+    assert [s.date() for s in starts] == [date(2025, 3, 24), date(2025, 3, 31), date(2025, 4, 7), date(2025, 4, 14)]
+    assert {(s.hour, s.minute) for s in starts} == {(10, 0)}
+    assert starts[0].utcoffset() != starts[-1].utcoffset()
+
+
+def test_until_is_inclusive_in_utc_and_as_date():
+    start = local(2025, 3, 3, 10)
+    # 10:00 en Santiago (-03) = 13:00Z: UNTIL en ese instante incluye el 17/03
+    until_utc = expand_rrule('FREQ=WEEKLY;UNTIL=20250317T130000Z', start, 'America/Santiago',
+                             SANTIAGO, date(2025, 3, 1), date(2025, 4, 30))
+    assert [s.date() for s in until_utc] == [date(2025, 3, 3), date(2025, 3, 10), date(2025, 3, 17)]
+
+    until_date = expand_rrule('FREQ=WEEKLY;UNTIL=20250310', start, 'America/Santiago',
+                              SANTIAGO, date(2025, 3, 1), date(2025, 4, 30))
+    assert [s.date() for s in until_date] == [date(2025, 3, 3), date(2025, 3, 10)]
+
+
+def test_window_is_by_local_day():
+    # 23:30 en Santiago ya es el día siguiente en UTC: cuenta el día local
+    starts = expand_rrule('FREQ=DAILY;COUNT=3', local(2025, 1, 10, 23, 30), 'America/Santiago',
+                          SANTIAGO, date(2025, 1, 11), date(2025, 1, 11))
+    assert starts == [local(2025, 1, 11, 23, 30)]
+
+
+def test_expand_skips_exdates_and_overridden_instances():
+    series = weekly_series(exdates=[local(2025, 3, 10, 10)])
+    # La instancia del 17/03 fue movida: la reemplaza un VEVENT con RECURRENCE-ID
+    overrides = {(series['uid'], local(2025, 3, 17, 10).astimezone(pytz.utc))}
+
+    instances = RecurrenceExpander(SANTIAGO).expand(series, date(2025, 3, 1), date(2025, 3, 31), overrides)
+
+    assert [i['start'].date() for i in instances] == [date(2025, 3, 3), date(2025, 3, 24), date(2025, 3, 31)]
+    assert all(i['rrule'] is None and i['exdates'] == [] for i in instances)
+    assert all(i['uid'] == series['uid'] and i['title'] == series['title'] for i in instances)
+
+
+def test_memo_hits_within_horizon_and_new_sequence_reexpands():
+    expander = RecurrenceExpander(SANTIAGO, horizon_days=14)
+    series = weekly_series()
+
+    assert [o.date() for o in expander.occurrences(series, date(2025, 3, 3), date(2025, 3, 3))] == [date(2025, 3, 3)]
+    # El día siguiente y la semana siguiente caen en la ventana ya expandida
+    assert expander.occurrences(series, date(2025, 3, 4), date(2025, 3, 4)) == []
+    assert [o.date() for o in expander.occurrences(series, date(2025, 3, 10), date(2025, 3, 10))] == [date(2025, 3, 10)]
+    assert expander.stats == {'hits': 2, 'expansions': 1}
+
+    edited = weekly_series(sequence=1, rrule='FREQ=WEEKLY;BYDAY=TU')
+    assert [o.date() for o in expander.occurrences(edited, date(2025, 3, 3), date(2025, 3, 9))] == [date(2025, 3, 4)]
+    assert expander.stats['expansions'] == 2
+
+
+def test_memo_round_trips_through_json():
+    first = RecurrenceExpander(SANTIAGO)
+    series = weekly_series()
+    expected = first.occurrences(series, date(2025, 3, 1), date(2025, 3, 31))
+    assert first.dirty
+
+    second = RecurrenceExpander(SANTIAGO)
+    second.load_json(first.to_json())
+    assert second.occurrences(series, date(2025, 3, 1), date(2025, 3, 31)) == expected
+    assert second.stats == {'hits': 1, 'expansions': 0}
+    assert not second.dirty
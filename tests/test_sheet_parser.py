@@ -0,0 +1,83 @@
+"""
+Tests de SheetParser: el camino rápido (fila completa como un string) debe
+dar los mismos valores y celdas inválidas que validar celda por celda
+"""
+
+import re
+import random
+from datetime import datetime
+
+import numpy as np
+import pytest
+from gspread.utils import rowcol_to_a1
+
+import synthetic
+from sheet_parser import CELL_KINDS, DATE_ROW, SheetParser
+
+# Celdas con espacios, signos, separadores y texto, válidas e inválidas
+TRICKY_CELLS = {
+    'int': ['', '0', '12', ' 7 ', '+3', '-4', '1.5', '12a', 'N/A', '#REF!', '--1', '3 4', ' 5'],
+    'money': ['', '$0', '$1.234.567', ' $1.234 ', '$-5.000', '1,234', '$', 'gratis', '$1.2a3', '-$5'],
+    'decimal': ['', '$1234,56', '1.234,5', ',5', '-0,25', '$ 12,5 ', '1,2,3', '1.2.3', 'x', '12,'],
+}
+
+
+def reference_row(cells: list, kind: str):
+    """Semántica celda por celda: limpiar, validar el formato y 0 si no calza"""
+    clean, pattern, _, dtype = CELL_KINDS[kind]
+    values, malformed = [], []
+    for cell in cells:
+        part = clean(cell).strip()
+        valid = re.fullmatch(pattern, part) is not None
+        values.append(part if valid else '0')
+        malformed.append(bool(part) and not valid)
+    values = np.array(values, dtype=dtype)
+    if kind == 'decimal':
+        values = np.array([round(v, 3) for v in values.tolist()], dtype=dtype)
+    return values, np.array(malformed, dtype=bool)
+
+
+@pytest.mark.parametrize('kind', sorted(TRICKY_CELLS))
+def test_fast_path_matches_cell_by_cell(kind):
+    parser = SheetParser()
+    rng = random.Random(7)
+    for _ in range(200):
+        cells = [rng.choice(TRICKY_CELLS[kind]) for _ in range(rng.randint(1, 30))]
+        values, malformed = parser._parse_row(cells, kind)
+        expected_values, expected_malformed = reference_row(cells, kind)
+        assert values.tolist() == expected_values.tolist(), cells
+        assert malformed.tolist() == expected_malformed.tolist(), cells
+
+
+@pytest.mark.parametrize('kind', sorted(TRICKY_CELLS))
+def test_cell_with_separator_falls_back_to_slow_path(kind):
+    # Un tab dentro de una celda desalinea la fila unida: se valida celda por celda
+    cells = TRICKY_CELLS[kind] + ['1\t2']
+    values, malformed = SheetParser()._parse_row(cells, kind)
+    expected_values, expected_malformed = reference_row(cells, kind)
+    assert values.tolist() == expected_values.tolist()
+    assert malformed.tolist() == expected_malformed.tolist()
+    assert malformed[-1]
+
+
+def test_parse_reports_malformed_cells_and_skips_columns_without_date():
+    rows = synthetic.sheet_matrix(60, malformed_rate=0.05)
+    rows[DATE_ROW][10] = 'sin fecha'
+    parser = SheetParser()
+
+    history, issues = parser.parse(rows, first_col=1, col_offset=0)
+
+    assert len(history) == 59
+    assert '2020-01-10' not in {record['fecha'] for record in history.to_records()}
+    expected = set()
+    for (row_index, kind) in parser.rows:
+        for col in range(1, 61):
+            if col == 10:
+                continue
+            cell = rows[row_index][col]
+            if reference_row([cell], kind)[1][0]:
+                fecha = datetime.strptime(rows[DATE_ROW][col], '%d/%m/%Y').strftime('%Y-%m-%d')
+                expected.add((rowcol_to_a1(row_index + 1, col + 1), fecha, cell))
+
+    assert expected, "malformed_rate=0.05 debe generar celdas inválidas"
+    assert [(i['celda'], i['fecha'], i['valor']) for i in issues] == sorted(expected, key=lambda e: (e[1], e[0]))